@@ -1,12 +1,86 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
     MONGO_URI: str = "mongodb://localhost:27017/saas_pm"
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 1 day
+    DEFAULT_TENANT_ID: str = "default"
+    DB_BREAKER_FAILURE_THRESHOLD: int = 5
+    DB_BREAKER_LATENCY_P95_MS: float = 2000.0
+    DB_BREAKER_LATENCY_WINDOW: int = 200
+    DB_BREAKER_OPEN_SECONDS: float = 10.0
+    DB_BREAKER_PROBE_TIMEOUT_SECONDS: float = 2.0
+    STALE_READ_CACHE_SIZE: int = 1000
+    TYPEAHEAD_REBUILD_SECONDS: float = 300.0  # picks up writes made by other instances
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 15.0
+    SYNC_PAGE_SIZE: int = 1000
+    SYNC_SETTLE_SECONDS: float = 10.0  # longest a write may take between reserving its seq and committing
+    JOB_WORKERS: int = 4
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 300
+    JOB_RETRY_BACKOFF_SECONDS: int = 5
+    MIGRATIONS_AUTO_RUN: bool = True
+    MIGRATION_BATCH_SIZE: int = 500
+    MIGRATION_BATCH_DELAY_MS: int = 50
+    MIGRATION_MAX_DUTY_CYCLE: float = 0.5  # share of wall time a migration may keep the database busy
+    MIGRATION_LEASE_SECONDS: int = 60
+    PASSWORD_HASH_WORKERS: int = 4
+    BCRYPT_ROUNDS: int = 12  # pick with `python calibrate_hash.py`; older hashes are upgraded at login
+    USER_IMPORT_BATCH_SIZE: int = 200
+    USER_IMPORT_MAX_ROWS: int = 10000
+    MESSAGE_GROUP_COMMIT: bool = False
+    MESSAGE_GROUP_COMMIT_WINDOW_MS: int = 5
+    MESSAGE_GROUP_COMMIT_MAX_BATCH: int = 100
+    BROADCAST_BATCH_SIZE: int = 1000
+    ACTIVITY_LOG_WINDOW_MS: int = 50
+    ACTIVITY_LOG_MAX_BATCH: int = 500
+    ROLLUP_FLUSH_INTERVAL_SECONDS: float = 5.0
+    MESSAGE_RETENTION_DAYS: int = 0  # 0 keeps every message in the hot collection
+    MESSAGE_ARCHIVE_INTERVAL_MINUTES: int = 60
+    MESSAGE_ARCHIVE_BATCH_SIZE: int = 1000
+    MESSAGE_ARCHIVE_BUCKET_SIZE: int = 500  # messages per bucket, far below the 16 MB document limit
+    MESSAGE_ARCHIVE_TTL_DAYS: int = 0  # 0 keeps archived messages forever
+    ATTACHMENT_MAX_BYTES: int = 25 * 1024 * 1024
+    ATTACHMENT_QUOTA_BYTES: int = 500 * 1024 * 1024
+    ATTACHMENT_CHUNK_BYTES: int = 255 * 1024
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_PROXY: bool = False  # only behind a proxy that sets X-Forwarded-For
+    RATE_LIMIT_MAX_BUCKETS: int = 100_000
+    RATE_LIMIT_IDLE_SECONDS: int = 600
+    # "METHOD /path-prefix" (or "*") -> "<requests>/<second|minute|hour|day|seconds>"
+    RATE_LIMIT_POLICIES: Dict[str, str] = {
+        "POST /api/auth/login": "10/minute",
+        "POST /api/auth/refresh": "30/minute",
+        "POST /api/admin/users/import": "5/minute",
+        "POST /api/messages": "120/minute",
+        "POST /api/attachments": "30/minute",
+        "GET /api/admin": "300/minute",
+        "*": "1200/minute",
+    }
+    IDEMPOTENCY_ROUTES: List[str] = [
+        "POST /api/messages/",
+        "POST /api/messages/broadcast",
+        "POST /api/client/service-requests",
+        "POST /api/admin/users",
+    ]
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 3600
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    PROFILE_SAMPLE_RATE: float = 0.0  # share of requests profiled without being asked; 0 turns sampling off
+    PROFILE_SAMPLE_PATHS: List[str] = []  # path prefixes sampling is limited to; empty means all
+    PROFILE_INTERVAL_MS: float = 1.0
+    PROFILE_RETENTION_HOURS: int = 72
+    PROFILE_MAX_BYTES: int = 4 * 1024 * 1024  # compressed; larger flamegraphs are dropped, the timeline kept
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0  # share of fast, successful requests that get logged
+    SLOW_REQUEST_MS: int = 1000
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import secrets
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import get_settings
+from app.core.security import token_subject
+from app.db.mongodb import get_database
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADERS = {b"content-type", b"location"}
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for a retried POST carrying the same `Idempotency-Key`.
+
+    Keys are scoped to the caller and route. Completed responses are kept in
+    an in-memory LRU in front of the `idempotency_keys` collection, where a
+    TTL index expires them. A claim is inserted before the handler runs, so
+    a concurrent duplicate gets 409 instead of executing twice. A claim left
+    behind by a request that died is swapped out atomically, so only one
+    retry takes it over. Server errors release the claim, so the client can
+    retry.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = set(settings.IDEMPOTENCY_ROUTES)
+        self._cache: OrderedDict = OrderedDict()
+
+    def _remember(self, key: str, record: dict) -> None:
+        self._cache[key] = record
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.IDEMPOTENCY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        record = self._cache.get(key)
+        if record is not None:
+            if now - record["created_at"] < timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS):
+                self._cache.move_to_end(key)
+                return record
+            del self._cache[key]
+
+        record = await get_database().idempotency_keys.find_one({"_id": key})
+        if record is not None and record["status"] == "completed":
+            self._remember(
+                key, {**record, "created_at": record["created_at"].replace(tzinfo=timezone.utc)}
+            )
+        return record
+
+    async def _claim(self, claim: dict) -> Optional[dict]:
+        """Claim the key for this request, or return the record of whoever holds or completed it."""
+        collection = get_database().idempotency_keys
+        lock = timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+        while True:
+            record = await self._lookup(claim["_id"])
+            if record is None:
+                try:
+                    await collection.insert_one(claim)
+                    return None
+                except DuplicateKeyError:
+                    continue
+            if (
+                record["status"] == "completed"
+                or claim["created_at"] - record["created_at"].replace(tzinfo=timezone.utc) <= lock
+            ):
+                return record
+            # The request holding this claim died without finishing; one retry takes it over
+            stale = {"_id": claim["_id"], "status": "in_progress", "owner": record.get("owner")}
+            if await collection.find_one_and_replace(stale, claim) is not None:
+                return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or f"{scope['method']} {scope['path']}" not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        idempotency_key = headers.get(b"idempotency-key", b"").decode("latin-1").strip()
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > 255:
+            await _send_json(send, 400, b'{"detail":"Idempotency-Key is too long"}')
+            return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        subject = token_subject(headers.get(b"authorization", b"").decode("latin-1"))
+        key = hashlib.sha256(
+            f"{subject}|{scope['method']}|{scope['path']}|{idempotency_key}".encode()
+        ).hexdigest()
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        created_at = datetime.now(timezone.utc)
+        owner = secrets.token_hex(8)
+        try:
+            record = await self._claim(
+                {
+                    "_id": key,
+                    "status": "in_progress",
+                    "owner": owner,
+                    "fingerprint": fingerprint,
+                    "created_at": created_at,
+                }
+            )
+        except Exception as e:
+            # Without the store we cannot deduplicate; serve the request normally
+            logger.warning("Idempotency store unavailable: %s", e)
+            await self.app(scope, _replay_body(body, receive), send)
+            return
+
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                await _send_json(
+                    send, 422, b'{"detail":"Idempotency-Key was reused with a different request body"}'
+                )
+            elif record["status"] != "completed":
+                await _send_json(
+                    send, 409, b'{"detail":"A request with this Idempotency-Key is in progress"}'
+                )
+            else:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": record["status_code"],
+                        "headers": [
+                            *[(k.encode(), v.encode()) for k, v in record["headers"]],
+                            (b"idempotent-replayed", b"true"),
+                        ],
+                    }
+                )
+                await send({"type": "http.response.body", "body": record["body"]})
+            return
+
+        response = {"status_code": 500, "headers": [], "body": b""}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status_code"] = message["status"]
+                response["headers"] = [
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in message.get("headers", [])
+                    if k.lower() in REPLAYED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+        finally:
+            collection = get_database().idempotency_keys
+            if response["status_code"] >= 500:
+                await collection.delete_one({"_id": key, "owner": owner})
+            else:
+                completed = {
+                    "status": "completed",
+                    "status_code": response["status_code"],
+                    "headers": response["headers"],
+                    "body": response["body"],
+                }
+                # Upsert: the claim may have expired and been removed while the handler ran
+                await collection.update_one(
+                    {"_id": key},
+                    {
+                        "$set": completed,
+                        "$setOnInsert": {"fingerprint": fingerprint, "created_at": created_at},
+                    },
+                    upsert=True,
+                )
+                self._remember(
+                    key, {"fingerprint": fingerprint, "created_at": created_at, **completed}
+                )
+
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
+
+
+async def _send_json(send, status_code: int, body: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
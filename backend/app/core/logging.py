@@ -0,0 +1,165 @@
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.security import token_subject
+
+settings = get_settings()
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+access_logger = logging.getLogger("app.access")
+_listener: Optional[QueueListener] = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the request context of the task that logged them.
+
+    Runs on the queue handler, i.e. in the caller, because the listener
+    thread can't see the caller's contextvars.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging() -> None:
+    """Route all logging through a queue drained by a background thread.
+
+    Handlers that write to stdout or files block; with the queue the event
+    loop only pays for an append.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_JSON:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+        )
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+    # Uvicorn's own access log would duplicate ours
+    logging.getLogger("uvicorn.access").disabled = True
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class AccessLogMiddleware:
+    """Assign every request an id and write one access record per request.
+
+    The id is taken from an incoming `X-Request-ID` header when present,
+    echoed back on the response, and visible to every log call made while
+    handling the request. Errors and slow requests are always logged;
+    other requests are sampled at `ACCESS_LOG_SAMPLE_RATE`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        request_token = request_id_var.set(request_id)
+        user_token = user_id_var.set(
+            token_subject(headers.get(b"authorization", b"").decode("latin-1"))
+        )
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            slow = duration_ms >= settings.SLOW_REQUEST_MS
+            if status_code >= 500:
+                level = logging.ERROR
+            elif slow:
+                level = logging.WARNING
+            elif random.random() < settings.ACCESS_LOG_SAMPLE_RATE:
+                level = logging.INFO
+            else:
+                level = None
+            if level is not None:
+                access_logger.log(
+                    level,
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        "slow": slow,
+                        "client_ip": (scope.get("client") or ("",))[0],
+                    },
+                )
+            request_id_var.reset(request_token)
+            user_id_var.reset(user_token)
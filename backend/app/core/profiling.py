@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+
+from bson import Binary, ObjectId
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+
+from app.core.config import get_settings
+from app.core.logging import request_id_var
+from app.core.security import token_claims
+from app.db.mongodb import get_global_database
+from app.db.query_timeline import QueryTimeline, current_timeline
+from app.db.tenancy import DEFAULT_TENANT
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Keeps a runaway request (e.g. an N+1 loop) from producing an oversized document
+MAX_TIMELINE_COMMANDS = 2000
+
+
+class ProfilerMiddleware:
+    """Run selected requests under pyinstrument and store a speedscope profile.
+
+    Admins opt a request in with an `X-Profile: 1` header or `?profile=1`;
+    the flag is ignored for everyone else. `PROFILE_SAMPLE_RATE` also
+    profiles a share of all requests, optionally only those under
+    `PROFILE_SAMPLE_PATHS`. Alongside the flamegraph we keep the database
+    commands the request issued. The stored profile's id is returned in
+    `X-Profile-Id`.
+
+    Requests that aren't selected go straight through, with no profiler or
+    timeline attached.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger, claims = _select(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        await self._profile(scope, receive, send, trigger, claims)
+
+    async def _profile(self, scope, receive, send, trigger: str, claims: dict):
+        profile_id = ObjectId()
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode("latin-1"))
+                ]
+            await send(message)
+
+        timeline = QueryTimeline()
+        timeline_token = current_timeline.set(timeline)
+        profiler = Profiler(interval=settings.PROFILE_INTERVAL_MS / 1000, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session = profiler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            current_timeline.reset(timeline_token)
+            # The response has been sent; storing the profile only delays this task
+            try:
+                await _save_profile(
+                    profile_id, scope, status_code, duration_ms, trigger, claims, session, timeline
+                )
+            except Exception as e:
+                logger.warning("Could not store request profile: %s", e)
+
+
+def _select(scope) -> tuple:
+    """Return (trigger, token claims) for a request to profile, or (None, None)."""
+    authorization = ""
+    flagged = False
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            authorization = value.decode("latin-1")
+        elif name == b"x-profile":
+            flagged = value in (b"1", b"true")
+    query = scope.get("query_string", b"")
+    if not flagged and b"profile=" in query:
+        flagged = parse_qs(query.decode("latin-1")).get("profile", [""])[0] in ("1", "true")
+
+    if flagged:
+        claims = token_claims(authorization)
+        if claims and claims.get("role") == "ADMIN":
+            return "requested", claims
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        paths = settings.PROFILE_SAMPLE_PATHS
+        if not paths or any(scope["path"].startswith(p) for p in paths):
+            return "sampled", token_claims(authorization) or {}
+    return None, None
+
+
+def _render(session) -> Optional[bytes]:
+    data = gzip.compress(SpeedscopeRenderer().render(session).encode())
+    return data if len(data) <= settings.PROFILE_MAX_BYTES else None
+
+
+async def _save_profile(
+    profile_id: ObjectId,
+    scope,
+    status_code: int,
+    duration_ms: float,
+    trigger: str,
+    claims: dict,
+    session,
+    timeline: QueryTimeline,
+) -> None:
+    speedscope = await asyncio.to_thread(_render, session)
+    now = datetime.now(timezone.utc)
+    await get_global_database().request_profiles.insert_one(
+        {
+            "_id": profile_id,
+            "tenant_id": claims.get("tid", DEFAULT_TENANT),
+            "user_id": claims.get("sub"),
+            "request_id": request_id_var.get(),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status_code,
+            "trigger": trigger,
+            "duration_ms": round(duration_ms, 2),
+            "cpu_ms": round(session.cpu_time * 1000, 2),
+            "db": timeline.summary(),
+            "db_commands": timeline.commands[:MAX_TIMELINE_COMMANDS],
+            "speedscope": Binary(speedscope) if speedscope else None,
+            "created_at": now,
+            "expires_at": now + timedelta(hours=settings.PROFILE_RETENTION_HOURS),
+        }
+    )
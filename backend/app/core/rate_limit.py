@@ -0,0 +1,150 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from app.core.config import get_settings
+from app.core.security import token_subject
+
+settings = get_settings()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_policy(policy: str) -> Tuple[int, float]:
+    """Parse "10/minute" or "10/60" into (capacity, period in seconds)."""
+    count, _, period = policy.partition("/")
+    seconds = PERIODS.get(period.strip()) or float(period)
+    return int(count), seconds
+
+
+class TokenBucketStore:
+    """Token buckets in insertion-ordered LRU order.
+
+    Every access moves a bucket to the end, so idle buckets collect at the
+    front and are evicted there in O(1) per bucket. The store never holds
+    more than `max_buckets` entries.
+    """
+
+    def __init__(self, max_buckets: int, idle_seconds: float):
+        self.max_buckets = max_buckets
+        self.idle_seconds = idle_seconds
+        self._buckets: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key, capacity: int, period: float) -> Tuple[bool, float, float]:
+        """Try to take one token. Returns (allowed, tokens left, seconds until a token frees up)."""
+        now = time.monotonic()
+        rate = capacity / period
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = float(capacity)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._evict(now)
+        return allowed, tokens, 0.0 if allowed else (1 - tokens) / rate
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            key, (_, last_seen) = next(iter(self._buckets.items()))
+            if len(self._buckets) <= self.max_buckets and now - last_seen < self.idle_seconds:
+                break
+            del self._buckets[key]
+
+
+class RateLimitMiddleware:
+    """Per-route token-bucket limits keyed by the JWT subject, or the client IP."""
+
+    def __init__(self, app):
+        self.app = app
+        self.store = TokenBucketStore(
+            settings.RATE_LIMIT_MAX_BUCKETS, settings.RATE_LIMIT_IDLE_SECONDS
+        )
+        # Longest route prefix wins, so check the most specific policies first
+        self.policies = sorted(
+            (
+                (route.partition(" ")[0], route.partition(" ")[2], parse_policy(policy))
+                for route, policy in settings.RATE_LIMIT_POLICIES.items()
+                if route != "*"
+            ),
+            key=lambda p: len(p[1]),
+            reverse=True,
+        )
+        self.default_policy = (
+            parse_policy(settings.RATE_LIMIT_POLICIES["*"])
+            if "*" in settings.RATE_LIMIT_POLICIES
+            else None
+        )
+
+    def _match(self, method: str, path: str):
+        for policy_method, prefix, limits in self.policies:
+            if policy_method in (method, "*") and path.startswith(prefix):
+                return f"{policy_method} {prefix}", limits
+        if self.default_policy:
+            return "*", self.default_policy
+        return None, None
+
+    def _client_key(self, scope) -> str:
+        headers = dict(scope.get("headers") or [])
+        subject = token_subject(headers.get(b"authorization", b"").decode("latin-1"))
+        if subject:
+            return f"user:{subject}"
+        forwarded = headers.get(b"x-forwarded-for")
+        if settings.RATE_LIMIT_TRUST_PROXY and forwarded:
+            # The right-most entry is the one added by our own proxy
+            return f"ip:{forwarded.decode('latin-1').split(',')[-1].strip()}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        policy_name, limits = self._match(scope["method"], scope["path"])
+        if policy_name is None:
+            await self.app(scope, receive, send)
+            return
+
+        capacity, period = limits
+        allowed, tokens, retry_after = self.store.take(
+            (policy_name, self._client_key(scope)), capacity, period
+        )
+        reset = math.ceil((capacity - tokens) * period / capacity)
+        limit_headers = [
+            (b"ratelimit-limit", str(capacity).encode()),
+            (b"ratelimit-remaining", str(int(tokens)).encode()),
+            (b"ratelimit-reset", str(reset).encode()),
+        ]
+
+        if not allowed:
+            body = json.dumps({"detail": "Too many requests"}).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode()),
+                        (b"retry-after", str(math.ceil(retry_after)).encode()),
+                        *limit_headers,
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *limit_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.db.mongodb import get_database
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationSet:
+    """Per-user "not before" times for access tokens, mirrored from Mongo.
+
+    Access tokens are verified without a database read, so revoking one
+    (e.g. when a user is deleted) means rejecting every token the user was
+    issued before a cutoff. An entry only matters until the last token it
+    could affect expires, so the set stays as small as the number of users
+    revoked within one access token lifetime. A revocation can spare one
+    session (`sid` claim), e.g. the device that changed the password.
+    """
+
+    def __init__(self):
+        # user id -> (not before, session spared)
+        self._not_before: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._not_before)
+
+    def is_revoked(
+        self, user_id: str, issued_at: float, session_id: Optional[str] = None
+    ) -> bool:
+        entry = self._not_before.get(user_id)
+        if entry is None:
+            return False
+        not_before, kept_session = entry
+        return issued_at < not_before and (kept_session is None or session_id != kept_session)
+
+    async def revoke(self, user_id: str, keep_session: Optional[str] = None) -> None:
+        now = time.time()
+        self._not_before[user_id] = (now, keep_session)
+        await get_database().token_revocations.update_one(
+            {"_id": user_id},
+            {
+                "$set": {
+                    "not_before": now,
+                    "kept_session": keep_session,
+                    "expires_at": datetime.now(timezone.utc)
+                    + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+                }
+            },
+            upsert=True,
+        )
+
+    async def sync(self) -> None:
+        """Reload entries so revocations made by other app instances apply here too."""
+        cutoff = time.time() - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        docs = await get_database().token_revocations.find(
+            {"not_before": {"$gt": cutoff}}
+        ).to_list(None)
+        fresh = {doc["_id"]: (doc["not_before"], doc.get("kept_session")) for doc in docs}
+        # Keep local revocations whose write landed after the read above
+        for user_id, entry in self._not_before.items():
+            if entry[0] > cutoff and user_id not in fresh:
+                fresh[user_id] = entry
+        self._not_before = fresh
+
+    async def start(self, interval: float) -> None:
+        try:
+            await self.sync()
+        except Exception as e:
+            logger.warning("Token revocation sync failed: %s", e)
+        self._task = asyncio.create_task(self._run(interval), name="revocation-sync")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Token revocation sync failed: %s", e)
+
+
+revocations = RevocationSet()
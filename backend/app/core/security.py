@@ -1,5 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import List, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -7,31 +9,100 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import get_settings
-from app.db.mongodb import get_database
+from app.core.revocation import revocations
+from app.db.tenancy import DEFAULT_TENANT, current_tenant
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 settings = get_settings()
 
+# Hashes made at any other cost report `needs_update`, so a changed BCRYPT_ROUNDS
+# is applied to each account the next time it logs in
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a thread pool hashes on several cores at once
+hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(hash_executor, hash_password, p) for p in passwords)
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(hash_executor, hash_password, password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    # A verify costs as much as a hash; keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        hash_executor, verify_password, plain_password, hashed_password
+    )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (
+    now = datetime.now(timezone.utc)
+    expire = now + (
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
+    # Sub-second iat so a revocation never catches a token issued right after it
+    to_encode.update({"exp": expire, "iat": now.timestamp()})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def user_claims(user: dict) -> dict:
+    """Everything request handlers need to know about the caller, carried in the access token."""
+    return {
+        "sub": str(user["_id"]),
+        "role": user["role"],
+        "name": user["name"],
+        "email": user["email"],
+        "tid": user.get("tenant_id", DEFAULT_TENANT),
+    }
+
+
+def token_claims(authorization: str) -> Optional[dict]:
+    """Return the claims of a valid bearer token header without touching the database."""
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        return jwt.decode(
+            authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+
+
+def token_subject(authorization: str) -> Optional[str]:
+    claims = token_claims(authorization)
+    return claims.get("sub") if claims else None
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,15 +120,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
 
-    db = get_database()
-    from bson import ObjectId
-
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    if user is None:
+    # Tokens are short-lived and self-contained; only explicit revocations need checking
+    if revocations.is_revoked(user_id, payload.get("iat", 0), payload.get("sid")):
         raise credentials_exception
 
-    user["_id"] = str(user["_id"])
-    return user
+    # Every get_database() call made for this request is now confined to the caller's tenant
+    tenant_id = payload.get("tid", DEFAULT_TENANT)
+    current_tenant.set(tenant_id)
+    return {
+        "_id": user_id,
+        "role": role,
+        "name": payload.get("name", ""),
+        "email": payload.get("email", ""),
+        "tenant_id": tenant_id,
+        "session_id": payload.get("sid"),
+    }
 
 
 async def get_current_admin(current_user: dict = Depends(get_current_user)):
@@ -69,6 +146,16 @@ async def get_current_admin(current_user: dict = Depends(get_current_user)):
     return current_user
 
 
+async def get_platform_admin(admin: dict = Depends(get_current_admin)):
+    """Admins of the default tenant, who operate the deployment as a whole."""
+    if admin["tenant_id"] != DEFAULT_TENANT:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Platform admin access required",
+        )
+    return admin
+
+
 async def get_current_employee(current_user: dict = Depends(get_current_user)):
     if current_user.get("role") != "EMPLOYEE":
         raise HTTPException(
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Hashable
+
+from pymongo.errors import ConnectionFailure
+
+from app.core.config import get_settings
+from app.db.circuit_breaker import DatabaseUnavailable
+from app.db.tenancy import current_tenant
+
+settings = get_settings()
+
+DATABASE_DOWN_ERRORS = (DatabaseUnavailable, ConnectionFailure)
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key.
+
+    The shared call runs as its own task, so a caller that disconnects or is
+    cancelled does not cancel the work the other callers are waiting on.
+    The last result per key is kept in a bounded LRU and served stale while
+    the database is unreachable.
+    """
+
+    def __init__(self, stale_entries: int):
+        self._inflight: dict = {}
+        self._last_good: OrderedDict = OrderedDict()
+        self._stale_entries = stale_entries
+        self.stats = defaultdict(
+            lambda: {"calls": 0, "executions": 0, "coalesced": 0, "stale": 0}
+        )
+
+    async def do(self, name: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        stats = self.stats[name]
+        stats["calls"] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            stats["executions"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            stats["coalesced"] += 1
+        try:
+            result = await asyncio.shield(task)
+        except DATABASE_DOWN_ERRORS:
+            if key not in self._last_good:
+                raise
+            stats["stale"] += 1
+            return self._last_good[key]
+
+        self._last_good[key] = result
+        self._last_good.move_to_end(key)
+        if len(self._last_good) > self._stale_entries:
+            self._last_good.popitem(last=False)
+        return result
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def metrics(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "stale_entries": len(self._last_good),
+            "functions": {name: dict(stats) for name, stats in self.stats.items()},
+        }
+
+
+singleflight = SingleFlight(settings.STALE_READ_CACHE_SIZE)
+
+
+def coalesce(fn):
+    """Coalesce concurrent calls of an idempotent read with identical arguments.
+
+    Every caller receives the same result object, so it must not be mutated.
+    Calls are only shared within a tenant.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = (name, current_tenant.get(), args, tuple(sorted(kwargs.items())))
+        return await singleflight.do(name, key, lambda: fn(*args, **kwargs))
+
+    return wrapper
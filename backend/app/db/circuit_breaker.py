@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from fastapi import HTTPException, status
+from pymongo import monitoring
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DatabaseUnavailable(HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+class CircuitBreaker:
+    """Trip on consecutive database failures or a slow p95, and fail fast while tripped.
+
+    CLOSED: every call goes through; failures and latencies are recorded.
+    OPEN: calls are rejected immediately for `open_seconds`.
+    HALF_OPEN: a single probe (a ping) decides whether to close or re-open.
+
+    Outcomes are reported from pymongo's monitoring threads as well as the
+    event loop, so state changes take a lock.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        latency_threshold_ms: float,
+        latency_window: int,
+        open_seconds: float,
+    ):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold_ms = latency_threshold_ms
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._since_check = 0
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0, "failures": 0, "probes": 0}
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def check(self) -> None:
+        """Raise `DatabaseUnavailable` unless calls are currently allowed."""
+        if self.state == CLOSED:
+            return
+        self.stats["rejected"] += 1
+        raise DatabaseUnavailable(self.retry_after())
+
+    def record_success(self, duration_ms: float) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._latencies.append(duration_ms)
+            self._since_check += 1
+            # Re-evaluating the percentile every few samples keeps the hot path cheap
+            if self._since_check < 20 or len(self._latencies) < self._latencies.maxlen // 2:
+                return
+            self._since_check = 0
+            p95 = self.latency_p95()
+        if p95 is not None and p95 > self.latency_threshold_ms:
+            self.trip(f"p95 latency {p95:.0f} ms over {self.latency_threshold_ms:.0f} ms")
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            self.last_error = error
+            tripped = self.consecutive_failures >= self.failure_threshold
+        if tripped:
+            self.trip(error)
+
+    def trip(self, reason: str) -> None:
+        with self._lock:
+            if self.state == OPEN:
+                return
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.last_error = reason
+            self._latencies.clear()
+            self.stats["opened"] += 1
+        logger.error("Database circuit opened: %s", reason)
+
+    def ready_for_probe(self) -> bool:
+        with self._lock:
+            if self.state != OPEN or self.retry_after() > 0:
+                return False
+            self.state = HALF_OPEN
+            self.stats["probes"] += 1
+            return True
+
+    def probe_succeeded(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+        logger.info("Database circuit closed")
+
+    def probe_failed(self, error: str) -> None:
+        with self._lock:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.last_error = error
+        logger.warning("Database probe failed, circuit stays open: %s", error)
+
+    def latency_p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def metrics(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_p95_ms": self.latency_p95(),
+            "retry_after_seconds": self.retry_after() if self.state != CLOSED else 0,
+            "last_error": self.last_error,
+            **self.stats,
+        }
+
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.DB_BREAKER_FAILURE_THRESHOLD,
+    latency_threshold_ms=settings.DB_BREAKER_LATENCY_P95_MS,
+    latency_window=settings.DB_BREAKER_LATENCY_WINDOW,
+    open_seconds=settings.DB_BREAKER_OPEN_SECONDS,
+)
+
+
+class BreakerCommandListener(monitoring.CommandListener):
+    """Feed command outcomes to the breaker.
+
+    Only network-level failures count; a server reply such as a duplicate
+    key error means the database is up.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        breaker.record_success(event.duration_micros / 1000)
+
+    def failed(self, event):
+        if "errtype" in event.failure:
+            breaker.record_failure(f"{event.command_name}: {event.failure.get('errmsg')}")
+        else:
+            breaker.record_success(event.duration_micros / 1000)
+
+
+class BreakerHeartbeatListener(monitoring.ServerHeartbeatListener):
+    """Background heartbeats notice an outage even when no request is running."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        breaker.record_failure(f"heartbeat to {event.connection_id}: {event.reply}")
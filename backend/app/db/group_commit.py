@@ -0,0 +1,106 @@
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.db.mongodb import get_database
+from app.db.tenancy import current_tenant, tenant_scope
+
+
+class GroupCommitBuffer:
+    """Queue inserts in memory and write them with batched `insert_many` calls.
+
+    A batch is flushed when it reaches `max_batch` documents or when the
+    oldest queued document has waited `window_ms`, whichever comes first.
+    `insert()` resolves only once its batch has been acknowledged, so
+    callers keep the durability of a plain `insert_one`. Documents are
+    stamped with the submitting request's tenant and each tenant's share of
+    a batch is prepared and written in that tenant's scope.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_batch: int,
+        window_ms: int,
+        prepare: Optional[Callable[[list], Awaitable[None]]] = None,
+    ):
+        self.collection_name = collection_name
+        self.max_batch = max_batch
+        self.window_ms = window_ms
+        self.prepare = prepare
+        self._pending: list = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+
+    def submit(self, doc: dict) -> asyncio.Future:
+        """Queue a document and return a future resolved when it is written."""
+        doc.setdefault("_id", ObjectId())
+        doc.setdefault("tenant_id", current_tenant.get())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((doc, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window_ms / 1000, self._schedule_flush
+            )
+        return future
+
+    async def insert(self, doc: dict) -> dict:
+        await self.submit(doc)
+        return doc
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        by_tenant = defaultdict(list)
+        for i, (doc, _) in enumerate(batch):
+            by_tenant[doc["tenant_id"]].append(i)
+        failed = {}
+        for tenant_id, positions in by_tenant.items():
+            with tenant_scope(tenant_id):
+                failed.update(await self._write([batch[i][0] for i in positions], positions))
+
+        for i, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if i in failed:
+                future.set_exception(failed[i])
+            else:
+                future.set_result(None)
+
+    async def _write(self, docs: list, positions: list) -> dict:
+        """Insert one tenant's documents; return {batch position: exception} for failures."""
+        try:
+            if self.prepare is not None:
+                await self.prepare(docs)
+            await get_database()[self.collection_name].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            return {
+                positions[error["index"]]: BulkWriteError(
+                    {"writeErrors": [error], "nInserted": 0}
+                )
+                for error in e.details.get("writeErrors", [])
+            }
+        except Exception as e:
+            return {i: e for i in positions}
+        return {}
+
+    async def close(self) -> None:
+        """Flush whatever is queued and wait for in-flight batches."""
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
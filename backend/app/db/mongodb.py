@@ -1,20 +1,40 @@
+import asyncio
+import logging
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
 from app.core.config import get_settings
+from app.db.circuit_breaker import (
+    BreakerCommandListener,
+    BreakerHeartbeatListener,
+    breaker,
+)
+from app.db.query_timeline import TimelineCommandListener
+from app.db.tenancy import TenantDatabase, current_tenant
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
 client: AsyncIOMotorClient = None
 database: AsyncIOMotorDatabase = None
+indexes_ready = False
+_probe_task: Optional[asyncio.Task] = None
 
 
 async def connect_to_mongo():
-    global client, database
+    global client, database, indexes_ready
     try:
         client = AsyncIOMotorClient(
             settings.MONGO_URI,
             serverSelectionTimeoutMS=5000,
             connectTimeoutMS=5000,
             socketTimeoutMS=5000,
+            event_listeners=[
+                BreakerCommandListener(),
+                BreakerHeartbeatListener(),
+                TimelineCommandListener(),
+            ],
         )
         db_name = settings.MONGO_URI.split("/")[-1].split("?")[0]
         if not db_name:
@@ -22,20 +42,199 @@ async def connect_to_mongo():
         database = client[db_name]
         # Quick ping to verify connection
         await client.admin.command("ping")
-        await database.users.create_index("email", unique=True)
-        print(f"Connected to MongoDB: {db_name}")
+        await ensure_indexes()
+        indexes_ready = True
+        logger.info("Connected to MongoDB: %s", db_name)
     except Exception as e:
-        print(f"WARNING: MongoDB connection failed: {e}")
-        print("The app will start but database operations will fail.")
-        print(f"MONGO_URI starts with: {settings.MONGO_URI[:30]}...")
+        logger.warning(
+            "MongoDB connection failed: %s. Requests fail fast until a probe reconnects.",
+            e,
+            extra={"mongo_uri_prefix": settings.MONGO_URI[:30]},
+        )
+        breaker.trip(f"startup: {e}")
+    _start_probes()
+
+
+def _start_probes() -> None:
+    global _probe_task
+    if _probe_task is None:
+        _probe_task = asyncio.create_task(_probe_while_open(), name="db-breaker-probe")
+
+
+async def _probe_while_open() -> None:
+    """Ping the database whenever an open circuit's cool-down has passed."""
+    global indexes_ready
+    while True:
+        await asyncio.sleep(1)
+        if client is None or not breaker.ready_for_probe():
+            continue
+        try:
+            await asyncio.wait_for(
+                client.admin.command("ping"), settings.DB_BREAKER_PROBE_TIMEOUT_SECONDS
+            )
+            if not indexes_ready:
+                await ensure_indexes()
+                indexes_ready = True
+        except Exception as e:
+            breaker.probe_failed(str(e) or type(e).__name__)
+        else:
+            breaker.probe_succeeded()
+
+
+# Single-tenant indexes superseded by the tenant-led ones below
+OBSOLETE_INDEXES = {
+    "jobs": ["type_1_created_at_-1"],
+    "users": ["seq_1", "role_1_created_at_-1", "name_text_email_text",
+              "role_1_active_projects_1__id_1", "created_at_1"],
+    "services": ["seq_1", "name_text_description_text"],
+    "service_requests": ["seq_1", "status_1_created_at_-1", "client_id_1_created_at_-1",
+                         "created_at_1"],
+    "projects": ["seq_1", "status_1_created_at_-1", "client_id_1_created_at_-1",
+                 "employee_ids_1_created_at_-1", "name_text_description_text", "created_at_1"],
+    "messages": ["seq_1", "sender_id_1_created_at_-1", "receiver_id_1_created_at_-1"],
+    "tombstones": ["seq_1_collection_1"],
+    "message_archive": ["participants_1_month_-1"],
+    "attachments.files": ["metadata.project_id_1_uploadDate_-1"],
+    "project_activity": ["project_id_1_at_1", "type_1_at_1"],
+}
+
+
+async def drop_obsolete_indexes():
+    for name, index_names in OBSOLETE_INDEXES.items():
+        existing = await database[name].index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                try:
+                    await database[name].drop_index(index_name)
+                except OperationFailure as e:
+                    logger.warning("Could not drop index %s.%s: %s", name, index_name, e)
+
+
+async def ensure_indexes():
+    await drop_obsolete_indexes()
+    # Emails identify a login across every tenant, so they stay globally unique
+    await database.users.create_index("email", unique=True)
+
+    # Every tenant-owned index leads with tenant_id, so each organization's
+    # queries only walk its own slice of the index.
+    # Delta sync: every synced collection is scanned by its change sequence
+    for name in ("users", "services", "service_requests", "projects", "messages"):
+        await database[name].create_index([("tenant_id", 1), ("seq", 1)])
+    await database.tombstones.create_index([("tenant_id", 1), ("seq", 1), ("collection", 1)])
+
+    # Admin list filters, sorts and text search
+    await database.users.create_index([("tenant_id", 1), ("role", 1), ("created_at", -1)])
+    await database.users.create_index([("tenant_id", 1), ("name", "text"), ("email", "text")])
+    await database.users.create_index(
+        [("tenant_id", 1), ("role", 1), ("active_projects", 1), ("_id", 1)]
+    )
+    await database.services.create_index(
+        [("tenant_id", 1), ("name", "text"), ("description", "text")]
+    )
+    await database.service_requests.create_index(
+        [("tenant_id", 1), ("status", 1), ("created_at", -1)]
+    )
+    await database.service_requests.create_index(
+        [("tenant_id", 1), ("client_id", 1), ("created_at", -1)]
+    )
+    await database.projects.create_index([("tenant_id", 1), ("status", 1), ("created_at", -1)])
+    await database.projects.create_index([("tenant_id", 1), ("client_id", 1), ("created_at", -1)])
+    await database.projects.create_index(
+        [("tenant_id", 1), ("employee_ids", 1), ("created_at", -1)]
+    )
+    await database.projects.create_index(
+        [("tenant_id", 1), ("name", "text"), ("description", "text")]
+    )
+    for name in ("users", "service_requests", "projects"):
+        await database[name].create_index([("tenant_id", 1), ("created_at", -1)])
+
+    # Conversation reads, retention scans and the monthly archive buckets
+    await database.messages.create_index(
+        [("tenant_id", 1), ("sender_id", 1), ("created_at", -1)]
+    )
+    await database.messages.create_index(
+        [("tenant_id", 1), ("receiver_id", 1), ("created_at", -1)]
+    )
+    # The retention scan runs across all tenants
+    await database.messages.create_index("created_at")
+    # A retried broadcast skips the recipients it already reached
+    await database.messages.create_index(
+        [("tenant_id", 1), ("broadcast_id", 1), ("receiver_id", 1)],
+        unique=True,
+        partialFilterExpression={"broadcast_id": {"$exists": True}},
+    )
+    await database.message_archive.create_index(
+        [("tenant_id", 1), ("participants", 1), ("month", -1)]
+    )
+    await database.message_archive.create_index(
+        [("tenant_id", 1), ("conversation", 1), ("month", 1), ("count", 1)]
+    )
+    # Lets an interrupted archive run find the messages it already moved
+    await database.message_archive.create_index("messages._id")
+    await database.message_archive.create_index("expires_at", expireAfterSeconds=0)
+
+    # Attachments stored in GridFS
+    await database["attachments.files"].create_index(
+        [("metadata.tenant_id", 1), ("metadata.project_id", 1), ("uploadDate", -1)]
+    )
+
+    # Project activity log: per-project timelines and time-ranged metrics
+    await database.project_activity.create_index(
+        [("tenant_id", 1), ("project_id", 1), ("at", 1)]
+    )
+    await database.project_activity.create_index([("tenant_id", 1), ("type", 1), ("at", 1)])
+
+    # Daily rollups are read as a date range per tenant
+    await database.daily_rollups.create_index([("tenant_id", 1), ("day", 1)])
+
+    # Idempotency-Key records expire after the retry window
+    await database.idempotency_keys.create_index(
+        "created_at", expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS
+    )
+
+    # Request profiles are listed newest first and expire after the retention window
+    await database.request_profiles.create_index([("tenant_id", 1), ("created_at", -1)])
+    await database.request_profiles.create_index("expires_at", expireAfterSeconds=0)
+
+    # Refresh token rotation and access token revocation
+    await database.refresh_tokens.create_index("family_id")
+    await database.refresh_tokens.create_index("user_id")
+    await database.refresh_tokens.create_index("expires_at", expireAfterSeconds=0)
+    await database.token_revocations.create_index("expires_at", expireAfterSeconds=0)
+
+    # Background job claims and idempotent enqueue
+    await database.jobs.create_index([("status", 1), ("run_after", 1)])
+    await database.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+    await database.jobs.create_index([("tenant_id", 1), ("type", 1), ("created_at", -1)])
+    await database.jobs.create_index([("tenant_id", 1), ("created_at", -1)])
+    await database.jobs.create_index(
+        "idempotency_key",
+        unique=True,
+        partialFilterExpression={"idempotency_key": {"$type": "string"}},
+    )
 
 
 async def close_mongo_connection():
-    global client
+    global client, _probe_task
+    if _probe_task is not None:
+        _probe_task.cancel()
+        await asyncio.gather(_probe_task, return_exceptions=True)
+        _probe_task = None
     if client:
         client.close()
-        print("Disconnected from MongoDB")
+        logger.info("Disconnected from MongoDB")
+
+
+def get_database() -> TenantDatabase:
+    """The database as seen by the current tenant.
+
+    Raises a 503 straight away while the circuit breaker is open.
+    """
+    breaker.check()
+    return TenantDatabase(database, current_tenant.get())
 
 
-def get_database() -> AsyncIOMotorDatabase:
+def get_global_database() -> AsyncIOMotorDatabase:
+    """The unscoped database, for cross-tenant work like login lookups and maintenance jobs."""
+    breaker.check()
     return database
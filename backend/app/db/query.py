@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, status
+
+
+def date_range(field: str, start: Optional[datetime], end: Optional[datetime]) -> dict:
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lte"] = end
+    return {field: bounds} if bounds else {}
+
+
+def text_search(search: Optional[str]) -> dict:
+    if search and search.strip():
+        return {"$text": {"$search": search.strip()}}
+    return {}
+
+
+def sort_spec(sort: str, allowed: set) -> list:
+    """Parse `field` / `-field` (comma separated) into a pymongo sort list."""
+    spec = []
+    for part in sort.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        direction = -1 if part.startswith("-") else 1
+        field = part.lstrip("-+")
+        if field not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort by '{field}'",
+            )
+        spec.append((field, direction))
+    # _id tiebreaker keeps paging stable across equal sort keys
+    spec.append(("_id", spec[-1][1] if spec else 1))
+    return spec
+
+
+async def find_page(collection, query: dict, sort: list, skip: int, limit: int) -> list:
+    cursor = collection.find(query).sort(sort).skip(skip).limit(limit)
+    return await cursor.to_list(limit)
+
+
+def lookup_names(from_collection: str, local_field: str, as_field: str) -> dict:
+    """$lookup stage that joins only `_id` and `name` of the referenced docs."""
+    return {
+        "$lookup": {
+            "from": from_collection,
+            "localField": local_field,
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"name": 1}}],
+            "as": as_field,
+        }
+    }
+
+
+async def aggregate_page(
+    collection, query: dict, sort: list, skip: int, limit: int, stages: list
+) -> list:
+    """Select one page first, then run the join stages only on that page."""
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort)},
+        {"$skip": skip},
+        {"$limit": limit},
+        *stages,
+    ]
+    return await collection.aggregate(pipeline).to_list(limit)
@@ -0,0 +1,64 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from pymongo import monitoring
+
+
+class QueryTimeline:
+    """The database commands issued while handling one profiled request.
+
+    Motor runs commands on executor threads with a copy of the caller's
+    context, so the listener finds the timeline of the request that issued
+    each command. Only command names, collections and timings are kept;
+    filters and documents may hold personal data.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands: list = []
+        self._pending: dict = {}
+
+    def command_started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get(event.command_name)
+        entry = {
+            "command": event.command_name,
+            "collection": target if isinstance(target, str) else None,
+            "start_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "duration_ms": None,
+            "ok": None,
+        }
+        self._pending[(event.connection_id, event.request_id)] = entry
+        self.commands.append(entry)
+
+    def command_finished(self, event, ok: bool) -> None:
+        entry = self._pending.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            entry["duration_ms"] = round(event.duration_micros / 1000, 3)
+            entry["ok"] = ok
+
+    def summary(self) -> dict:
+        finished = [c["duration_ms"] for c in self.commands if c["duration_ms"] is not None]
+        return {"count": len(self.commands), "total_ms": round(sum(finished), 3)}
+
+
+current_timeline: ContextVar[Optional[QueryTimeline]] = ContextVar("query_timeline", default=None)
+
+
+class TimelineCommandListener(monitoring.CommandListener):
+    """Record commands into the current request's timeline, if it is being profiled."""
+
+    def started(self, event):
+        timeline = current_timeline.get()
+        if timeline is not None:
+            timeline.command_started(event)
+
+    def succeeded(self, event):
+        timeline = current_timeline.get()
+        if timeline is not None:
+            timeline.command_finished(event, True)
+
+    def failed(self, event):
+        timeline = current_timeline.get()
+        if timeline is not None:
+            timeline.command_finished(event, False)
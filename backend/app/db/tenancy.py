@@ -0,0 +1,157 @@
+import copy
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from pymongo import InsertOne, ReplaceOne
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+DEFAULT_TENANT = settings.DEFAULT_TENANT_ID
+
+# Collections holding one organization's data, and the field naming the owner.
+# Everything else (counters, jobs' leases, tokens, idempotency keys) is keyed
+# by globally unique ids and stays shared.
+TENANT_COLLECTIONS = {
+    "users": "tenant_id",
+    "services": "tenant_id",
+    "service_requests": "tenant_id",
+    "projects": "tenant_id",
+    "messages": "tenant_id",
+    "message_archive": "tenant_id",
+    "project_activity": "tenant_id",
+    "daily_rollups": "tenant_id",
+    "tombstones": "tenant_id",
+    "attachment_usage": "tenant_id",
+    "attachments.files": "metadata.tenant_id",
+    "jobs": "tenant_id",
+    "request_profiles": "tenant_id",
+}
+
+current_tenant: ContextVar[str] = ContextVar("tenant_id", default=DEFAULT_TENANT)
+
+
+@contextmanager
+def tenant_scope(tenant_id: Optional[str]):
+    """Run a block (e.g. a background job) as `tenant_id`."""
+    token = current_tenant.set(tenant_id or DEFAULT_TENANT)
+    try:
+        yield
+    finally:
+        current_tenant.reset(token)
+
+
+class TenantCollection:
+    """A collection whose reads and writes are confined to one tenant.
+
+    Filters get a tenant equality, aggregations start with a tenant
+    `$match`, and inserted documents are stamped with the tenant unless
+    they already carry one (group commit batches are written from a
+    background task on behalf of whoever queued them). Every tenant index
+    leads with the tenant field, so a query only ever touches that
+    tenant's slice of the index.
+    """
+
+    def __init__(self, collection, tenant_id: str, field: str):
+        self._collection = collection
+        self._tenant_id = tenant_id
+        self._field = field
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._collection, name)
+
+    def _scope(self, filter: Optional[dict]) -> dict:
+        return {**(filter or {}), self._field: self._tenant_id}
+
+    def _stamp(self, doc: dict) -> dict:
+        if "." not in self._field:
+            doc.setdefault(self._field, self._tenant_id)
+        return doc
+
+    def _scope_operation(self, operation):
+        operation = copy.copy(operation)
+        if isinstance(operation, (InsertOne, ReplaceOne)):
+            operation._doc = self._stamp(operation._doc)
+        if hasattr(operation, "_filter"):
+            operation._filter = self._scope(operation._filter)
+        return operation
+
+    def find(self, filter: Optional[dict] = None, *args, **kwargs):
+        return self._collection.find(self._scope(filter), *args, **kwargs)
+
+    async def find_one(self, filter: Optional[dict] = None, *args, **kwargs):
+        return await self._collection.find_one(self._scope(filter), *args, **kwargs)
+
+    async def find_one_and_update(self, filter: dict, *args, **kwargs):
+        return await self._collection.find_one_and_update(self._scope(filter), *args, **kwargs)
+
+    async def find_one_and_delete(self, filter: dict, *args, **kwargs):
+        return await self._collection.find_one_and_delete(self._scope(filter), *args, **kwargs)
+
+    async def count_documents(self, filter: dict, *args, **kwargs):
+        return await self._collection.count_documents(self._scope(filter), *args, **kwargs)
+
+    async def distinct(self, key: str, filter: Optional[dict] = None, *args, **kwargs):
+        return await self._collection.distinct(key, self._scope(filter), *args, **kwargs)
+
+    async def update_one(self, filter: dict, *args, **kwargs):
+        return await self._collection.update_one(self._scope(filter), *args, **kwargs)
+
+    async def update_many(self, filter: dict, *args, **kwargs):
+        return await self._collection.update_many(self._scope(filter), *args, **kwargs)
+
+    async def replace_one(self, filter: dict, replacement: dict, *args, **kwargs):
+        return await self._collection.replace_one(
+            self._scope(filter), self._stamp(replacement), *args, **kwargs
+        )
+
+    async def delete_one(self, filter: dict, *args, **kwargs):
+        return await self._collection.delete_one(self._scope(filter), *args, **kwargs)
+
+    async def delete_many(self, filter: dict, *args, **kwargs):
+        return await self._collection.delete_many(self._scope(filter), *args, **kwargs)
+
+    async def insert_one(self, document: dict, *args, **kwargs):
+        return await self._collection.insert_one(self._stamp(document), *args, **kwargs)
+
+    async def insert_many(self, documents, *args, **kwargs):
+        return await self._collection.insert_many(
+            [self._stamp(doc) for doc in documents], *args, **kwargs
+        )
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        return await self._collection.bulk_write(
+            [self._scope_operation(op) for op in requests], *args, **kwargs
+        )
+
+    def aggregate(self, pipeline: list, *args, **kwargs):
+        # Merge into a leading $match rather than adding a stage: $text must stay first
+        if pipeline and "$match" in pipeline[0]:
+            pipeline = [{"$match": self._scope(pipeline[0]["$match"])}, *pipeline[1:]]
+        else:
+            pipeline = [{"$match": {self._field: self._tenant_id}}, *pipeline]
+        return self._collection.aggregate(pipeline, *args, **kwargs)
+
+
+class TenantDatabase:
+    """Database view that hands out tenant-confined collections for tenant data."""
+
+    def __init__(self, database, tenant_id: str):
+        self._database = database
+        self._tenant_id = tenant_id
+
+    def __getitem__(self, name: str):
+        collection = self._database[name]
+        field = TENANT_COLLECTIONS.get(name)
+        if field is None:
+            return collection
+        return TenantCollection(collection, self._tenant_id, field)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if hasattr(type(self._database), name):
+            return getattr(self._database, name)
+        return self[name]
@@ -1,16 +1,64 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
+from app.core.config import get_settings
+from app.core.logging import AccessLogMiddleware, setup_logging, shutdown_logging
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.revocation import revocations
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.profiling import ProfilerMiddleware
+from app.db.circuit_breaker import CLOSED, breaker
 from app.db.mongodb import connect_to_mongo, close_mongo_connection
-from app.routers import auth, admin, employee, client, messages
+from app.routers import (
+    auth,
+    admin,
+    employee,
+    client,
+    messages,
+    sync,
+    jobs,
+    attachments,
+    search,
+    profiles,
+)
+from app.services import job_handlers  # noqa: F401  (registers job types)
+from app.services import migrations  # noqa: F401  (registers data migrations)
+from app.services.job_service import worker_pool
+from app.services.migration_service import schedule_pending_migrations
+from app.services.message_service import message_buffer
+from app.services.activity_service import activity_buffer
+from app.services.analytics_service import rollups
+from app.services.typeahead_service import typeahead
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_logging()
     await connect_to_mongo()
+    await worker_pool.start(settings.JOB_WORKERS)
+    if settings.MIGRATIONS_AUTO_RUN:
+        await schedule_pending_migrations()
+    if settings.MESSAGE_RETENTION_DAYS > 0:
+        worker_pool.schedule(
+            "messages.archive", settings.MESSAGE_ARCHIVE_INTERVAL_MINUTES * 60
+        )
+    await rollups.start(settings.ROLLUP_FLUSH_INTERVAL_SECONDS)
+    await revocations.start(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+    await typeahead.start(settings.TYPEAHEAD_REBUILD_SECONDS)
     yield
+    await typeahead.stop()
+    await revocations.stop()
+    await rollups.stop()
+    await worker_pool.stop()
+    await message_buffer.close()
+    await activity_buffer.close()
     await close_mongo_connection()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -20,6 +68,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Idempotency replays sit innermost, so a replayed request still counts against rate limits
+app.add_middleware(IdempotencyMiddleware)
+
+# Rate limiting sits inside CORS so 429 responses still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,14 +81,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Profiling wraps everything below it, and runs inside access logging so profiles carry the request id
+app.add_middleware(ProfilerMiddleware)
+
+# Access logging sits outermost so every response, including CORS and 429 rejections, is logged
+app.add_middleware(AccessLogMiddleware)
+
 # Routers
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(employee.router)
 app.include_router(client.router)
 app.include_router(messages.router)
+app.include_router(sync.router)
+app.include_router(jobs.router)
+app.include_router(attachments.router)
+app.include_router(search.router)
+app.include_router(profiles.router)
 
 
 @app.get("/")
@@ -42,6 +108,28 @@ async def root():
     return {"message": "SaaS Project Management API is running"}
 
 
+@app.exception_handler(ConnectionFailure)
+async def database_unreachable(request: Request, exc: ConnectionFailure):
+    # Reached only for calls that started before the circuit opened. Failures of a
+    # command that was sent are already counted by the command listener; only
+    # server selection fails before any command exists.
+    if isinstance(exc, ServerSelectionTimeoutError):
+        breaker.record_failure(f"{type(exc).__name__}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database temporarily unavailable"},
+        headers={"Retry-After": str(round(breaker.open_seconds))},
+    )
+
+
 @app.get("/health")
 async def health():
+    """Liveness: the process is up, whatever the state of the database."""
     return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+async def ready():
+    """Readiness: take this instance out of rotation while the database circuit is open."""
+    body = {"status": "ready" if breaker.state == CLOSED else "degraded", "database": breaker.metrics()}
+    return JSONResponse(status_code=200 if breaker.state == CLOSED else 503, content=body)
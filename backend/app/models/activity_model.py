@@ -0,0 +1,18 @@
+def activity_entity(event: dict) -> dict:
+    details = {
+        key: [str(v) for v in value] if isinstance(value, list) else value
+        for key, value in event.items()
+        if key not in ("_id", "project_id", "type", "actor_id", "at", "from_since")
+    }
+    return {
+        "id": str(event["_id"]),
+        "project_id": str(event["project_id"]),
+        "type": event["type"],
+        "actor_id": str(event["actor_id"]) if event.get("actor_id") else None,
+        "at": event["at"].isoformat(),
+        "details": details,
+    }
+
+
+def activities_entity(events: list) -> list:
+    return [activity_entity(e) for e in events]
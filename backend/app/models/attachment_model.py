@@ -0,0 +1,20 @@
+from datetime import datetime
+
+
+def attachment_entity(file_doc: dict) -> dict:
+    metadata = file_doc.get("metadata", {})
+    project_id = metadata.get("project_id")
+    return {
+        "id": str(file_doc["_id"]),
+        "filename": file_doc["filename"],
+        "content_type": metadata.get("content_type", "application/octet-stream"),
+        "length": file_doc["length"],
+        "sha256": file_doc.get("sha256"),
+        "owner_id": str(metadata["owner_id"]),
+        "project_id": str(project_id) if project_id else None,
+        "uploaded_at": file_doc.get("uploadDate", datetime.utcnow()).isoformat(),
+    }
+
+
+def attachments_entity(files: list) -> list:
+    return [attachment_entity(f) for f in files]
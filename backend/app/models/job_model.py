@@ -0,0 +1,26 @@
+from datetime import datetime
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def job_entity(job: dict) -> dict:
+    return {
+        "id": str(job["_id"]),
+        "type": job["type"],
+        "status": job["status"],
+        "payload": job.get("payload", {}),
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "attempts": job.get("attempts", 0),
+        "max_attempts": job["max_attempts"],
+        "idempotency_key": job.get("idempotency_key"),
+        "created_at": job.get("created_at", datetime.utcnow()).isoformat(),
+        "started_at": _isoformat(job.get("started_at")),
+        "finished_at": _isoformat(job.get("finished_at")),
+    }
+
+
+def jobs_entity(jobs: list) -> list:
+    return [job_entity(j) for j in jobs]
@@ -7,9 +7,24 @@ def message_entity(message: dict) -> dict:
         "sender_id": str(message["sender_id"]),
         "receiver_id": str(message["receiver_id"]),
         "content": message["content"],
+        "attachment_ids": [str(a) for a in message.get("attachment_ids", [])],
         "created_at": message.get("created_at", datetime.utcnow()).isoformat(),
     }
 
 
 def messages_entity(messages: list) -> list:
     return [message_entity(m) for m in messages]
+
+
+def archived_message_entity(message: dict) -> dict:
+    """Expand the compact form stored in `message_archive` buckets."""
+    return message_entity(
+        {
+            "_id": message["_id"],
+            "sender_id": message["s"],
+            "receiver_id": message["r"],
+            "content": message["c"],
+            "attachment_ids": message.get("a", []),
+            "created_at": message["t"],
+        }
+    )
@@ -0,0 +1,25 @@
+def profile_entity(profile: dict) -> dict:
+    return {
+        "id": str(profile["_id"]),
+        "method": profile["method"],
+        "path": profile["path"],
+        "query": profile.get("query", ""),
+        "status": profile["status"],
+        "trigger": profile["trigger"],
+        "user_id": profile.get("user_id"),
+        "request_id": profile.get("request_id"),
+        "duration_ms": profile["duration_ms"],
+        "cpu_ms": profile.get("cpu_ms"),
+        "db_count": profile["db"]["count"],
+        "db_total_ms": profile["db"]["total_ms"],
+        "has_flamegraph": profile.get("has_flamegraph", profile.get("speedscope") is not None),
+        "created_at": profile["created_at"].isoformat(),
+    }
+
+
+def profiles_entity(profiles: list) -> list:
+    return [profile_entity(p) for p in profiles]
+
+
+def profile_detail_entity(profile: dict) -> dict:
+    return {**profile_entity(profile), "db_commands": profile.get("db_commands", [])}
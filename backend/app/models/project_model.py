@@ -16,3 +16,19 @@ def project_entity(project: dict) -> dict:
 
 def projects_entity(projects: list) -> list:
     return [project_entity(p) for p in projects]
+
+
+def project_detail_entity(project: dict) -> dict:
+    client = project.get("client", [])
+    return {
+        **project_entity(project),
+        "client_name": client[0]["name"] if client else None,
+        "employees": [
+            {"id": str(e["_id"]), "name": e["name"]}
+            for e in project.get("employees", [])
+        ],
+    }
+
+
+def project_details_entity(projects: list) -> list:
+    return [project_detail_entity(p) for p in projects]
@@ -26,3 +26,19 @@ def service_request_entity(request: dict) -> dict:
 
 def service_requests_entity(requests: list) -> list:
     return [service_request_entity(r) for r in requests]
+
+
+def _joined_name(docs: list):
+    return docs[0]["name"] if docs else None
+
+
+def service_request_detail_entity(request: dict) -> dict:
+    return {
+        **service_request_entity(request),
+        "client_name": _joined_name(request.get("client", [])),
+        "service_name": _joined_name(request.get("service", [])),
+    }
+
+
+def service_request_details_entity(requests: list) -> list:
+    return [service_request_detail_entity(r) for r in requests]
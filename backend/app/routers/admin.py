@@ -1,29 +1,60 @@
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from bson import ObjectId
-from typing import List
+from typing import List, Optional
 
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin, get_platform_admin
+from app.core.singleflight import singleflight
+from app.db.circuit_breaker import breaker
 from app.db.mongodb import get_database
-from app.schemas.user_schema import UserCreate, UserResponse
-from app.schemas.service_schema import ServiceCreate, ServiceResponse, ServiceRequestResponse
+from app.schemas.user_schema import (
+    UserCreate,
+    UserResponse,
+    UserRole,
+    UserImportResponse,
+    EmployeeRecommendation,
+)
+from app.schemas.service_schema import (
+    ServiceCreate,
+    ServiceResponse,
+    ServiceRequestDetailResponse,
+    ServiceRequestStatus,
+)
+from app.schemas.activity_schema import ActivityResponse, StatusTransitionMetrics
+from app.schemas.analytics_schema import AnalyticsResponse
+from app.schemas.job_schema import JobResponse
+from app.schemas.migration_schema import MigrationResponse
 from app.schemas.project_schema import (
     ProjectResponse,
+    ProjectDetailResponse,
+    ProjectStatus,
     AssignEmployeesRequest,
 )
-from app.services.auth_service import register_user
-from app.services.user_service import get_all_users, get_users_by_role
+from app.services.auth_service import register_user, revoke_user_sessions
+from app.services.user_service import (
+    get_all_users,
+    get_users_by_role,
+    get_least_loaded_employees,
+)
+from app.services.user_import_service import import_users
 from app.services.project_service import (
     create_project,
     get_all_projects,
     assign_employees,
+    unassign_employee,
 )
-from app.models.service_model import (
-    service_entity,
-    services_entity,
-    service_request_entity,
-    service_requests_entity,
+from app.services.service_service import get_all_services, get_all_service_requests
+from app.services.sync_service import sync_fields, record_tombstone
+from app.services.job_service import enqueue_job
+from app.services.migration_service import get_migrations
+from app.services.analytics_service import record_request_decided, get_analytics
+from app.services.stats_service import get_admin_stats
+from app.services.typeahead_service import index_service, unindex
+from app.services.activity_service import (
+    get_project_timeline,
+    get_status_transition_metrics,
 )
+from app.models.service_model import service_entity
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -34,9 +65,39 @@ async def create_user(user: UserCreate, admin: dict = Depends(get_current_admin)
     return await register_user(user.name, user.email, user.password, user.role)
 
 
+@router.post("/users/import", response_model=UserImportResponse)
+async def bulk_import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    admin: dict = Depends(get_current_admin),
+):
+    """Bulk-create users from a CSV (name,email,password,role header) or NDJSON body."""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    return await import_users(request.stream(), format)
+
+
 @router.get("/users", response_model=List[UserResponse])
-async def list_users(admin: dict = Depends(get_current_admin)):
-    return await get_all_users()
+async def list_users(
+    role: Optional[UserRole] = None,
+    search: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_all_users(
+        role=role.value if role else None,
+        search=search,
+        created_from=created_from,
+        created_to=created_to,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.get("/users/employees", response_model=List[UserResponse])
@@ -58,14 +119,18 @@ async def delete_user(user_id: str, admin: dict = Depends(get_current_admin)):
     if user["role"] == "ADMIN":
         raise HTTPException(status_code=400, detail="Cannot delete admin users")
 
-    # Remove from all assigned projects
-    await db.projects.update_many(
-        {"assigned_employees": user_id},
-        {"$pull": {"assigned_employees": user_id}},
-    )
-
     await db.users.delete_one({"_id": ObjectId(user_id)})
-    return {"message": "User deleted successfully"}
+    await record_tombstone("users", user_id)
+    await revoke_user_sessions(user_id)
+    unindex("users", user_id)
+
+    # Removing the user from their projects scales with data size, so run it off the request path
+    job = await enqueue_job(
+        "users.cascade_delete",
+        {"user_id": user_id},
+        idempotency_key=f"users.cascade_delete:{user_id}",
+    )
+    return {"message": "User deleted successfully", "job_id": job["id"]}
 
 
 # ── Services ─────────────────────────────────────────
@@ -78,25 +143,48 @@ async def create_service(
         "name": service.name,
         "description": service.description,
         "created_at": datetime.now(timezone.utc),
+        **await sync_fields(),
     }
     result = await db.services.insert_one(service_doc)
     service_doc["_id"] = result.inserted_id
+    index_service(service_doc)
     return service_entity(service_doc)
 
 
 @router.get("/services", response_model=List[ServiceResponse])
-async def list_services(admin: dict = Depends(get_current_admin)):
-    db = get_database()
-    services = await db.services.find().to_list(1000)
-    return services_entity(services)
+async def list_services(
+    search: Optional[str] = None,
+    sort: str = "name",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_all_services(search=search, sort=sort, skip=skip, limit=limit)
 
 
 # ── Service Requests ─────────────────────────────────
-@router.get("/service-requests", response_model=List[ServiceRequestResponse])
-async def list_service_requests(admin: dict = Depends(get_current_admin)):
-    db = get_database()
-    requests = await db.service_requests.find().to_list(1000)
-    return service_requests_entity(requests)
+@router.get("/service-requests", response_model=List[ServiceRequestDetailResponse])
+async def list_service_requests(
+    status: Optional[ServiceRequestStatus] = None,
+    client_id: Optional[str] = None,
+    service_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_all_service_requests(
+        status=status.value if status else None,
+        client_id=client_id,
+        service_id=service_id,
+        created_from=created_from,
+        created_to=created_to,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.put("/service-requests/{request_id}/approve")
@@ -120,8 +208,15 @@ async def approve_service_request(
     # Update request status
     await db.service_requests.update_one(
         {"_id": ObjectId(request_id)},
-        {"$set": {"status": "APPROVED"}},
+        {
+            "$set": {
+                "status": "APPROVED",
+                "decided_at": datetime.now(timezone.utc),
+                **await sync_fields(),
+            }
+        },
     )
+    record_request_decided("APPROVED")
 
     # Fetch service name for project
     service = await db.services.find_one({"_id": req["service_id"]})
@@ -133,6 +228,7 @@ async def approve_service_request(
         description=f"Auto-created from approved service request",
         client_id=str(req["client_id"]),
         service_request_id=request_id,
+        actor_id=admin["_id"],
     )
 
     return {"message": "Request approved and project created", "project": project}
@@ -152,15 +248,43 @@ async def reject_service_request(
 
     await db.service_requests.update_one(
         {"_id": ObjectId(request_id)},
-        {"$set": {"status": "REJECTED"}},
+        {
+            "$set": {
+                "status": "REJECTED",
+                "decided_at": datetime.now(timezone.utc),
+                **await sync_fields(),
+            }
+        },
     )
+    record_request_decided("REJECTED")
     return {"message": "Request rejected"}
 
 
 # ── Projects ─────────────────────────────────────────
-@router.get("/projects", response_model=List[ProjectResponse])
-async def list_projects(admin: dict = Depends(get_current_admin)):
-    return await get_all_projects()
+@router.get("/projects", response_model=List[ProjectDetailResponse])
+async def list_projects(
+    status: Optional[ProjectStatus] = None,
+    client_id: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    search: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=1000),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_all_projects(
+        status=status.value if status else None,
+        client_id=client_id,
+        employee_id=employee_id,
+        search=search,
+        created_from=created_from,
+        created_to=created_to,
+        sort=sort,
+        skip=skip,
+        limit=limit,
+    )
 
 
 @router.put("/projects/{project_id}/assign", response_model=ProjectResponse)
@@ -169,7 +293,31 @@ async def assign_employees_to_project(
     body: AssignEmployeesRequest,
     admin: dict = Depends(get_current_admin),
 ):
-    return await assign_employees(project_id, body.employee_ids)
+    return await assign_employees(project_id, body.employee_ids, actor_id=admin["_id"])
+
+
+@router.get(
+    "/projects/{project_id}/recommended-employees",
+    response_model=List[EmployeeRecommendation],
+)
+async def recommend_employees(
+    project_id: str,
+    limit: int = Query(5, ge=1, le=50),
+    admin: dict = Depends(get_current_admin),
+):
+    """Least-loaded employees not already on the project."""
+    db = get_database()
+    project = await db.projects.find_one(
+        {"_id": ObjectId(project_id)}, {"employee_ids": 1}
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await get_least_loaded_employees(project.get("employee_ids", []), limit)
+
+
+@router.post("/employees/reconcile-load", response_model=JobResponse)
+async def reconcile_employee_load(admin: dict = Depends(get_current_admin)):
+    return await enqueue_job("employees.reconcile_load", {})
 
 
 @router.put("/projects/{project_id}/unassign")
@@ -178,42 +326,60 @@ async def unassign_employee_from_project(
     body: dict,
     admin: dict = Depends(get_current_admin),
 ):
-    db = get_database()
     employee_id = body.get("employee_id")
     if not employee_id:
         raise HTTPException(status_code=400, detail="employee_id is required")
+    await unassign_employee(project_id, employee_id, admin["_id"])
+    return {"message": "Employee unassigned successfully"}
 
-    project = await db.projects.find_one({"_id": ObjectId(project_id)})
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
 
-    await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {"$pull": {"assigned_employees": employee_id}},
-    )
-    return {"message": "Employee unassigned successfully"}
+@router.get("/projects/metrics/status-transitions", response_model=StatusTransitionMetrics)
+async def project_status_metrics(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_status_transition_metrics(start, end)
+
+
+@router.get("/projects/{project_id}/timeline", response_model=List[ActivityResponse])
+async def project_timeline(project_id: str, admin: dict = Depends(get_current_admin)):
+    return await get_project_timeline(project_id)
 
 
 # ── Dashboard Stats ──────────────────────────────────
 @router.get("/stats")
 async def admin_stats(admin: dict = Depends(get_current_admin)):
-    db = get_database()
-    total_users = await db.users.count_documents({})
-    total_employees = await db.users.count_documents({"role": "EMPLOYEE"})
-    total_clients = await db.users.count_documents({"role": "CLIENT"})
-    total_projects = await db.projects.count_documents({})
-    total_services = await db.services.count_documents({})
-    pending_requests = await db.service_requests.count_documents({"status": "PENDING"})
-    active_projects = await db.projects.count_documents({"status": "IN_PROGRESS"})
-    completed_projects = await db.projects.count_documents({"status": "COMPLETED"})
-
-    return {
-        "total_users": total_users,
-        "total_employees": total_employees,
-        "total_clients": total_clients,
-        "total_projects": total_projects,
-        "total_services": total_services,
-        "pending_requests": pending_requests,
-        "active_projects": active_projects,
-        "completed_projects": completed_projects,
-    }
+    return await get_admin_stats()
+
+
+@router.get("/metrics")
+async def admin_metrics(admin: dict = Depends(get_current_admin)):
+    return {"singleflight": singleflight.metrics(), "database": breaker.metrics()}
+
+
+# ── Analytics ────────────────────────────────────────
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def analytics(
+    start: date,
+    end: date,
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_analytics(start, end)
+
+
+@router.post("/analytics/backfill", response_model=JobResponse)
+async def backfill_analytics(admin: dict = Depends(get_current_admin)):
+    return await enqueue_job("analytics.backfill_rollups", {})
+
+
+# ── Data migrations ──────────────────────────────────
+# Migrations rewrite every tenant's data, so only platform admins manage them
+@router.get("/migrations", response_model=List[MigrationResponse])
+async def list_migrations(admin: dict = Depends(get_platform_admin)):
+    return await get_migrations()
+
+
+@router.post("/migrations/run", response_model=JobResponse)
+async def start_migrations(admin: dict = Depends(get_platform_admin)):
+    return await enqueue_job("migrations.run", {})
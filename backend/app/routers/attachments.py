@@ -0,0 +1,85 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Optional
+from urllib.parse import quote
+
+from app.core.security import get_current_user
+from app.schemas.attachment_schema import AttachmentResponse
+from app.services.attachment_service import (
+    upload_attachment,
+    get_attachment,
+    list_project_attachments,
+    delete_attachment,
+    parse_range,
+    stream_attachment,
+    etag,
+)
+
+router = APIRouter(prefix="/api/attachments", tags=["Attachments"])
+
+
+@router.post("", response_model=AttachmentResponse)
+async def upload(
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255),
+    project_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """Upload the raw request body as a file; it is streamed into GridFS, never buffered whole."""
+    content_type = request.headers.get("content-type", "application/octet-stream")
+    return await upload_attachment(
+        current_user, request.stream(), filename, content_type, project_id
+    )
+
+
+@router.get("", response_model=List[AttachmentResponse])
+async def project_attachments(
+    project_id: str, current_user: dict = Depends(get_current_user)
+):
+    return await list_project_attachments(current_user, project_id)
+
+
+@router.get("/{attachment_id}")
+async def download(
+    attachment_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+):
+    file_doc = await get_attachment(current_user, attachment_id)
+    tag = etag(file_doc)
+    length = file_doc["length"]
+    headers = {
+        "ETag": tag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, max-age=0, must-revalidate",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file_doc['filename'])}",
+    }
+
+    if request.headers.get("if-none-match") == tag:
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if request.headers.get("if-range", tag) == tag:
+        byte_range = parse_range(request.headers.get("range"), length)
+
+    start, end = byte_range or (0, length - 1)
+    status_code = 200
+    if byte_range:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(max(end - start + 1, 0))
+
+    return StreamingResponse(
+        stream_attachment(file_doc["_id"], start, end),
+        status_code=status_code,
+        media_type=file_doc.get("metadata", {}).get(
+            "content_type", "application/octet-stream"
+        ),
+        headers=headers,
+    )
+
+
+@router.delete("/{attachment_id}")
+async def remove(attachment_id: str, current_user: dict = Depends(get_current_user)):
+    await delete_attachment(current_user, attachment_id)
+    return {"message": "Attachment deleted successfully"}
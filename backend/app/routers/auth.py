@@ -1,11 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from bson import ObjectId
 
-from app.schemas.user_schema import UserLogin, TokenResponse
-from app.core.security import get_current_user, hash_password, verify_password
-from app.db.mongodb import get_database
-from app.services.auth_service import authenticate_user
+from app.schemas.user_schema import UserLogin, TokenResponse, RefreshRequest
+from app.core.security import get_current_user, hash_password_async, verify_password_async
+from app.db.mongodb import get_database, get_global_database
+from app.services.auth_service import (
+    authenticate_user,
+    refresh_session,
+    revoke_session,
+    revoke_user_sessions,
+)
 from app.models.user_model import user_entity
+from app.services.sync_service import sync_fields
+from app.services.typeahead_service import index_user
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -16,13 +23,29 @@ async def login(form_data: UserLogin):
     return result
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(body: RefreshRequest):
+    return await refresh_session(body.refresh_token)
+
+
+@router.post("/logout")
+async def logout(body: RefreshRequest):
+    await revoke_session(body.refresh_token)
+    return {"message": "Logged out"}
+
+
 @router.get("/profile")
 async def get_profile(current_user: dict = Depends(get_current_user)):
+    # Token claims can lag a profile edit until the next refresh, so read the stored record
+    db = get_database()
+    user = await db.users.find_one({"_id": ObjectId(current_user["_id"])})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return {
-        "id": current_user["_id"],
-        "name": current_user["name"],
-        "email": current_user["email"],
-        "role": current_user["role"],
+        "id": str(user["_id"]),
+        "name": user["name"],
+        "email": user["email"],
+        "role": user["role"],
     }
 
 
@@ -38,24 +61,33 @@ async def update_profile(
         update_data["name"] = body["name"].strip()
 
     if "email" in body and body["email"].strip():
-        existing = await db.users.find_one({"email": body["email"], "_id": {"$ne": ObjectId(current_user["_id"])}})
+        # Emails are unique across tenants because they identify the login
+        existing = await get_global_database().users.find_one(
+            {"email": body["email"], "_id": {"$ne": ObjectId(current_user["_id"])}}
+        )
         if existing:
             raise HTTPException(status_code=400, detail="Email already in use")
         update_data["email"] = body["email"].strip()
 
     if "current_password" in body and "new_password" in body:
         user_doc = await db.users.find_one({"_id": ObjectId(current_user["_id"])})
-        if not verify_password(body["current_password"], user_doc["password"]):
+        if not await verify_password_async(body["current_password"], user_doc["password"]):
             raise HTTPException(status_code=400, detail="Current password is incorrect")
-        update_data["password"] = hash_password(body["new_password"])
+        update_data["password"] = await hash_password_async(body["new_password"])
 
     if not update_data:
         raise HTTPException(status_code=400, detail="No valid fields to update")
+    update_data.update(await sync_fields())
 
     await db.users.update_one(
         {"_id": ObjectId(current_user["_id"])},
         {"$set": update_data},
     )
 
+    if "password" in update_data:
+        # Sign out every other device at once, keeping this one's session
+        await revoke_user_sessions(current_user["_id"], keep_session=current_user["session_id"])
+
     updated = await db.users.find_one({"_id": ObjectId(current_user["_id"])})
+    index_user(updated)
     return user_entity(updated)
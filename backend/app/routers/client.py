@@ -8,24 +8,22 @@ from app.db.mongodb import get_database
 from app.schemas.service_schema import (
     ServiceRequestCreate,
     ServiceRequestResponse,
+    ServiceRequestDetailResponse,
     ServiceResponse,
 )
-from app.schemas.project_schema import ProjectResponse
+from app.schemas.project_schema import ProjectDetailResponse
 from app.services.project_service import get_projects_by_client
-from app.models.service_model import (
-    services_entity,
-    service_request_entity,
-    service_requests_entity,
-)
+from app.services.service_service import get_all_services, get_all_service_requests
+from app.services.sync_service import sync_fields
+from app.services.analytics_service import record_request_created
+from app.models.service_model import service_request_entity
 
 router = APIRouter(prefix="/api/client", tags=["Client"])
 
 
 @router.get("/services", response_model=List[ServiceResponse])
 async def list_available_services(client: dict = Depends(get_current_client)):
-    db = get_database()
-    services = await db.services.find().to_list(1000)
-    return services_entity(services)
+    return await get_all_services()
 
 
 @router.post("/service-requests", response_model=ServiceRequestResponse)
@@ -38,21 +36,19 @@ async def request_service(
         "service_id": ObjectId(body.service_id),
         "status": "PENDING",
         "created_at": datetime.now(timezone.utc),
+        **await sync_fields(),
     }
     result = await db.service_requests.insert_one(request_doc)
     request_doc["_id"] = result.inserted_id
+    record_request_created()
     return service_request_entity(request_doc)
 
 
-@router.get("/service-requests", response_model=List[ServiceRequestResponse])
+@router.get("/service-requests", response_model=List[ServiceRequestDetailResponse])
 async def my_service_requests(client: dict = Depends(get_current_client)):
-    db = get_database()
-    requests = await db.service_requests.find(
-        {"client_id": ObjectId(client["_id"])}
-    ).to_list(1000)
-    return service_requests_entity(requests)
+    return await get_all_service_requests(client_id=client["_id"])
 
 
-@router.get("/projects", response_model=List[ProjectResponse])
+@router.get("/projects", response_model=List[ProjectDetailResponse])
 async def my_projects(client: dict = Depends(get_current_client)):
     return await get_projects_by_client(client["_id"])
@@ -2,13 +2,17 @@ from fastapi import APIRouter, Depends
 from typing import List
 
 from app.core.security import get_current_employee
-from app.schemas.project_schema import ProjectResponse, UpdateProjectStatusRequest
+from app.schemas.project_schema import (
+    ProjectResponse,
+    ProjectDetailResponse,
+    UpdateProjectStatusRequest,
+)
 from app.services.project_service import get_projects_by_employee, update_project_status
 
 router = APIRouter(prefix="/api/employee", tags=["Employee"])
 
 
-@router.get("/projects", response_model=List[ProjectResponse])
+@router.get("/projects", response_model=List[ProjectDetailResponse])
 async def my_projects(employee: dict = Depends(get_current_employee)):
     return await get_projects_by_employee(employee["_id"])
 
@@ -19,4 +23,4 @@ async def change_project_status(
     body: UpdateProjectStatusRequest,
     employee: dict = Depends(get_current_employee),
 ):
-    return await update_project_status(project_id, body.status)
+    return await update_project_status(project_id, body.status, actor_id=employee["_id"])
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+
+from app.core.security import get_current_admin
+from app.schemas.job_schema import JobResponse, JobStatus
+from app.services.job_service import get_job, get_jobs
+
+router = APIRouter(prefix="/api/admin/jobs", tags=["Jobs"])
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    status: Optional[JobStatus] = None,
+    type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_jobs(
+        job_status=status.value if status else None, job_type=type, limit=limit
+    )
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def job_status(job_id: str, admin: dict = Depends(get_current_admin)):
+    return await get_job(job_id)
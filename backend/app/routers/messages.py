@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from datetime import datetime, timezone
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Header, Query
+from typing import List, Optional
 
-from app.core.security import get_current_user
+from app.core.security import get_current_admin, get_current_user
 from app.db.mongodb import get_database
-from app.schemas.message_schema import MessageCreate, MessageResponse
-from app.services.message_service import send_message, get_user_messages
+from app.schemas.message_schema import (
+    MessageCreate,
+    MessageResponse,
+    BroadcastCreate,
+    BroadcastResponse,
+)
+from app.services.message_service import (
+    send_message,
+    get_user_messages,
+    broadcast_message,
+)
+from app.services.message_archive_service import get_message_history
 from app.models.user_model import user_entity
 
 router = APIRouter(prefix="/api/messages", tags=["Messages"])
@@ -14,7 +26,25 @@ router = APIRouter(prefix="/api/messages", tags=["Messages"])
 async def create_message(
     body: MessageCreate, current_user: dict = Depends(get_current_user)
 ):
-    return await send_message(current_user["_id"], body.receiver_id, body.content)
+    return await send_message(
+        current_user["_id"], body.receiver_id, body.content, body.attachment_ids
+    )
+
+
+@router.post("/broadcast", response_model=BroadcastResponse)
+async def create_broadcast(
+    body: BroadcastCreate,
+    admin: dict = Depends(get_current_admin),
+    idempotency_key: Optional[str] = Header(None),
+):
+    """Message every user with the given roles and/or on the given projects."""
+    return await broadcast_message(
+        admin["_id"],
+        body.content,
+        [r.value for r in body.roles],
+        body.project_ids,
+        idempotency_key,
+    )
 
 
 @router.get("/", response_model=List[MessageResponse])
@@ -22,6 +52,18 @@ async def list_messages(current_user: dict = Depends(get_current_user)):
     return await get_user_messages(current_user["_id"])
 
 
+@router.get("/history", response_model=List[MessageResponse])
+async def message_history(
+    before: Optional[datetime] = None,
+    limit: int = Query(200, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user),
+):
+    """Older messages, newest first, including ones moved to the archive."""
+    return await get_message_history(
+        current_user["_id"], before or datetime.now(timezone.utc), limit
+    )
+
+
 @router.get("/contacts")
 async def get_contacts(current_user: dict = Depends(get_current_user)):
     """Get available contacts based on user role."""
@@ -37,42 +79,19 @@ async def get_contacts(current_user: dict = Depends(get_current_user)):
         # Employees can message admin and clients of assigned projects
         admins = await db.users.find({"role": "ADMIN"}).to_list(100)
         contacts = [user_entity(u) for u in admins]
-        # Find projects this employee is assigned to
-        projects = await db.projects.find(
-            {"assigned_employees": current_user["_id"]}
-        ).to_list(1000)
-        client_ids_set = set()
-        for p in projects:
-            if p.get("client_id"):
-                client_ids_set.add(p["client_id"])
-        # Add those clients
-        from bson import ObjectId
-        for cid in client_ids_set:
-            try:
-                client = await db.users.find_one({"_id": ObjectId(cid)})
-                if client:
-                    contacts.append(user_entity(client))
-            except Exception:
-                pass
+        client_ids = await db.projects.distinct(
+            "client_id", {"employee_ids": ObjectId(current_user["_id"])}
+        )
+        clients = await db.users.find({"_id": {"$in": client_ids}}).to_list(None)
+        contacts.extend(user_entity(c) for c in clients)
     elif role == "CLIENT":
         # Clients can message admin + assigned employees
         admins = await db.users.find({"role": "ADMIN"}).to_list(100)
         contacts = [user_entity(u) for u in admins]
-        # Find projects for this client
-        projects = await db.projects.find(
-            {"client_id": current_user["_id"]}
-        ).to_list(1000)
-        emp_ids_set = set()
-        for p in projects:
-            for eid in p.get("assigned_employees", []):
-                emp_ids_set.add(eid)
-        from bson import ObjectId
-        for eid in emp_ids_set:
-            try:
-                emp = await db.users.find_one({"_id": ObjectId(eid)})
-                if emp:
-                    contacts.append(user_entity(emp))
-            except Exception:
-                pass
+        employee_ids = await db.projects.distinct(
+            "employee_ids", {"client_id": ObjectId(current_user["_id"])}
+        )
+        employees = await db.users.find({"_id": {"$in": employee_ids}}).to_list(None)
+        contacts.extend(user_entity(e) for e in employees)
 
     return contacts
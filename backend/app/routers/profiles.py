@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Optional
+
+from app.core.security import get_current_admin
+from app.schemas.profile_schema import ProfileResponse, ProfileDetailResponse
+from app.services.profile_service import (
+    get_profiles,
+    get_profile,
+    get_profile_speedscope,
+)
+
+router = APIRouter(prefix="/api/admin/profiles", tags=["Profiles"])
+
+
+@router.get("", response_model=List[ProfileResponse])
+async def list_profiles(
+    path: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    admin: dict = Depends(get_current_admin),
+):
+    return await get_profiles(path=path, limit=limit)
+
+
+@router.get("/{profile_id}", response_model=ProfileDetailResponse)
+async def profile_detail(profile_id: str, admin: dict = Depends(get_current_admin)):
+    return await get_profile(profile_id)
+
+
+@router.get("/{profile_id}/speedscope")
+async def profile_speedscope(profile_id: str, admin: dict = Depends(get_current_admin)):
+    """Download the flamegraph; open it at https://www.speedscope.app."""
+    return Response(
+        content=await get_profile_speedscope(profile_id),
+        media_type="application/json",
+        headers={
+            "Content-Encoding": "gzip",
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"',
+        },
+    )
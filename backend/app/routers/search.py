@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+
+from app.core.security import get_current_user
+from app.schemas.search_schema import TypeaheadResult
+from app.services.typeahead_service import KINDS, typeahead
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.get("/typeahead", response_model=List[TypeaheadResult])
+async def typeahead_search(
+    q: str = Query(..., min_length=1, max_length=100),
+    types: Optional[str] = Query(None, description="Comma-separated: users,projects,services"),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+):
+    """Autocomplete names and emails the caller is allowed to see, from the in-memory index."""
+    kinds = [t for t in types.split(",") if t in KINDS] if types else KINDS
+    return typeahead.search(current_user, q, kinds, limit)
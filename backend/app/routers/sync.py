@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.security import get_current_user
+from app.schemas.sync_schema import SyncResponse
+from app.services.sync_service import get_changes
+
+router = APIRouter(prefix="/api/sync", tags=["Sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    since: int = Query(0, ge=0),
+    current_user: dict = Depends(get_current_user),
+):
+    return await get_changes(current_user, since)
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ActivityResponse(BaseModel):
+    id: str
+    project_id: str
+    type: str
+    actor_id: Optional[str] = None
+    at: str
+    details: dict
+
+
+class StatusTransition(BaseModel):
+    from_status: Optional[str] = None
+    to_status: str
+    count: int
+
+
+class TimeInStatus(BaseModel):
+    status: Optional[str] = None
+    count: int
+    avg_seconds: float
+    max_seconds: float
+
+
+class StatusTransitionMetrics(BaseModel):
+    transitions: List[StatusTransition]
+    time_in_status: List[TimeInStatus]
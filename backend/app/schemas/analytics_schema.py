@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class DailyRollup(BaseModel):
+    day: str
+    requests_created: int
+    requests_approved: int
+    requests_rejected: int
+    projects_completed: int
+
+
+class EmployeeLoad(BaseModel):
+    employee_id: str
+    assignments: int
+    completions: int
+
+
+class AnalyticsResponse(BaseModel):
+    start: str
+    end: str
+    requests_created: int
+    approval_rate: Optional[float] = None
+    avg_completion_hours: Optional[float] = None
+    series: List[DailyRollup]
+    employee_load: List[EmployeeLoad]
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class AttachmentResponse(BaseModel):
+    id: str
+    filename: str
+    content_type: str
+    length: int
+    sha256: Optional[str] = None
+    owner_id: str
+    project_id: Optional[str] = None
+    uploaded_at: str
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Any, Optional
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class JobResponse(BaseModel):
+    id: str
+    type: str
+    status: str
+    payload: dict
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
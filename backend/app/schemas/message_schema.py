@@ -1,9 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
+
+from app.schemas.user_schema import UserRole
 
 
 class MessageCreate(BaseModel):
     receiver_id: str
     content: str
+    attachment_ids: List[str] = []
 
 
 class MessageResponse(BaseModel):
@@ -11,4 +15,20 @@ class MessageResponse(BaseModel):
     sender_id: str
     receiver_id: str
     content: str
+    attachment_ids: List[str] = []
     created_at: str
+
+
+class BroadcastCreate(BaseModel):
+    content: str = Field(min_length=1)
+    roles: List[UserRole] = []  # every user with one of these roles
+    project_ids: List[str] = []  # the client and assigned employees of these projects
+
+
+class BroadcastResponse(BaseModel):
+    broadcast_id: str
+    recipients: int
+    delivered: int
+    failed: int
+    batches: int
+    duration_ms: float
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class MigrationResponse(BaseModel):
+    version: str
+    description: str
+    status: str
+    step: int
+    steps: int
+    step_total: Optional[int] = None
+    step_scanned: int
+    scanned: int
+    modified: int
+    error: Optional[str] = None
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
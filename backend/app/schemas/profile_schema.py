@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ProfileResponse(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str
+    status: int
+    trigger: str
+    user_id: Optional[str] = None
+    request_id: Optional[str] = None
+    duration_ms: float
+    cpu_ms: Optional[float] = None
+    db_count: int
+    db_total_ms: float
+    has_flamegraph: bool
+    created_at: str
+
+
+class QueryTimelineEntry(BaseModel):
+    command: str
+    collection: Optional[str] = None
+    start_ms: float
+    duration_ms: Optional[float] = None
+    ok: Optional[bool] = None
+
+
+class ProfileDetailResponse(ProfileResponse):
+    db_commands: List[QueryTimelineEntry]
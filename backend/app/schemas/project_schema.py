@@ -27,6 +27,16 @@ class ProjectResponse(BaseModel):
     created_at: str
 
 
+class ProjectMember(BaseModel):
+    id: str
+    name: str
+
+
+class ProjectDetailResponse(ProjectResponse):
+    client_name: Optional[str] = None
+    employees: List[ProjectMember] = []
+
+
 class AssignEmployeesRequest(BaseModel):
     employee_ids: List[str]
 
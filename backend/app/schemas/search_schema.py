@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Literal
+
+
+class TypeaheadResult(BaseModel):
+    type: Literal["users", "projects", "services"]
+    id: str
+    label: str
+    detail: str
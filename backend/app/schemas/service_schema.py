@@ -31,3 +31,8 @@ class ServiceRequestResponse(BaseModel):
     service_id: str
     status: str
     created_at: str
+
+
+class ServiceRequestDetailResponse(ServiceRequestResponse):
+    client_name: Optional[str] = None
+    service_name: Optional[str] = None
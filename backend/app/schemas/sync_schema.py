@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Dict, List
+
+
+class DeletedRecord(BaseModel):
+    id: str
+    seq: int
+
+
+class SyncResponse(BaseModel):
+    watermark: int
+    has_more: bool
+    changes: Dict[str, List[dict]]
+    deleted: Dict[str, List[DeletedRecord]]
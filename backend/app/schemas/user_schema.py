@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -29,9 +29,38 @@ class UserResponse(BaseModel):
     created_at: str
 
 
+class EmployeeRecommendation(BaseModel):
+    id: str
+    name: str
+    email: str
+    active_projects: int
+
+
+class UserImportRowResult(BaseModel):
+    row: int
+    status: str
+    email: Optional[str] = None
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class UserImportResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    truncated: bool  # stopped at USER_IMPORT_MAX_ROWS; the rest of the file was not imported
+    rows: List[UserImportRowResult]
+
+
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
+    expires_in: int
     role: str
     user_id: str
     name: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
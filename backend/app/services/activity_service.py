@@ -0,0 +1,101 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from bson import ObjectId
+
+from app.core.config import get_settings
+from app.db.group_commit import GroupCommitBuffer
+from app.db.mongodb import get_database
+from app.db.query import date_range
+from app.models.activity_model import activities_entity
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+activity_buffer = GroupCommitBuffer(
+    "project_activity",
+    max_batch=settings.ACTIVITY_LOG_MAX_BATCH,
+    window_ms=settings.ACTIVITY_LOG_WINDOW_MS,
+)
+
+
+def _report_failure(future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Project activity write failed: %s", future.exception())
+
+
+def log_project_event(
+    project_id,
+    event_type: str,
+    actor_id: Optional[str] = None,
+    **details,
+) -> None:
+    """Append an event to the project activity log without waiting for the write."""
+    event = {
+        "project_id": ObjectId(project_id),
+        "type": event_type,
+        "actor_id": ObjectId(actor_id) if actor_id else None,
+        "at": datetime.now(timezone.utc),
+        **details,
+    }
+    activity_buffer.submit(event).add_done_callback(_report_failure)
+
+
+async def get_project_timeline(project_id: str, limit: int = 1000) -> list:
+    db = get_database()
+    events = await db.project_activity.find(
+        {"project_id": ObjectId(project_id)}
+    ).sort("at", 1).to_list(limit)
+    return activities_entity(events)
+
+
+async def get_status_transition_metrics(
+    start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> dict:
+    """Transition counts and time spent in each status, from status_changed events."""
+    db = get_database()
+    match = {"type": "status_changed", **date_range("at", start, end)}
+
+    transitions = await db.project_activity.aggregate(
+        [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {"from": "$from_status", "to": "$to_status"},
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$sort": {"count": -1}},
+        ]
+    ).to_list(None)
+
+    time_in_status = await db.project_activity.aggregate(
+        [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": "$from_status",
+                    "count": {"$sum": 1},
+                    "avg_ms": {"$avg": {"$subtract": ["$at", "$from_since"]}},
+                    "max_ms": {"$max": {"$subtract": ["$at", "$from_since"]}},
+                }
+            },
+        ]
+    ).to_list(None)
+
+    return {
+        "transitions": [
+            {"from_status": t["_id"]["from"], "to_status": t["_id"]["to"], "count": t["count"]}
+            for t in transitions
+        ],
+        "time_in_status": [
+            {
+                "status": t["_id"],
+                "count": t["count"],
+                "avg_seconds": (t["avg_ms"] or 0) / 1000,
+                "max_seconds": (t["max_ms"] or 0) / 1000,
+            }
+            for t in time_in_status
+        ],
+    }
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, timezone
+from typing import Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import get_settings
+from app.db.circuit_breaker import breaker
+from app.db.mongodb import get_database
+from app.db.tenancy import current_tenant, tenant_scope
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def day_key(when: Optional[datetime] = None) -> str:
+    return (when or datetime.now(timezone.utc)).strftime(DAY_FORMAT)
+
+
+def rollup_id(day: str) -> str:
+    return f"{current_tenant.get()}:{day}"
+
+
+class RollupAccumulator:
+    """Merge rollup increments in memory and `$inc` them into daily documents.
+
+    Many writes on the same day collapse into one update per flush. A crash
+    loses at most one flush interval, which the backfill job can rebuild.
+    Increments are kept apart per tenant and flushed in each tenant's scope.
+    Increments a failed flush could not write are kept for the next one.
+    """
+
+    def __init__(self):
+        self._pending = defaultdict(Counter)
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, increments: dict, when: Optional[datetime] = None) -> None:
+        self._pending[(current_tenant.get(), day_key(when))].update(increments)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        # While the circuit is open keep accumulating instead of dropping increments
+        breaker.check()
+        pending, self._pending = self._pending, defaultdict(Counter)
+        by_tenant = defaultdict(list)
+        for (tenant_id, day), increments in pending.items():
+            by_tenant[tenant_id].append((day, increments))
+        tenants = list(by_tenant.items())
+        for position, (tenant_id, days) in enumerate(tenants):
+            try:
+                with tenant_scope(tenant_id):
+                    await get_database().daily_rollups.bulk_write(
+                        [
+                            UpdateOne(
+                                {"_id": rollup_id(day)},
+                                {"$inc": dict(increments), "$setOnInsert": {"day": day}},
+                                upsert=True,
+                            )
+                            for day, increments in days
+                        ],
+                        ordered=False,
+                    )
+            except Exception as e:
+                # Put back what wasn't written, so the next flush retries it. For an
+                # unordered bulk write the reported errors say which updates failed.
+                if isinstance(e, BulkWriteError):
+                    failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                    unwritten = [days[i] for i in sorted(failed)]
+                else:
+                    unwritten = days
+                for day, increments in unwritten:
+                    self._pending[(tenant_id, day)].update(increments)
+                for later_tenant, later_days in tenants[position + 1:]:
+                    for day, increments in later_days:
+                        self._pending[(later_tenant, day)].update(increments)
+                raise
+
+    async def start(self, interval: float) -> None:
+        self._task = asyncio.create_task(self._run(interval), name="rollup-flusher")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning("Final rollup flush failed; run the backfill job to repair: %s", e)
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Rollup flush failed: %s", e)
+
+
+rollups = RollupAccumulator()
+
+
+def record_request_created() -> None:
+    rollups.add({"requests_created": 1})
+
+
+def record_request_decided(decision: str) -> None:
+    rollups.add({f"requests_{decision.lower()}": 1})
+
+
+def record_employees_assigned(employee_ids: list) -> None:
+    rollups.add({f"employee_assignments.{eid}": 1 for eid in employee_ids})
+
+
+def record_project_completed(project: dict, completed_at: datetime) -> None:
+    created_at = project["created_at"]
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    increments = {
+        "projects_completed": 1,
+        "completion_seconds_total": (completed_at - created_at).total_seconds(),
+    }
+    for eid in project.get("employee_ids", []):
+        increments[f"employee_completions.{eid}"] = 1
+    rollups.add(increments, completed_at)
+
+
+async def get_analytics(start: date, end: date) -> dict:
+    """Serve a time range from the daily rollup documents only."""
+    db = get_database()
+    days = await db.daily_rollups.find(
+        {"day": {"$gte": start.strftime(DAY_FORMAT), "$lte": end.strftime(DAY_FORMAT)}}
+    ).sort("day", 1).to_list(None)
+
+    totals = Counter()
+    employee_load = defaultdict(Counter)
+    series = []
+    for d in days:
+        point = {
+            "day": d["day"],
+            "requests_created": d.get("requests_created", 0),
+            "requests_approved": d.get("requests_approved", 0),
+            "requests_rejected": d.get("requests_rejected", 0),
+            "projects_completed": d.get("projects_completed", 0),
+        }
+        series.append(point)
+        totals.update({k: v for k, v in point.items() if k != "day"})
+        totals["completion_seconds_total"] += d.get("completion_seconds_total", 0)
+        for eid, count in d.get("employee_assignments", {}).items():
+            employee_load[eid]["assignments"] += count
+        for eid, count in d.get("employee_completions", {}).items():
+            employee_load[eid]["completions"] += count
+
+    decided = totals["requests_approved"] + totals["requests_rejected"]
+    completed = totals["projects_completed"]
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "requests_created": totals["requests_created"],
+        "approval_rate": totals["requests_approved"] / decided if decided else None,
+        "avg_completion_hours": (
+            totals["completion_seconds_total"] / completed / 3600 if completed else None
+        ),
+        "series": series,
+        "employee_load": [
+            {
+                "employee_id": eid,
+                "assignments": load["assignments"],
+                "completions": load["completions"],
+            }
+            for eid, load in sorted(employee_load.items())
+        ],
+    }
+
+
+def _by_day(date_expression) -> dict:
+    return {"$dateToString": {"format": DAY_FORMAT, "date": date_expression}}
+
+
+async def backfill_rollups() -> dict:
+    """Rebuild the current tenant's daily rollups from the source collections."""
+    db = get_database()
+    days = defaultdict(dict)
+
+    async for row in db.service_requests.aggregate(
+        [{"$group": {"_id": _by_day("$created_at"), "count": {"$sum": 1}}}]
+    ):
+        days[row["_id"]]["requests_created"] = row["count"]
+
+    async for row in db.service_requests.aggregate(
+        [
+            {"$match": {"status": {"$in": ["APPROVED", "REJECTED"]}}},
+            {
+                "$group": {
+                    "_id": {
+                        "day": _by_day({"$ifNull": ["$decided_at", "$created_at"]}),
+                        "status": "$status",
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+    ):
+        days[row["_id"]["day"]][f"requests_{row['_id']['status'].lower()}"] = row["count"]
+
+    async for row in db.projects.aggregate(
+        [
+            {"$match": {"status": "COMPLETED", "completed_at": {"$exists": True}}},
+            {
+                "$group": {
+                    "_id": _by_day("$completed_at"),
+                    "count": {"$sum": 1},
+                    "ms": {"$sum": {"$subtract": ["$completed_at", "$created_at"]}},
+                    "employees": {"$push": "$employee_ids"},
+                }
+            },
+        ]
+    ):
+        day = days[row["_id"]]
+        day["projects_completed"] = row["count"]
+        day["completion_seconds_total"] = row["ms"] / 1000
+        completions = Counter(str(eid) for ids in row["employees"] for eid in ids)
+        day["employee_completions"] = dict(completions)
+
+    async for row in db.project_activity.aggregate(
+        [
+            {"$match": {"type": "employees_assigned"}},
+            {"$unwind": "$added"},
+            {
+                "$group": {
+                    "_id": {"day": _by_day("$at"), "employee": "$added"},
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+    ):
+        assignments = days[row["_id"]["day"]].setdefault("employee_assignments", {})
+        assignments[str(row["_id"]["employee"])] = row["count"]
+
+    if days:
+        await db.daily_rollups.bulk_write(
+            [
+                UpdateOne({"_id": rollup_id(day)}, {"$set": {"day": day, **fields}}, upsert=True)
+                for day, fields in days.items()
+            ],
+            ordered=False,
+        )
+    return {"days": len(days)}
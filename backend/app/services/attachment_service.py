@@ -0,0 +1,230 @@
+import hashlib
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from gridfs.errors import NoFile
+
+from app.core.config import get_settings
+from app.db.mongodb import get_database, get_global_database
+from app.db.tenancy import current_tenant
+from app.models.attachment_model import attachment_entity, attachments_entity
+
+settings = get_settings()
+
+BUCKET_NAME = "attachments"
+
+
+def get_bucket() -> AsyncIOMotorGridFSBucket:
+    # GridFS needs the real database; file lookups go through the tenant-scoped `_files()`
+    return AsyncIOMotorGridFSBucket(
+        get_global_database(),
+        bucket_name=BUCKET_NAME,
+        chunk_size_bytes=settings.ATTACHMENT_CHUNK_BYTES,
+    )
+
+
+def _files():
+    return get_database()[f"{BUCKET_NAME}.files"]
+
+
+async def _get_project_for_member(user: dict, project_id: str) -> dict:
+    db = get_database()
+    project = await db.projects.find_one(
+        {"_id": ObjectId(project_id)}, {"client_id": 1, "employee_ids": 1}
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not is_project_member(user, project):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this project",
+        )
+    return project
+
+
+def is_project_member(user: dict, project: dict) -> bool:
+    uid = ObjectId(user["_id"])
+    return (
+        user["role"] == "ADMIN"
+        or project.get("client_id") == uid
+        or uid in project.get("employee_ids", [])
+    )
+
+
+async def _reserve_quota(user_id: ObjectId, length: int) -> bool:
+    """Add `length` to the user's usage unless that would exceed the quota."""
+    db = get_database()
+    try:
+        await db.attachment_usage.find_one_and_update(
+            {"_id": user_id, "bytes": {"$lte": settings.ATTACHMENT_QUOTA_BYTES - length}},
+            {"$inc": {"bytes": length}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # The usage document exists but does not match: the quota would be exceeded
+        return False
+    return True
+
+
+async def _remaining_quota(user_id: ObjectId) -> int:
+    db = get_database()
+    usage = await db.attachment_usage.find_one({"_id": user_id})
+    return settings.ATTACHMENT_QUOTA_BYTES - (usage["bytes"] if usage else 0)
+
+
+async def upload_attachment(
+    user: dict,
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    content_type: str,
+    project_id: Optional[str] = None,
+) -> dict:
+    """Stream a body into GridFS chunk by chunk, enforcing size and quota as it arrives."""
+    owner_id = ObjectId(user["_id"])
+    metadata = {
+        "tenant_id": current_tenant.get(),
+        "owner_id": owner_id,
+        "content_type": content_type,
+        "shared_with": [],
+    }
+    if project_id:
+        await _get_project_for_member(user, project_id)
+        metadata["project_id"] = ObjectId(project_id)
+
+    limit = min(settings.ATTACHMENT_MAX_BYTES, await _remaining_quota(owner_id))
+    grid_in = get_bucket().open_upload_stream(filename, metadata=metadata)
+    digest = hashlib.sha256()
+    length = 0
+    try:
+        async for chunk in chunks:
+            length += len(chunk)
+            if length > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Attachment exceeds the size limit or your storage quota",
+                )
+            digest.update(chunk)
+            await grid_in.write(chunk)
+        await grid_in.set("sha256", digest.hexdigest())
+        await grid_in.close()
+    except BaseException:
+        await grid_in.abort()
+        raise
+
+    if not await _reserve_quota(owner_id, length):
+        await get_bucket().delete(grid_in._id)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Attachment exceeds your storage quota",
+        )
+
+    file_doc = await _files().find_one({"_id": grid_in._id})
+    return attachment_entity(file_doc)
+
+
+async def can_access(user: dict, file_doc: dict) -> bool:
+    metadata = file_doc.get("metadata", {})
+    uid = ObjectId(user["_id"])
+    if user["role"] == "ADMIN" or metadata.get("owner_id") == uid:
+        return True
+    if uid in metadata.get("shared_with", []):
+        return True
+    if metadata.get("project_id"):
+        project = await get_database().projects.find_one(
+            {"_id": metadata["project_id"]}, {"client_id": 1, "employee_ids": 1}
+        )
+        return bool(project) and is_project_member(user, project)
+    return False
+
+
+async def get_attachment(user: dict, attachment_id: str) -> dict:
+    file_doc = await _files().find_one({"_id": ObjectId(attachment_id)})
+    if not file_doc or not await can_access(user, file_doc):
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    return file_doc
+
+
+async def list_project_attachments(user: dict, project_id: str) -> list:
+    await _get_project_for_member(user, project_id)
+    files = await _files().find(
+        {"metadata.project_id": ObjectId(project_id)}
+    ).sort("uploadDate", -1).to_list(1000)
+    return attachments_entity(files)
+
+
+async def share_attachments(owner_id: str, attachment_ids: list, recipient_id: str) -> list:
+    """Let a message recipient read attachments the sender uploaded."""
+    if not attachment_ids:
+        return []
+    oids = [ObjectId(aid) for aid in attachment_ids]
+    result = await _files().update_many(
+        {"_id": {"$in": oids}, "metadata.owner_id": ObjectId(owner_id)},
+        {"$addToSet": {"metadata.shared_with": ObjectId(recipient_id)}},
+    )
+    if result.matched_count != len(set(oids)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Attachments must be uploaded by the sender",
+        )
+    return oids
+
+
+async def delete_attachment(user: dict, attachment_id: str) -> None:
+    file_doc = await get_attachment(user, attachment_id)
+    owner_id = file_doc["metadata"]["owner_id"]
+    if user["role"] != "ADMIN" and owner_id != ObjectId(user["_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the uploader can delete an attachment",
+        )
+    try:
+        await get_bucket().delete(file_doc["_id"])
+    except NoFile:
+        return
+    await get_database().attachment_usage.update_one(
+        {"_id": owner_id}, {"$inc": {"bytes": -file_doc["length"]}}
+    )
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[tuple]:
+    """Parse a single `bytes=` range into inclusive (start, end), or None for the whole file."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else length - 1
+        else:
+            start = max(length - int(end_text), 0)
+            end = length - 1
+    except ValueError:
+        return None
+    end = min(end, length - 1)
+    if start > end or start >= length:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"},
+        )
+    return start, end
+
+
+async def stream_attachment(file_id: ObjectId, start: int, end: int) -> AsyncIterator[bytes]:
+    grid_out = await get_bucket().open_download_stream(file_id)
+    await grid_out.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = await grid_out.read(min(settings.ATTACHMENT_CHUNK_BYTES, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+
+
+def etag(file_doc: dict) -> str:
+    return f'"{file_doc.get("sha256") or file_doc["_id"]}"'
@@ -1,43 +1,167 @@
-from datetime import datetime, timezone
+import asyncio
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from fastapi import HTTPException, status
 from bson import ObjectId
 
-from app.db.mongodb import get_database
-from app.core.security import hash_password, verify_password, create_access_token
+from app.db.mongodb import get_database, get_global_database
+from app.core.config import get_settings
+from app.core.revocation import revocations
+from app.core.security import (
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    create_access_token,
+    user_claims,
+)
 from app.models.user_model import user_entity
+from app.services.sync_service import sync_fields
+from app.services.typeahead_service import index_user
 
+settings = get_settings()
 
-async def authenticate_user(email: str, password: str) -> dict:
+logger = logging.getLogger(__name__)
+
+invalid_refresh_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+)
+
+
+def _refresh_token_id(token: str) -> str:
+    # Only the hash is stored, so a leaked collection can't be replayed
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def issue_session(user: dict, family_id: Optional[str] = None) -> dict:
+    """Issue an access token and a new refresh token in `family_id` (or a new family)."""
+    db = get_database()
+    now = datetime.now(timezone.utc)
+    family_id = family_id or secrets.token_hex(16)
+    refresh_token = secrets.token_urlsafe(32)
+    await db.refresh_tokens.insert_one(
+        {
+            "_id": _refresh_token_id(refresh_token),
+            "user_id": str(user["_id"]),
+            "family_id": family_id,
+            "used_at": None,
+            "created_at": now,
+            "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        }
+    )
+    return {
+        # `sid` ties the access token to its session family, e.g. to keep it on password change
+        "access_token": create_access_token(data={**user_claims(user), "sid": family_id}),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "role": user["role"],
+        "user_id": str(user["_id"]),
+        "name": user["name"],
+    }
+
+
+async def refresh_session(refresh_token: str) -> dict:
+    """Rotate a refresh token: mark it used and issue its successor in the same family.
+
+    A refresh token is good for one use. Presenting one that was already
+    used means it leaked (or a client retried with a stale copy), so the
+    whole family is revoked and the user has to log in again.
+    """
+    db = get_database()
+    now = datetime.now(timezone.utc)
+    token_id = _refresh_token_id(refresh_token)
+    record = await db.refresh_tokens.find_one_and_update(
+        {"_id": token_id, "used_at": None},
+        {"$set": {"used_at": now}},
+    )
+    if record is None:
+        reused = await db.refresh_tokens.find_one({"_id": token_id})
+        if reused is not None:
+            logger.warning(
+                "Refresh token reuse detected; revoking session family",
+                extra={"user_id": reused["user_id"], "family_id": reused["family_id"]},
+            )
+            await db.refresh_tokens.delete_many({"family_id": reused["family_id"]})
+        raise invalid_refresh_exception
+    if record["expires_at"].replace(tzinfo=timezone.utc) <= now:
+        raise invalid_refresh_exception
+
+    # Re-read the user so role or name changes take effect on renewal
+    user = await get_global_database().users.find_one({"_id": ObjectId(record["user_id"])})
+    if user is None:
+        raise invalid_refresh_exception
+    return await issue_session(user, family_id=record["family_id"])
+
+
+async def revoke_session(refresh_token: str) -> None:
     db = get_database()
+    record = await db.refresh_tokens.find_one({"_id": _refresh_token_id(refresh_token)})
+    if record is not None:
+        await db.refresh_tokens.delete_many({"family_id": record["family_id"]})
+
+
+async def revoke_user_sessions(
+    user_id: str, access_tokens: bool = True, keep_session: Optional[str] = None
+) -> None:
+    """End every session of a user: drop refresh tokens and, optionally, reject live access tokens.
+
+    `keep_session` spares one session family, refresh and access tokens
+    alike, e.g. the device the user is on.
+    """
+    query = {"user_id": user_id}
+    if keep_session:
+        query["family_id"] = {"$ne": keep_session}
+    await get_database().refresh_tokens.delete_many(query)
+    if access_tokens:
+        await revocations.revoke(user_id, keep_session=keep_session)
+
+
+async def authenticate_user(email: str, password: str) -> dict:
+    # The caller's tenant isn't known until we find their account
+    db = get_global_database()
     user = await db.users.find_one({"email": email})
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
-    if not verify_password(password, user["password"]):
+    if not await verify_password_async(password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
 
-    access_token = create_access_token(
-        data={"sub": str(user["_id"]), "role": user["role"]}
-    )
+    if password_needs_rehash(user["password"]):
+        # Upgrade to the configured cost without making this login wait for a second hash
+        task = asyncio.create_task(_rehash_password(user["_id"], user["password"], password))
+        _rehashes.add(task)
+        task.add_done_callback(_rehashes.discard)
 
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": user["role"],
-        "user_id": str(user["_id"]),
-        "name": user["name"],
-    }
+    return await issue_session(user)
+
+
+_rehashes: set = set()
+
+
+async def _rehash_password(user_id: ObjectId, old_hash: str, password: str) -> None:
+    try:
+        new_hash = await hash_password_async(password)
+        # Only replace the hash we verified, never a password changed in the meantime
+        await get_global_database().users.update_one(
+            {"_id": user_id, "password": old_hash}, {"$set": {"password": new_hash}}
+        )
+    except Exception as e:
+        logger.warning("Password rehash failed: %s", e, extra={"target_user_id": str(user_id)})
 
 
 async def register_user(name: str, email: str, password: str, role: str) -> dict:
     db = get_database()
 
-    existing = await db.users.find_one({"email": email})
+    existing = await get_global_database().users.find_one({"email": email})
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,11 +171,13 @@ async def register_user(name: str, email: str, password: str, role: str) -> dict
     user_doc = {
         "name": name,
         "email": email,
-        "password": hash_password(password),
+        "password": await hash_password_async(password),
         "role": role,
         "created_at": datetime.now(timezone.utc),
+        **await sync_fields(),
     }
 
     result = await db.users.insert_one(user_doc)
     user_doc["_id"] = result.inserted_id
+    index_user(user_doc)
     return user_entity(user_doc)
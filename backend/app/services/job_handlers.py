@@ -0,0 +1,40 @@
+from bson import ObjectId
+
+from app.db.mongodb import get_database
+from app.services.analytics_service import backfill_rollups
+from app.services.job_service import job_handler
+from app.services.message_archive_service import archive_old_messages
+from app.services.migration_service import run_migrations
+from app.services.user_service import reconcile_employee_load
+from app.services.sync_service import sync_fields
+
+
+@job_handler("users.cascade_delete")
+async def cascade_delete_user(payload: dict) -> dict:
+    db = get_database()
+    user_id = ObjectId(payload["user_id"])
+    result = await db.projects.update_many(
+        {"employee_ids": user_id},
+        {"$pull": {"employee_ids": user_id}, "$set": await sync_fields()},
+    )
+    return {"projects_updated": result.modified_count}
+
+
+@job_handler("analytics.backfill_rollups")
+async def backfill_analytics(payload: dict) -> dict:
+    return await backfill_rollups()
+
+
+@job_handler("employees.reconcile_load")
+async def reconcile_load(payload: dict) -> dict:
+    return await reconcile_employee_load()
+
+
+@job_handler("messages.archive")
+async def archive_messages(payload: dict) -> dict:
+    return await archive_old_messages()
+
+
+@job_handler("migrations.run")
+async def apply_migrations(payload: dict) -> dict:
+    return await run_migrations()
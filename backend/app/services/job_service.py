@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import get_settings
+from app.core.logging import request_id_var
+from app.db.circuit_breaker import DatabaseUnavailable, breaker
+from app.db.mongodb import get_database, get_global_database
+from app.db.tenancy import tenant_scope
+from app.models.job_model import job_entity, jobs_entity
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[Optional[dict]]]
+JOB_HANDLERS: dict = {}
+
+
+def job_handler(job_type: str):
+    """Register a coroutine as the handler for `job_type`.
+
+    Jobs can be retried or re-claimed after a crash, so handlers must be
+    idempotent.
+    """
+
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = fn
+        return fn
+
+    return decorator
+
+
+async def enqueue_job(
+    job_type: str,
+    payload: dict,
+    idempotency_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+) -> dict:
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"No handler registered for job type '{job_type}'")
+
+    db = get_database()
+    now = datetime.now(timezone.utc)
+    job_doc = {
+        "type": job_type,
+        "payload": payload,
+        "status": "PENDING",
+        "attempts": 0,
+        "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+        "run_after": now,
+        "created_at": now,
+        "updated_at": now,
+        # Lets the job's log records be traced back to the request that queued it
+        "request_id": request_id_var.get(),
+    }
+    if idempotency_key:
+        job_doc["idempotency_key"] = idempotency_key
+
+    try:
+        result = await db.jobs.insert_one(job_doc)
+    except DuplicateKeyError:
+        existing = await get_global_database().jobs.find_one(
+            {"idempotency_key": idempotency_key}
+        )
+        return job_entity(existing)
+
+    job_doc["_id"] = result.inserted_id
+    worker_pool.notify()
+    return job_entity(job_doc)
+
+
+async def get_job(job_id: str) -> dict:
+    db = get_database()
+    job = await db.jobs.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job_entity(job)
+
+
+async def get_jobs(
+    job_status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    limit: int = 100,
+) -> list:
+    db = get_database()
+    query = {}
+    if job_status:
+        query["status"] = job_status
+    if job_type:
+        query["type"] = job_type
+    jobs = await db.jobs.find(query).sort("created_at", -1).to_list(limit)
+    return jobs_entity(jobs)
+
+
+async def claim_next_job() -> Optional[dict]:
+    """Atomically lease the oldest runnable job, including ones whose lease expired.
+
+    Workers serve every tenant; each job runs in the scope of the tenant that queued it.
+    A job whose last allowed attempt lost its lease (e.g. it keeps killing its
+    worker) is failed instead of leased again.
+    """
+    db = get_global_database()
+    now = datetime.now(timezone.utc)
+    expired = {"status": "RUNNING", "lease_expires_at": {"$lte": now}}
+    await db.jobs.update_many(
+        {**expired, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+        {
+            "$set": {
+                "status": "FAILED",
+                "error": "Lease expired on the last attempt",
+                "finished_at": now,
+                "updated_at": now,
+            }
+        },
+    )
+    return await db.jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": "PENDING", "run_after": {"$lte": now}},
+                {**expired, "$expr": {"$lt": ["$attempts", "$max_attempts"]}},
+            ]
+        },
+        {
+            "$set": {
+                "status": "RUNNING",
+                "started_at": now,
+                "lease_expires_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_after", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def run_job(job: dict) -> None:
+    request_token = request_id_var.set(job.get("request_id") or f"job-{job['_id']}")
+    try:
+        with tenant_scope(job.get("tenant_id")):
+            await _run_job(job)
+    finally:
+        request_id_var.reset(request_token)
+
+
+async def _run_job(job: dict) -> None:
+    db = get_global_database()
+    # Another worker may re-claim the job if this run outlives its lease; the
+    # attempt number identifies this run's lease, so only it writes the outcome
+    lease = {"_id": job["_id"], "status": "RUNNING", "attempts": job["attempts"]}
+    handler = JOB_HANDLERS.get(job["type"])
+    log_fields = {"job_id": str(job["_id"]), "job_type": job["type"], "attempt": job["attempts"]}
+    started = time.perf_counter()
+    try:
+        if handler is None:
+            raise RuntimeError(f"No handler registered for job type '{job['type']}'")
+        result = await handler(job.get("payload", {}))
+    except Exception as e:
+        logger.exception("Job %s failed", job["type"], extra=log_fields)
+        now = datetime.now(timezone.utc)
+        update = {"error": f"{type(e).__name__}: {e}", "updated_at": now}
+        if handler is not None and job["attempts"] < job["max_attempts"]:
+            backoff = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1)
+            update.update(
+                {"status": "PENDING", "run_after": now + timedelta(seconds=backoff)}
+            )
+        else:
+            update.update({"status": "FAILED", "finished_at": now})
+        await db.jobs.update_one(lease, {"$set": update})
+        return
+
+    logger.info(
+        "Job %s succeeded",
+        job["type"],
+        extra={**log_fields, "duration_ms": round((time.perf_counter() - started) * 1000, 2)},
+    )
+    now = datetime.now(timezone.utc)
+    await db.jobs.update_one(
+        lease,
+        {
+            "$set": {
+                "status": "SUCCEEDED",
+                "result": result,
+                "error": None,
+                "finished_at": now,
+                "updated_at": now,
+            }
+        },
+    )
+
+
+class JobWorkerPool:
+    """Fixed number of asyncio workers draining the `jobs` collection."""
+
+    def __init__(self):
+        self._tasks: list = []
+        self._schedules: list = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self, concurrency: int) -> None:
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(concurrency)
+        ]
+
+    def schedule(self, job_type: str, interval_seconds: float) -> None:
+        """Enqueue `job_type` every interval; the slot-based key dedupes across app instances."""
+        self._schedules.append(
+            asyncio.create_task(
+                self._enqueue_periodically(job_type, interval_seconds),
+                name=f"job-schedule-{job_type}",
+            )
+        )
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        tasks = self._tasks + self._schedules
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._schedules = []
+
+    async def _enqueue_periodically(self, job_type: str, interval_seconds: float) -> None:
+        while not self._stopping:
+            slot = int(time.time() // interval_seconds)
+            try:
+                await enqueue_job(job_type, {}, idempotency_key=f"{job_type}:{slot}")
+            except Exception as e:
+                logger.warning("Scheduling %s failed: %s", job_type, e)
+            await asyncio.sleep(interval_seconds)
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            try:
+                job = await claim_next_job()
+            except DatabaseUnavailable:
+                # Wait out the open circuit quietly; the breaker already logged why
+                await asyncio.sleep(breaker.retry_after() or settings.JOB_POLL_INTERVAL_SECONDS)
+                continue
+            except Exception as e:
+                logger.warning("Job claim failed: %s", e)
+                job = None
+
+            if job is not None:
+                try:
+                    await run_job(job)
+                except Exception:
+                    # The outcome couldn't be recorded; the lease expires and the job is retried
+                    logger.exception("Job %s could not be finalized", job["type"])
+                continue
+
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+worker_pool = JobWorkerPool()
@@ -0,0 +1,161 @@
+import calendar
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.config import get_settings
+from app.db.mongodb import get_database, get_global_database
+from app.db.tenancy import DEFAULT_TENANT
+from app.models.message_model import archived_message_entity, messages_entity
+
+settings = get_settings()
+
+
+def conversation_key(a, b) -> str:
+    return ":".join(sorted((str(a), str(b))))
+
+
+def _month(when: datetime) -> str:
+    return when.strftime("%Y-%m")
+
+
+def _bucket_expiry(when: datetime):
+    if settings.MESSAGE_ARCHIVE_TTL_DAYS <= 0:
+        return None
+    last_day = calendar.monthrange(when.year, when.month)[1]
+    month_end = datetime(when.year, when.month, last_day, tzinfo=timezone.utc)
+    return month_end + timedelta(days=settings.MESSAGE_ARCHIVE_TTL_DAYS + 1)
+
+
+async def archive_old_messages() -> dict:
+    """Move messages older than the retention window into per-conversation monthly buckets.
+
+    A bucket holds at most `MESSAGE_ARCHIVE_BUCKET_SIZE` messages, so a busy
+    conversation fills several buckets per month instead of outgrowing the
+    document size limit. Each batch is first written to its buckets and
+    only then deleted from `messages`. Messages a previous, interrupted run
+    already archived are skipped, so a retry adds no duplicates. One run
+    covers every tenant; user ids are globally unique, so conversation keys
+    never collide.
+    """
+    if settings.MESSAGE_RETENTION_DAYS <= 0:
+        return {"archived": 0}
+
+    db = get_global_database()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.MESSAGE_RETENTION_DAYS)
+    capacity = settings.MESSAGE_ARCHIVE_BUCKET_SIZE
+    archived = 0
+
+    while True:
+        batch = await db.messages.find({"created_at": {"$lt": cutoff}}).sort(
+            "created_at", 1
+        ).to_list(settings.MESSAGE_ARCHIVE_BATCH_SIZE)
+        if not batch:
+            break
+
+        ids = [m["_id"] for m in batch]
+        already = set()
+        async for bucket in db.message_archive.find(
+            {"messages._id": {"$in": ids}}, {"messages._id": 1}
+        ):
+            already.update(m["_id"] for m in bucket["messages"])
+        already.intersection_update(ids)
+
+        conversations = {}
+        for m in batch:
+            if m["_id"] in already:
+                continue
+            key = (
+                m.get("tenant_id", DEFAULT_TENANT),
+                conversation_key(m["sender_id"], m["receiver_id"]),
+                _month(m["created_at"]),
+            )
+            conversation = conversations.setdefault(
+                key,
+                {
+                    "participants": sorted({m["sender_id"], m["receiver_id"]}, key=str),
+                    "expires_at": _bucket_expiry(m["created_at"]),
+                    "messages": [],
+                },
+            )
+            compact = {
+                "_id": m["_id"],
+                "s": m["sender_id"],
+                "r": m["receiver_id"],
+                "c": m["content"],
+                "t": m["created_at"],
+            }
+            if m.get("attachment_ids"):
+                compact["a"] = m["attachment_ids"]
+            conversation["messages"].append(compact)
+
+        operations = []
+        for (tenant_id, key, month), conversation in conversations.items():
+            on_insert = {"participants": conversation["participants"]}
+            if conversation["expires_at"]:
+                on_insert["expires_at"] = conversation["expires_at"]
+            messages = conversation["messages"]
+            for start in range(0, len(messages), capacity):
+                chunk = messages[start:start + capacity]
+                times = [m["t"] for m in chunk]
+                # Appends to a bucket of this conversation and month with room
+                # for the chunk, or starts a new one when all are full
+                operations.append(
+                    UpdateOne(
+                        {
+                            "tenant_id": tenant_id,
+                            "conversation": key,
+                            "month": month,
+                            "count": {"$lte": capacity - len(chunk)},
+                        },
+                        {
+                            "$push": {"messages": {"$each": chunk}},
+                            "$inc": {"count": len(chunk)},
+                            "$setOnInsert": on_insert,
+                            "$min": {"first_at": min(times)},
+                            "$max": {"last_at": max(times)},
+                        },
+                        upsert=True,
+                    )
+                )
+        if operations:
+            await db.message_archive.bulk_write(operations, ordered=False)
+        await db.messages.delete_many({"_id": {"$in": ids}})
+        archived += len(batch) - len(already)
+
+    return {"archived": archived}
+
+
+async def get_message_history(user_id: str, before: datetime, limit: int) -> list:
+    """Newest-first page of a user's messages older than `before`, across both tiers."""
+    db = get_database()
+    oid = ObjectId(user_id)
+    if before.tzinfo is not None:
+        before = before.astimezone(timezone.utc).replace(tzinfo=None)
+    hot = await db.messages.find(
+        {
+            "$or": [{"sender_id": oid}, {"receiver_id": oid}],
+            "created_at": {"$lt": before},
+        }
+    ).sort("created_at", -1).to_list(limit)
+    history = messages_entity(hot)
+    if len(history) >= limit:
+        return history
+
+    # Buckets are whole months, so finish the month we are in before stopping
+    archived = []
+    current_month = None
+    async for bucket in db.message_archive.find(
+        {"participants": oid, "month": {"$lte": _month(before)}}
+    ).sort("month", -1):
+        if bucket["month"] != current_month:
+            if len(history) + len(archived) >= limit:
+                break
+            current_month = bucket["month"]
+        archived.extend(
+            m for m in bucket["messages"] if m["t"] < before
+        )
+
+    archived.sort(key=lambda m: m["t"], reverse=True)
+    history.extend(archived_message_entity(m) for m in archived)
+    return history[:limit]
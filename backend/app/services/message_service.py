@@ -1,11 +1,31 @@
+import hashlib
+import time
 from datetime import datetime, timezone
+from typing import List, Optional
 from bson import ObjectId
+from fastapi import HTTPException, status
+from pymongo.errors import BulkWriteError
 
+from app.core.config import get_settings
+from app.db.group_commit import GroupCommitBuffer
 from app.db.mongodb import get_database
 from app.models.message_model import message_entity, messages_entity
+from app.services.sync_service import sync_fields, stamp_sync_fields
+from app.services.attachment_service import share_attachments
 
+settings = get_settings()
 
-async def send_message(sender_id: str, receiver_id: str, content: str) -> dict:
+message_buffer = GroupCommitBuffer(
+    "messages",
+    max_batch=settings.MESSAGE_GROUP_COMMIT_MAX_BATCH,
+    window_ms=settings.MESSAGE_GROUP_COMMIT_WINDOW_MS,
+    prepare=stamp_sync_fields,
+)
+
+
+async def send_message(
+    sender_id: str, receiver_id: str, content: str, attachment_ids: list = ()
+) -> dict:
     db = get_database()
     message_doc = {
         "sender_id": ObjectId(sender_id),
@@ -13,6 +33,15 @@ async def send_message(sender_id: str, receiver_id: str, content: str) -> dict:
         "content": content,
         "created_at": datetime.now(timezone.utc),
     }
+    if attachment_ids:
+        message_doc["attachment_ids"] = await share_attachments(
+            sender_id, list(attachment_ids), receiver_id
+        )
+    if settings.MESSAGE_GROUP_COMMIT:
+        await message_buffer.insert(message_doc)
+        return message_entity(message_doc)
+
+    message_doc.update(await sync_fields())
     result = await db.messages.insert_one(message_doc)
     message_doc["_id"] = result.inserted_id
     return message_entity(message_doc)
@@ -25,3 +54,98 @@ async def get_user_messages(user_id: str) -> list:
         {"$or": [{"sender_id": oid}, {"receiver_id": oid}]}
     ).sort("created_at", 1).to_list(1000)
     return messages_entity(messages)
+
+
+async def resolve_audience(sender_id: str, roles: List[str], project_ids: List[str]) -> list:
+    """Ids of every user with one of `roles` or on one of `project_ids`, minus the sender."""
+    db = get_database()
+    members = set()
+    if project_ids:
+        async for project in db.projects.find(
+            {"_id": {"$in": [ObjectId(pid) for pid in project_ids]}},
+            {"client_id": 1, "employee_ids": 1},
+        ):
+            members.add(project["client_id"])
+            members.update(project.get("employee_ids", []))
+
+    audience = []
+    if roles:
+        audience.append({"role": {"$in": roles}})
+    if members:
+        audience.append({"_id": {"$in": list(members)}})
+    if not audience:
+        return []
+    return [
+        user["_id"]
+        async for user in db.users.find(
+            {"$or": audience, "_id": {"$ne": ObjectId(sender_id)}}, {"_id": 1}
+        )
+    ]
+
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+async def broadcast_message(
+    sender_id: str,
+    content: str,
+    roles: List[str],
+    project_ids: List[str],
+    idempotency_key: Optional[str] = None,
+) -> dict:
+    """Deliver one message to a whole audience with a few unordered bulk inserts.
+
+    Each recipient gets an ordinary message, so inboxes, delta sync and the
+    archive treat broadcasts like any other conversation. With an
+    `idempotency_key` the broadcast id is derived from it. A unique index
+    on (broadcast_id, receiver_id) then lets a retry after a partial failure
+    skip everyone who already got the message.
+    """
+    if not roles and not project_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Choose at least one role or project",
+        )
+    db = get_database()
+    started = time.perf_counter()
+    recipients = await resolve_audience(sender_id, roles, project_ids)
+    broadcast_id = (
+        ObjectId(hashlib.sha256(f"{sender_id}|{idempotency_key}".encode()).digest()[:12])
+        if idempotency_key
+        else ObjectId()
+    )
+    sender = ObjectId(sender_id)
+    now = datetime.now(timezone.utc)
+
+    delivered = failed = batches = 0
+    size = settings.BROADCAST_BATCH_SIZE
+    for start in range(0, len(recipients), size):
+        docs = [
+            {
+                "sender_id": sender,
+                "receiver_id": receiver,
+                "content": content,
+                "broadcast_id": broadcast_id,
+                "created_at": now,
+            }
+            for receiver in recipients[start:start + size]
+        ]
+        await stamp_sync_fields(docs)
+        batches += 1
+        try:
+            result = await db.messages.insert_many(docs, ordered=False)
+            delivered += len(result.inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            already = sum(1 for error in errors if error.get("code") == DUPLICATE_KEY_ERROR)
+            delivered += e.details.get("nInserted", 0) + already
+            failed += len(errors) - already
+
+    return {
+        "broadcast_id": str(broadcast_id),
+        "recipients": len(recipients),
+        "delivered": delivered,
+        "failed": failed,
+        "batches": batches,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
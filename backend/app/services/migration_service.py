@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import get_settings
+from app.db.circuit_breaker import breaker
+from app.db.mongodb import get_global_database
+from app.db.tenancy import DEFAULT_TENANT, tenant_scope
+from app.services.job_service import enqueue_job
+from app.services.sync_service import next_sequence
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Turns one document into the writes that migrate it; no writes means it is already migrated
+Transform = Callable[[dict], list]
+
+
+class Step:
+    """Rewrite the documents of `collection` matching `query`, one batch at a time.
+
+    Documents are visited in `_id` order and the last `_id` of each batch is
+    checkpointed, so an interrupted step resumes where it stopped. `query`
+    should stop matching a document once it is migrated, which keeps a
+    re-run of the same batch harmless. With `resync`, rewritten documents get
+    a new sync sequence so offline clients pick up the change.
+    """
+
+    def __init__(self, collection: str, query: dict, transform: Transform, resync: bool = False):
+        self.collection = collection
+        self.query = query
+        self.transform = transform
+        self.resync = resync
+
+
+class Migration:
+    def __init__(
+        self,
+        version: str,
+        description: str,
+        steps: List[Step],
+        finalize: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        self.version = version
+        self.description = description
+        self.steps = steps
+        self.finalize = finalize
+
+
+MIGRATIONS: dict = {}
+
+
+def register_migration(migration: Migration) -> Migration:
+    """Register a migration. Versions sort lexically and run in that order."""
+    if migration.version in MIGRATIONS:
+        raise ValueError(f"Migration '{migration.version}' is already registered")
+    MIGRATIONS[migration.version] = migration
+    return migration
+
+
+class LeaseLost(Exception):
+    """Another runner took the migration over after our lease expired."""
+
+
+async def get_migrations() -> list:
+    db = get_global_database()
+    states = {m["_id"]: m async for m in db.migrations.find({})}
+    return [
+        _migration_entity(migration, states.get(version))
+        for version, migration in sorted(MIGRATIONS.items())
+    ]
+
+
+def _migration_entity(migration: Migration, state: Optional[dict]) -> dict:
+    state = state or {}
+    return {
+        "version": migration.version,
+        "description": migration.description,
+        "status": state.get("status", "pending"),
+        "step": state.get("step", 0),
+        "steps": len(migration.steps),
+        "step_total": state.get("step_total"),
+        "step_scanned": state.get("step_scanned", 0),
+        "scanned": state.get("scanned", 0),
+        "modified": state.get("modified", 0),
+        "error": state.get("error"),
+        "started_at": state["started_at"].isoformat() if state.get("started_at") else None,
+        "updated_at": state["updated_at"].isoformat() if state.get("updated_at") else None,
+        "finished_at": state["finished_at"].isoformat() if state.get("finished_at") else None,
+    }
+
+
+async def has_pending_migrations() -> bool:
+    db = get_global_database()
+    completed = await db.migrations.count_documents(
+        {"_id": {"$in": list(MIGRATIONS)}, "status": "completed"}
+    )
+    return completed < len(MIGRATIONS)
+
+
+async def schedule_pending_migrations() -> None:
+    """Queue a background run at startup when some migration hasn't completed yet."""
+    try:
+        if await has_pending_migrations():
+            await enqueue_job("migrations.run", {})
+    except Exception as e:
+        # The next restart, or an admin, can start them instead
+        logger.warning("Could not schedule pending migrations: %s", e)
+
+
+async def run_migrations() -> dict:
+    """Run every pending migration in version order.
+
+    Safe to start from several places at once: each migration is leased by a
+    single runner, and a migration never starts before the ones before it
+    have completed.
+    """
+    owner = uuid.uuid4().hex
+    results = {}
+    for version, migration in sorted(MIGRATIONS.items()):
+        state = await _claim(migration, owner)
+        if state is None:
+            current = await get_global_database().migrations.find_one({"_id": version})
+            if current and current["status"] == "completed":
+                continue
+            results[version] = "running elsewhere"
+            break
+        await _run(migration, state, owner)
+        results[version] = "completed"
+    return results
+
+
+async def _claim(migration: Migration, owner: str) -> Optional[dict]:
+    db = get_global_database()
+    now = datetime.now(timezone.utc)
+    try:
+        await db.migrations.insert_one(
+            {
+                "_id": migration.version,
+                "description": migration.description,
+                "status": "pending",
+                "step": 0,
+                "last_id": None,
+                "scanned": 0,
+                "modified": 0,
+                "created_at": now,
+            }
+        )
+    except DuplicateKeyError:
+        pass
+    return await db.migrations.find_one_and_update(
+        {
+            "_id": migration.version,
+            "$or": [
+                {"status": {"$in": ["pending", "failed"]}},
+                {"status": "running", "lease_expires_at": {"$lte": now}},
+            ],
+        },
+        {
+            "$set": {
+                "status": "running",
+                "owner": owner,
+                "lease_expires_at": now + timedelta(seconds=settings.MIGRATION_LEASE_SECONDS),
+                "updated_at": now,
+                "error": None,
+            },
+            "$min": {"started_at": now},
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _run(migration: Migration, state: dict, owner: str) -> None:
+    db = get_global_database()
+    logger.info(
+        "Running migration %s from step %s",
+        migration.version,
+        state["step"],
+        extra={"migration": migration.version},
+    )
+    try:
+        for index in range(state["step"], len(migration.steps)):
+            resume_from = state["last_id"] if index == state["step"] else None
+            await _run_step(migration, index, resume_from, owner, fresh=resume_from is None)
+        if migration.finalize:
+            await migration.finalize()
+    except LeaseLost:
+        logger.warning("Migration %s was taken over by another runner", migration.version)
+        raise
+    except Exception as e:
+        await db.migrations.update_one(
+            {"_id": migration.version, "owner": owner},
+            {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.now(timezone.utc)}},
+        )
+        logger.exception("Migration %s failed", migration.version)
+        raise
+
+    now = datetime.now(timezone.utc)
+    await db.migrations.update_one(
+        {"_id": migration.version, "owner": owner},
+        {"$set": {"status": "completed", "finished_at": now, "updated_at": now}},
+    )
+    logger.info("Migration %s completed", migration.version)
+
+
+async def _run_step(
+    migration: Migration, index: int, last_id, owner: str, fresh: bool
+) -> None:
+    db = get_global_database()
+    step = migration.steps[index]
+    collection = db[step.collection]
+    if fresh:
+        # A rough total for progress reporting; documents written meanwhile may add to it
+        await _checkpoint(
+            migration,
+            owner,
+            {"step": index, "last_id": None, "step_scanned": 0,
+             "step_total": await collection.count_documents(step.query)},
+        )
+
+    while True:
+        breaker.check()
+        started = time.monotonic()
+        query = step.query if last_id is None else {"$and": [step.query, {"_id": {"$gt": last_id}}]}
+        docs = await collection.find(query).sort("_id", 1).to_list(settings.MIGRATION_BATCH_SIZE)
+        if not docs:
+            break
+
+        ops, touched = [], []
+        for doc in docs:
+            writes = step.transform(doc)
+            if writes:
+                ops.extend(writes)
+                touched.append(doc)
+        modified = 0
+        if ops:
+            result = await collection.bulk_write(ops)
+            modified = result.modified_count + result.upserted_count
+            if step.resync:
+                await _resync(collection, touched)
+
+        last_id = docs[-1]["_id"]
+        await _checkpoint(
+            migration,
+            owner,
+            {"last_id": last_id},
+            {"scanned": len(docs), "step_scanned": len(docs), "modified": modified},
+        )
+
+        # Leave the database idle for part of the time so live traffic keeps its latency
+        elapsed = time.monotonic() - started
+        duty = settings.MIGRATION_MAX_DUTY_CYCLE
+        await asyncio.sleep(
+            max(settings.MIGRATION_BATCH_DELAY_MS / 1000, elapsed * (1 - duty) / duty)
+        )
+
+    if index + 1 < len(migration.steps):
+        await _checkpoint(migration, owner, {"step": index + 1, "last_id": None})
+
+
+async def _checkpoint(migration: Migration, owner: str, fields: dict, counts: Optional[dict] = None) -> None:
+    """Save progress and renew the lease; fail if another runner owns the migration now."""
+    db = get_global_database()
+    now = datetime.now(timezone.utc)
+    update = {
+        "$set": {
+            **fields,
+            "updated_at": now,
+            "lease_expires_at": now + timedelta(seconds=settings.MIGRATION_LEASE_SECONDS),
+        }
+    }
+    if counts:
+        update["$inc"] = counts
+    result = await db.migrations.update_one({"_id": migration.version, "owner": owner}, update)
+    if result.matched_count == 0:
+        raise LeaseLost(migration.version)
+
+
+async def _resync(collection, docs: list) -> None:
+    by_tenant = defaultdict(list)
+    for doc in docs:
+        by_tenant[doc.get("tenant_id", DEFAULT_TENANT)].append(doc["_id"])
+    now = datetime.now(timezone.utc)
+    for tenant_id, ids in by_tenant.items():
+        with tenant_scope(tenant_id):
+            last_seq = await next_sequence(len(ids))
+        first_seq = last_seq - len(ids) + 1
+        await collection.bulk_write(
+            [
+                UpdateOne({"_id": doc_id}, {"$set": {"seq": first_seq + i, "updated_at": now}})
+                for i, doc_id in enumerate(ids)
+            ],
+            ordered=False,
+        )
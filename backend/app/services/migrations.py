@@ -0,0 +1,122 @@
+"""Registered data migrations, applied in version order by `migration_service`."""
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+
+from app.db.mongodb import get_global_database
+from app.db.tenancy import DEFAULT_TENANT, tenant_scope
+from app.services.migration_service import Migration, Step, register_migration
+from app.services.user_service import reconcile_employee_load
+
+
+# ── 0001: assign pre-tenancy data to the default tenant ──
+# Frozen copy of the tenant collections of the time: checkpoints refer to steps by position
+PRE_TENANCY_COLLECTIONS = {
+    "users": "tenant_id",
+    "services": "tenant_id",
+    "service_requests": "tenant_id",
+    "projects": "tenant_id",
+    "messages": "tenant_id",
+    "message_archive": "tenant_id",
+    "project_activity": "tenant_id",
+    "tombstones": "tenant_id",
+    "attachment_usage": "tenant_id",
+    "attachments.files": "metadata.tenant_id",
+    "jobs": "tenant_id",
+}
+
+
+def _stamp_tenant(field: str):
+    def transform(doc: dict) -> list:
+        return [UpdateOne({"_id": doc["_id"]}, {"$set": {field: DEFAULT_TENANT}})]
+
+    return transform
+
+
+def _rekey_rollup(doc: dict) -> list:
+    # Rollups were keyed by day alone; tenant rollups are keyed "<tenant>:<day>"
+    day = doc["_id"]
+    fields = {k: v for k, v in doc.items() if k != "_id"}
+    return [
+        UpdateOne(
+            {"_id": f"{DEFAULT_TENANT}:{day}"},
+            {"$set": {**fields, "day": day, "tenant_id": DEFAULT_TENANT}},
+            upsert=True,
+        ),
+        DeleteOne({"_id": day}),
+    ]
+
+
+def _carry_sync_counter(doc: dict) -> list:
+    # Keeps the watermarks clients already hold valid
+    return [
+        UpdateOne(
+            {"_id": f"sync_seq:{DEFAULT_TENANT}"}, {"$max": {"seq": doc["seq"]}}, upsert=True
+        ),
+        DeleteOne({"_id": "sync_seq"}),
+    ]
+
+
+register_migration(
+    Migration(
+        "0001_tenant_backfill",
+        "Assign data created before multi-tenancy to the default tenant",
+        [
+            Step(name, {field: {"$exists": False}}, _stamp_tenant(field))
+            for name, field in PRE_TENANCY_COLLECTIONS.items()
+        ]
+        + [
+            Step("daily_rollups", {"tenant_id": {"$exists": False}}, _rekey_rollup),
+            Step("counters", {"_id": "sync_seq"}, _carry_sync_counter),
+        ],
+    )
+)
+
+
+# ── 0002: project members stored as ObjectIds in employee_ids ──
+def _as_object_id(value):
+    if isinstance(value, str) and ObjectId.is_valid(value):
+        return ObjectId(value)
+    return value
+
+
+def _normalize_project_members(project: dict) -> list:
+    employee_ids = []
+    for eid in list(project.get("employee_ids") or []) + list(project.get("assigned_employees") or []):
+        eid = _as_object_id(eid)
+        if isinstance(eid, ObjectId) and eid not in employee_ids:
+            employee_ids.append(eid)
+    update = {
+        "$set": {"employee_ids": employee_ids, "client_id": _as_object_id(project.get("client_id"))},
+        "$unset": {"assigned_employees": ""},
+    }
+    return [UpdateOne({"_id": project["_id"]}, update)]
+
+
+async def _reconcile_all_tenants() -> None:
+    # Active-project counters were derived from the old field, so recount them
+    for tenant_id in await get_global_database().projects.distinct("tenant_id"):
+        with tenant_scope(tenant_id):
+            await reconcile_employee_load()
+
+
+register_migration(
+    Migration(
+        "0002_project_employee_ids",
+        "Move legacy assigned_employees strings into employee_ids as ObjectIds",
+        [
+            Step(
+                "projects",
+                {
+                    "$or": [
+                        {"assigned_employees": {"$exists": True}},
+                        {"employee_ids": {"$type": "string"}},
+                        {"client_id": {"$type": "string"}},
+                    ]
+                },
+                _normalize_project_members,
+                resync=True,
+            )
+        ],
+        finalize=_reconcile_all_tenants,
+    )
+)
@@ -0,0 +1,47 @@
+import re
+from typing import Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from app.db.mongodb import get_database
+from app.models.profile_model import profiles_entity, profile_detail_entity
+
+profile_not_found = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Profile not found",
+)
+
+
+async def get_profiles(path: Optional[str] = None, limit: int = 50) -> list:
+    db = get_database()
+    query = {"path": {"$regex": f"^{re.escape(path)}"}} if path else {}
+    profiles = await db.request_profiles.aggregate(
+        [
+            {"$match": query},
+            {"$sort": {"created_at": -1}},
+            {"$limit": limit},
+            # The flamegraph can be megabytes; lists only need to know it is there
+            {"$addFields": {"has_flamegraph": {"$ne": [{"$ifNull": ["$speedscope", None]}, None]}}},
+            {"$project": {"speedscope": 0, "db_commands": 0}},
+        ]
+    ).to_list(limit)
+    return profiles_entity(profiles)
+
+
+async def get_profile(profile_id: str) -> dict:
+    db = get_database()
+    profile = await db.request_profiles.find_one({"_id": ObjectId(profile_id)})
+    if not profile:
+        raise profile_not_found
+    return profile_detail_entity(profile)
+
+
+async def get_profile_speedscope(profile_id: str) -> bytes:
+    """The gzip-compressed speedscope JSON, as stored."""
+    db = get_database()
+    profile = await db.request_profiles.find_one(
+        {"_id": ObjectId(profile_id)}, {"speedscope": 1}
+    )
+    if not profile or not profile.get("speedscope"):
+        raise profile_not_found
+    return bytes(profile["speedscope"])
@@ -1,9 +1,33 @@
 from datetime import datetime, timezone
+from typing import Optional
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument
 
+from app.core.singleflight import coalesce
 from app.db.mongodb import get_database
-from app.models.project_model import project_entity, projects_entity
+from app.db.query import (
+    date_range,
+    text_search,
+    sort_spec,
+    aggregate_page,
+    lookup_names,
+)
+from app.models.project_model import project_entity, project_details_entity
+from app.services.sync_service import sync_fields, record_tombstone
+from app.services.activity_service import log_project_event
+from app.services.user_service import adjust_employee_load
+from app.services.typeahead_service import index_project
+from app.services.analytics_service import (
+    record_employees_assigned,
+    record_project_completed,
+)
+
+PROJECT_SORT_FIELDS = {"name", "status", "created_at"}
+PROJECT_LOOKUPS = [
+    lookup_names("users", "client_id", "client"),
+    lookup_names("users", "employee_ids", "employees"),
+]
 
 
 async def create_project(
@@ -11,8 +35,10 @@ async def create_project(
     description: str,
     client_id: str,
     service_request_id: str,
+    actor_id: Optional[str] = None,
 ) -> dict:
     db = get_database()
+    now = datetime.now(timezone.utc)
     project_doc = {
         "name": name,
         "description": description,
@@ -20,62 +46,166 @@ async def create_project(
         "service_request_id": ObjectId(service_request_id),
         "employee_ids": [],
         "status": "NOT_STARTED",
-        "created_at": datetime.now(timezone.utc),
+        "status_changed_at": now,
+        "created_at": now,
+        **await sync_fields(),
     }
     result = await db.projects.insert_one(project_doc)
     project_doc["_id"] = result.inserted_id
+    index_project(project_doc)
+    log_project_event(result.inserted_id, "created", actor_id, to_status="NOT_STARTED")
     return project_entity(project_doc)
 
 
-async def get_all_projects() -> list:
+@coalesce
+async def get_all_projects(
+    status: Optional[str] = None,
+    client_id: Optional[str] = None,
+    employee_id: Optional[str] = None,
+    search: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = 0,
+    limit: int = 1000,
+) -> list:
     db = get_database()
-    projects = await db.projects.find().to_list(1000)
-    return projects_entity(projects)
+    query = {
+        **date_range("created_at", created_from, created_to),
+        **text_search(search),
+    }
+    if status:
+        query["status"] = status
+    if client_id:
+        query["client_id"] = ObjectId(client_id)
+    if employee_id:
+        query["employee_ids"] = ObjectId(employee_id)
+    projects = await aggregate_page(
+        db.projects,
+        query,
+        sort_spec(sort, PROJECT_SORT_FIELDS),
+        skip,
+        limit,
+        PROJECT_LOOKUPS,
+    )
+    return project_details_entity(projects)
 
 
 async def get_projects_by_client(client_id: str) -> list:
-    db = get_database()
-    projects = await db.projects.find(
-        {"client_id": ObjectId(client_id)}
-    ).to_list(1000)
-    return projects_entity(projects)
+    return await get_all_projects(client_id=client_id)
 
 
 async def get_projects_by_employee(employee_id: str) -> list:
-    db = get_database()
-    projects = await db.projects.find(
-        {"employee_ids": ObjectId(employee_id)}
-    ).to_list(1000)
-    return projects_entity(projects)
+    return await get_all_projects(employee_id=employee_id)
 
 
-async def assign_employees(project_id: str, employee_ids: list) -> dict:
+async def assign_employees(
+    project_id: str, employee_ids: list, actor_id: Optional[str] = None
+) -> dict:
     db = get_database()
     obj_employee_ids = [ObjectId(eid) for eid in employee_ids]
 
-    result = await db.projects.find_one_and_update(
+    changes = {"employee_ids": obj_employee_ids, **await sync_fields()}
+
+    previous = await db.projects.find_one_and_update(
         {"_id": ObjectId(project_id)},
-        {"$set": {"employee_ids": obj_employee_ids}},
-        return_document=True,
+        {"$set": changes},
+        return_document=ReturnDocument.BEFORE,
     )
-    if not result:
+    if not previous:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found",
         )
-    return project_entity(result)
+
+    # Employees taken off the project lose sight of it on their next sync
+    previous_ids = set(previous.get("employee_ids", []))
+    removed = previous_ids - set(obj_employee_ids)
+    if removed:
+        await record_tombstone("projects", project_id, audience=list(removed))
+
+    index_project({**previous, **changes})
+
+    added = [eid for eid in obj_employee_ids if eid not in previous_ids]
+    if added or removed:
+        log_project_event(
+            project_id, "employees_assigned", actor_id, added=added, removed=list(removed)
+        )
+    if added:
+        record_employees_assigned(added)
+    if previous["status"] != "COMPLETED":
+        await adjust_employee_load(added, 1)
+        await adjust_employee_load(list(removed), -1)
+
+    return project_entity({**previous, **changes})
 
 
-async def update_project_status(project_id: str, new_status: str) -> dict:
+async def unassign_employee(
+    project_id: str, employee_id: str, actor_id: Optional[str] = None
+) -> dict:
     db = get_database()
-    result = await db.projects.find_one_and_update(
+    employee_oid = ObjectId(employee_id)
+    changes = await sync_fields()
+    previous = await db.projects.find_one_and_update(
         {"_id": ObjectId(project_id)},
-        {"$set": {"status": new_status}},
-        return_document=True,
+        {"$pull": {"employee_ids": employee_oid}, "$set": changes},
+        return_document=ReturnDocument.BEFORE,
     )
-    if not result:
+    if not previous:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found",
         )
-    return project_entity(result)
+
+    remaining = [eid for eid in previous.get("employee_ids", []) if eid != employee_oid]
+    index_project({**previous, **changes, "employee_ids": remaining})
+    if employee_oid in previous.get("employee_ids", []):
+        await record_tombstone("projects", project_id, audience=[employee_oid])
+        log_project_event(
+            project_id, "employee_unassigned", actor_id, removed=[employee_oid]
+        )
+        if previous["status"] != "COMPLETED":
+            await adjust_employee_load([employee_oid], -1)
+
+    return project_entity({**previous, **changes, "employee_ids": remaining})
+
+
+async def update_project_status(
+    project_id: str, new_status: str, actor_id: Optional[str] = None
+) -> dict:
+    db = get_database()
+    now = datetime.now(timezone.utc)
+    changes = {"status": new_status, "status_changed_at": now, **await sync_fields()}
+    if new_status == "COMPLETED":
+        changes["completed_at"] = now
+    previous = await db.projects.find_one_and_update(
+        {"_id": ObjectId(project_id), "status": {"$ne": new_status}},
+        {"$set": changes},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not previous:
+        # Either the project does not exist or it already has this status
+        unchanged = await db.projects.find_one({"_id": ObjectId(project_id)})
+        if not unchanged:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found",
+            )
+        return project_entity(unchanged)
+
+    # The typeahead shows a project's status as its detail line
+    index_project({**previous, **changes})
+    log_project_event(
+        project_id,
+        "status_changed",
+        actor_id,
+        from_status=previous["status"],
+        to_status=new_status,
+        from_since=previous.get("status_changed_at") or previous["created_at"],
+    )
+    if new_status == "COMPLETED":
+        record_project_completed(previous, now)
+        await adjust_employee_load(previous.get("employee_ids", []), -1)
+    elif previous["status"] == "COMPLETED":
+        await adjust_employee_load(previous.get("employee_ids", []), 1)
+    return project_entity({**previous, **changes})
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+
+from app.core.singleflight import coalesce
+from app.db.mongodb import get_database
+from app.db.query import (
+    date_range,
+    text_search,
+    sort_spec,
+    find_page,
+    aggregate_page,
+    lookup_names,
+)
+from app.models.service_model import services_entity, service_request_details_entity
+
+SERVICE_SORT_FIELDS = {"name", "created_at"}
+SERVICE_REQUEST_SORT_FIELDS = {"status", "created_at"}
+SERVICE_REQUEST_LOOKUPS = [
+    lookup_names("users", "client_id", "client"),
+    lookup_names("services", "service_id", "service"),
+]
+
+
+@coalesce
+async def get_all_services(
+    search: Optional[str] = None,
+    sort: str = "name",
+    skip: int = 0,
+    limit: int = 1000,
+) -> list:
+    db = get_database()
+    query = text_search(search)
+    services = await find_page(
+        db.services, query, sort_spec(sort, SERVICE_SORT_FIELDS), skip, limit
+    )
+    return services_entity(services)
+
+
+async def get_all_service_requests(
+    status: Optional[str] = None,
+    client_id: Optional[str] = None,
+    service_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = 0,
+    limit: int = 1000,
+) -> list:
+    db = get_database()
+    query = date_range("created_at", created_from, created_to)
+    if status:
+        query["status"] = status
+    if client_id:
+        query["client_id"] = ObjectId(client_id)
+    if service_id:
+        query["service_id"] = ObjectId(service_id)
+    requests = await aggregate_page(
+        db.service_requests,
+        query,
+        sort_spec(sort, SERVICE_REQUEST_SORT_FIELDS),
+        skip,
+        limit,
+        SERVICE_REQUEST_LOOKUPS,
+    )
+    return service_request_details_entity(requests)
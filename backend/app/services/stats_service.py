@@ -0,0 +1,26 @@
+from app.core.singleflight import coalesce
+from app.db.mongodb import get_database
+
+
+@coalesce
+async def get_admin_stats() -> dict:
+    db = get_database()
+    total_users = await db.users.count_documents({})
+    total_employees = await db.users.count_documents({"role": "EMPLOYEE"})
+    total_clients = await db.users.count_documents({"role": "CLIENT"})
+    total_projects = await db.projects.count_documents({})
+    total_services = await db.services.count_documents({})
+    pending_requests = await db.service_requests.count_documents({"status": "PENDING"})
+    active_projects = await db.projects.count_documents({"status": "IN_PROGRESS"})
+    completed_projects = await db.projects.count_documents({"status": "COMPLETED"})
+
+    return {
+        "total_users": total_users,
+        "total_employees": total_employees,
+        "total_clients": total_clients,
+        "total_projects": total_projects,
+        "total_services": total_services,
+        "pending_requests": pending_requests,
+        "active_projects": active_projects,
+        "completed_projects": completed_projects,
+    }
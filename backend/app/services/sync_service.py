@@ -0,0 +1,191 @@
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.config import get_settings
+from app.db.mongodb import get_database
+from app.db.tenancy import current_tenant
+from app.models.user_model import user_entity
+from app.models.service_model import service_entity, service_request_entity
+from app.models.project_model import project_entity
+from app.models.message_model import message_entity
+
+settings = get_settings()
+
+SYNC_COUNTER_ID = "sync_seq"
+
+ENTITY_SERIALIZERS = {
+    "users": user_entity,
+    "services": service_entity,
+    "service_requests": service_request_entity,
+    "projects": project_entity,
+    "messages": message_entity,
+}
+
+
+def _counter_id() -> str:
+    # One sequence per tenant, so a tenant's writes never contend with another's
+    return f"{SYNC_COUNTER_ID}:{current_tenant.get()}"
+
+
+async def next_sequence(count: int = 1) -> int:
+    """Reserve `count` sync sequence numbers and return the highest one.
+
+    A sequence is reserved before the write that carries it commits. The
+    counter therefore also keeps two marks, each a past value of `seq` and
+    when it was taken, from which `settled_sequence` can tell which
+    sequences are old enough for their writes to be visible. A mark is
+    moved forward once it is `SYNC_SETTLE_SECONDS` old.
+    """
+    db = get_database()
+    now = time.time()
+    rotate = {"$lte": [{"$ifNull": ["$mark_at", 0]}, now - settings.SYNC_SETTLE_SECONDS]}
+    counter = await db.counters.find_one_and_update(
+        {"_id": _counter_id()},
+        [
+            {
+                "$set": {
+                    "prev_seq": {"$cond": [rotate, {"$ifNull": ["$mark_seq", 0]}, "$prev_seq"]},
+                    "mark_seq": {"$cond": [rotate, {"$ifNull": ["$seq", 0]}, "$mark_seq"]},
+                    "mark_at": {"$cond": [rotate, now, "$mark_at"]},
+                }
+            },
+            {"$set": {"seq": {"$add": [{"$ifNull": ["$seq", 0]}, count]}, "reserved_at": now}},
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return counter["seq"]
+
+
+async def settled_sequence() -> int:
+    """Highest sequence up to which every write has had time to commit.
+
+    Writes are assumed to commit within `SYNC_SETTLE_SECONDS` of reserving
+    their sequence. This lags the counter by up to twice that while the
+    tenant is writing, and catches up once it goes quiet.
+    """
+    db = get_database()
+    counter = await db.counters.find_one({"_id": _counter_id()})
+    if not counter:
+        return 0
+    cutoff = time.time() - settings.SYNC_SETTLE_SECONDS
+    if counter.get("reserved_at", 0) <= cutoff:
+        return counter["seq"]
+    if counter.get("mark_at", 0) <= cutoff:
+        return counter.get("mark_seq", 0)
+    # A mark only moves on once it is settled, so the previous one always is
+    return counter.get("prev_seq", 0)
+
+
+async def sync_fields() -> dict:
+    """Fields every insert/update must `$set` so delta sync can see the change."""
+    return {
+        "seq": await next_sequence(),
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+async def stamp_sync_fields(docs: list) -> None:
+    """Give a batch of new documents consecutive sequences with one counter update."""
+    last_seq = await next_sequence(len(docs))
+    now = datetime.now(timezone.utc)
+    for i, doc in enumerate(docs):
+        doc["seq"] = last_seq - len(docs) + 1 + i
+        doc["updated_at"] = now
+
+
+async def record_tombstone(
+    collection: str, doc_id: str, audience: Optional[list] = None
+) -> None:
+    """Record a delete, or with `audience` a loss of visibility for those users."""
+    db = get_database()
+    tombstone = {
+        "collection": collection,
+        "doc_id": str(doc_id),
+        "seq": await next_sequence(),
+        "deleted_at": datetime.now(timezone.utc),
+    }
+    if audience is not None:
+        tombstone["audience"] = [str(uid) for uid in audience]
+    await db.tombstones.insert_one(tombstone)
+
+
+def visible_filters(user: dict) -> dict:
+    """Per-collection filters describing what a role may see."""
+    oid = ObjectId(user["_id"])
+    own_messages = {"$or": [{"sender_id": oid}, {"receiver_id": oid}]}
+    role = user["role"]
+
+    if role == "ADMIN":
+        return {
+            "users": {},
+            "services": {},
+            "service_requests": {},
+            "projects": {},
+            "messages": own_messages,
+        }
+    if role == "EMPLOYEE":
+        return {
+            "projects": {"employee_ids": oid},
+            "messages": own_messages,
+        }
+    return {
+        "services": {},
+        "service_requests": {"client_id": oid},
+        "projects": {"client_id": oid},
+        "messages": own_messages,
+    }
+
+
+async def get_changes(user: dict, since: int) -> dict:
+    """Return records changed or deleted after the `since` watermark.
+
+    Records are delivered as upserts, so a change seen twice is harmless.
+    The watermark only covers settled sequences: a write that reserved its
+    sequence but hasn't committed yet is picked up by the next sync.
+    Both changes and deletes carry their `seq`, and clients must apply
+    them in that order, e.g. a project unassigned and then reassigned.
+    """
+    db = get_database()
+    # A watermark handed out earlier may be ahead of a mark taken since
+    watermark = max(since, await settled_sequence())
+    limit = settings.SYNC_PAGE_SIZE
+    filters = visible_filters(user)
+    has_more = False
+
+    changes = {}
+    for collection, visibility in filters.items():
+        docs = await db[collection].find(
+            {"$and": [visibility, {"seq": {"$gt": since}}]}
+        ).sort("seq", 1).limit(limit).to_list(limit)
+        changes[collection] = [
+            {**ENTITY_SERIALIZERS[collection](d), "seq": d["seq"]} for d in docs
+        ]
+        # A full page ending past the watermark already holds everything below it
+        if len(docs) == limit and docs[-1]["seq"] < watermark:
+            has_more = True
+            watermark = docs[-1]["seq"]
+
+    deleted = {collection: [] for collection in filters}
+    tombstones = await db.tombstones.find(
+        {
+            "seq": {"$gt": since},
+            "collection": {"$in": list(filters)},
+            "$or": [{"audience": {"$exists": False}}, {"audience": user["_id"]}],
+        }
+    ).sort("seq", 1).limit(limit).to_list(limit)
+    for t in tombstones:
+        deleted[t["collection"]].append({"id": t["doc_id"], "seq": t["seq"]})
+    if len(tombstones) == limit and tombstones[-1]["seq"] < watermark:
+        has_more = True
+        watermark = tombstones[-1]["seq"]
+
+    return {
+        "watermark": watermark,
+        "has_more": has_more,
+        "changes": changes,
+        "deleted": deleted,
+    }
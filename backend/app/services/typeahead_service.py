@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import logging
+import re
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+from app.core.config import get_settings
+from app.db.mongodb import get_global_database
+from app.db.tenancy import DEFAULT_TENANT, current_tenant
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+# Longer query tokens are looked up by their first MAX_PREFIX characters and then checked in full
+MAX_PREFIX = 12
+KINDS = ("users", "projects", "services")
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall(text.lower())
+
+
+class TenantIndex:
+    """Prefix index over one tenant's users, projects and services.
+
+    Every token of an entry's searchable text is registered under each of
+    its prefixes, so a query token is one dict lookup and a multi-word query
+    is an intersection of small sets. Project membership is kept in reverse
+    maps so visibility checks don't scan projects.
+    """
+
+    def __init__(self):
+        self.entries: dict = {}
+        self.prefixes = defaultdict(set)
+        self.employee_projects = defaultdict(set)
+        self.client_projects = defaultdict(set)
+        self.admins: set = set()
+
+    def upsert(self, key: tuple, label: str, detail: str, searchable: str, **attrs) -> None:
+        self.remove(key)
+        grams = set()
+        for token in tokenize(searchable):
+            for n in range(1, min(len(token), MAX_PREFIX) + 1):
+                grams.add(token[:n])
+        for gram in grams:
+            self.prefixes[gram].add(key)
+        self.entries[key] = {
+            "label": label,
+            "detail": detail,
+            "tokens": tokenize(searchable),
+            "grams": grams,
+            **attrs,
+        }
+
+        kind, entry_id = key
+        if kind == "users" and attrs.get("role") == "ADMIN":
+            self.admins.add(entry_id)
+        if kind == "projects":
+            for eid in attrs.get("employee_ids", ()):
+                self.employee_projects[eid].add(entry_id)
+            if attrs.get("client_id"):
+                self.client_projects[attrs["client_id"]].add(entry_id)
+
+    def remove(self, key: tuple) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry["grams"]:
+            keys = self.prefixes.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.prefixes[gram]
+
+        kind, entry_id = key
+        self.admins.discard(entry_id)
+        if kind == "projects":
+            for eid in entry.get("employee_ids", ()):
+                self.employee_projects[eid].discard(entry_id)
+            if entry.get("client_id"):
+                self.client_projects[entry["client_id"]].discard(entry_id)
+
+    def candidates(self, query_tokens: list) -> set:
+        sets = []
+        for token in query_tokens:
+            keys = self.prefixes.get(token[:MAX_PREFIX])
+            if not keys:
+                return set()
+            sets.append(keys)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for keys in sets[1:]:
+            result &= keys
+        long_tokens = [t for t in query_tokens if len(t) > MAX_PREFIX]
+        if long_tokens:
+            result = {
+                key
+                for key in result
+                if all(
+                    any(word.startswith(t) for word in self.entries[key]["tokens"])
+                    for t in long_tokens
+                )
+            }
+        return result
+
+    def visible(self, user: dict, key: tuple) -> bool:
+        """Mirror what each role can already list through the regular endpoints."""
+        role = user["role"]
+        if role == "ADMIN":
+            return True
+        kind, entry_id = key
+        uid = user["_id"]
+        entry = self.entries[key]
+        if kind == "services":
+            return role == "CLIENT"
+        if kind == "projects":
+            if role == "EMPLOYEE":
+                return uid in entry.get("employee_ids", ())
+            return entry.get("client_id") == uid
+        # Users: the messaging contacts rules
+        if entry_id in self.admins:
+            return True
+        if role == "EMPLOYEE" and entry.get("role") == "CLIENT":
+            return not self.employee_projects.get(uid, set()).isdisjoint(
+                self.client_projects.get(entry_id, ())
+            )
+        if role == "CLIENT" and entry.get("role") == "EMPLOYEE":
+            return not self.client_projects.get(uid, set()).isdisjoint(
+                self.employee_projects.get(entry_id, ())
+            )
+        return False
+
+
+class TypeaheadIndex:
+    """In-process autocomplete over every tenant's users, projects and services.
+
+    Built from the database at startup and kept current by the write paths
+    calling the `index_*` hooks. Writes made through another app instance
+    show up after the next periodic rebuild.
+    """
+
+    def __init__(self):
+        self._tenants = defaultdict(TenantIndex)
+        self._task: Optional[asyncio.Task] = None
+        self._journal: Optional[list] = None
+
+    def tenant(self, tenant_id: Optional[str] = None) -> TenantIndex:
+        return self._tenants[tenant_id or current_tenant.get()]
+
+    def apply(self, change: Callable[[TenantIndex], None], tenant_id: Optional[str] = None) -> None:
+        """Apply a write-path change, and replay it on an index being rebuilt."""
+        tenant_id = tenant_id or current_tenant.get()
+        change(self._tenants[tenant_id])
+        if self._journal is not None:
+            self._journal.append((tenant_id, change))
+
+    def search(
+        self, user: dict, q: str, kinds: Iterable[str] = KINDS, limit: int = 10
+    ) -> list:
+        query_tokens = tokenize(q)
+        if not query_tokens:
+            return []
+        index = self.tenant()
+        q_lower = q.strip().lower()
+        kinds = set(kinds)
+
+        def rank(key):
+            label = index.entries[key]["label"].lower()
+            return (not label.startswith(q_lower), len(label), label)
+
+        matches = (
+            key
+            for key in index.candidates(query_tokens)
+            if key[0] in kinds and index.visible(user, key)
+        )
+        results = []
+        for key in heapq.nsmallest(limit, matches, key=rank):
+            entry = index.entries[key]
+            results.append(
+                {
+                    "type": key[0],
+                    "id": key[1],
+                    "label": entry["label"],
+                    "detail": entry["detail"],
+                }
+            )
+        return results
+
+    async def rebuild(self) -> None:
+        db = get_global_database()
+        tenants = defaultdict(TenantIndex)
+        self._journal = []
+        try:
+            await self._load(db, tenants)
+            # Changes made while loading may be missing from what we read
+            for tenant_id, change in self._journal:
+                change(tenants[tenant_id])
+            self._tenants = tenants
+        finally:
+            self._journal = None
+
+    async def _load(self, db, tenants) -> None:
+        async for user in db.users.find({}, {"name": 1, "email": 1, "role": 1, "tenant_id": 1}):
+            _add_user(tenants[user.get("tenant_id", DEFAULT_TENANT)], user)
+        async for project in db.projects.find(
+            {}, {"name": 1, "status": 1, "client_id": 1, "employee_ids": 1, "tenant_id": 1}
+        ):
+            _add_project(tenants[project.get("tenant_id", DEFAULT_TENANT)], project)
+        async for service in db.services.find({}, {"name": 1, "description": 1, "tenant_id": 1}):
+            _add_service(tenants[service.get("tenant_id", DEFAULT_TENANT)], service)
+
+    async def start(self, interval: float) -> None:
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.warning("Typeahead index build failed: %s", e)
+        if interval > 0:
+            self._task = asyncio.create_task(self._run(interval), name="typeahead-rebuild")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.warning("Typeahead index rebuild failed: %s", e)
+
+    def metrics(self) -> dict:
+        return {
+            "tenants": len(self._tenants),
+            "entries": sum(len(t.entries) for t in self._tenants.values()),
+            "prefixes": sum(len(t.prefixes) for t in self._tenants.values()),
+        }
+
+
+def _add_user(index: TenantIndex, user: dict) -> None:
+    index.upsert(
+        ("users", str(user["_id"])),
+        user["name"],
+        user["email"],
+        f"{user['name']} {user['email']}",
+        role=user["role"],
+    )
+
+
+def _add_project(index: TenantIndex, project: dict) -> None:
+    index.upsert(
+        ("projects", str(project["_id"])),
+        project["name"],
+        project.get("status", ""),
+        project["name"],
+        client_id=str(project["client_id"]) if project.get("client_id") else None,
+        employee_ids={str(eid) for eid in project.get("employee_ids", [])},
+    )
+
+
+def _add_service(index: TenantIndex, service: dict) -> None:
+    index.upsert(
+        ("services", str(service["_id"])),
+        service["name"],
+        service.get("description", ""),
+        service["name"],
+    )
+
+
+typeahead = TypeaheadIndex()
+
+
+def index_user(user: dict) -> None:
+    typeahead.apply(lambda index: _add_user(index, user), user.get("tenant_id"))
+
+
+def index_project(project: dict) -> None:
+    typeahead.apply(lambda index: _add_project(index, project), project.get("tenant_id"))
+
+
+def index_service(service: dict) -> None:
+    typeahead.apply(lambda index: _add_service(index, service), service.get("tenant_id"))
+
+
+def unindex(kind: str, entry_id: str) -> None:
+    typeahead.apply(lambda index: index.remove((kind, str(entry_id))))
@@ -0,0 +1,182 @@
+import codecs
+import csv
+import json
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.core.config import get_settings
+from app.core.security import hash_passwords
+from app.db.mongodb import get_database
+from app.schemas.user_schema import UserCreate
+from app.services.sync_service import stamp_sync_fields
+from app.services.typeahead_service import index_user
+
+settings = get_settings()
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed body into lines without holding more than one chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class _LineFeed:
+    """Lines handed to a csv.reader as they stream in; it may be read again after running dry."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """Yield (fields or None, parse error) per CSV record.
+
+    One reader parses the whole stream, so a quoted field may span lines
+    (e.g. an address). A record is only parsed once its quotes balance, so
+    the reader never runs out of input halfway through it.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    quotes = 0
+    async for line in _iter_lines(chunks):
+        if not feed.lines and not line.strip():
+            continue
+        feed.lines.append(line + "\n")
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            quotes = 0
+            yield next(reader), None
+    if feed.lines:
+        feed.lines.clear()
+        yield None, "Unterminated quoted field"
+
+
+async def _iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple]:
+    """Yield (row number, parsed record or None, parse error) per non-empty record."""
+    row = 0
+    if fmt == "csv":
+        header: Optional[list] = None
+        async for fields, error in _iter_csv(chunks):
+            if header is None and fields is not None:
+                header = [f.strip().lower() for f in fields]
+                continue
+            row += 1
+            yield row, dict(zip(header or [], fields)) if fields else None, error
+        return
+
+    async for line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield row, None, f"Invalid JSON: {e.msg}"
+
+
+async def _write_batch(batch: list) -> list:
+    """Hash, insert unordered and report each row of a batch of valid users."""
+    db = get_database()
+    hashed = await hash_passwords([user.password for _, user in batch])
+    now = datetime.now(timezone.utc)
+
+    docs = [
+        {
+            "name": user.name,
+            "email": user.email,
+            "password": password_hash,
+            "role": user.role.value,
+            "created_at": now,
+        }
+        for (_, user), password_hash in zip(batch, hashed)
+    ]
+    await stamp_sync_fields(docs)
+
+    failed = {}
+    try:
+        await db.users.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            failed[error["index"]] = error
+
+    results = []
+    for i, (row, user) in enumerate(batch):
+        error = failed.get(i)
+        if error is None:
+            index_user(docs[i])
+            results.append(
+                {"row": row, "status": "created", "email": user.email, "id": str(docs[i]["_id"])}
+            )
+        elif error.get("code") == DUPLICATE_KEY_ERROR:
+            results.append(
+                {"row": row, "status": "duplicate", "email": user.email, "error": "Email already registered"}
+            )
+        else:
+            results.append(
+                {"row": row, "status": "error", "email": user.email, "error": error.get("errmsg")}
+            )
+    return results
+
+
+async def import_users(chunks: AsyncIterator[bytes], fmt: str) -> dict:
+    """Import users from a streamed CSV (with header) or NDJSON body.
+
+    Duplicate emails are left to the unique `email` index instead of being
+    checked row by row. Rows past `USER_IMPORT_MAX_ROWS` are not read: the
+    report covers the rows before them and is marked `truncated`, since
+    earlier batches are already written.
+    """
+    results = []
+    batch = []
+    truncated = False
+
+    async for row, record, parse_error in _iter_records(chunks, fmt):
+        if row > settings.USER_IMPORT_MAX_ROWS:
+            truncated = True
+            break
+        if parse_error:
+            results.append({"row": row, "status": "invalid", "error": parse_error})
+            continue
+        try:
+            user = UserCreate(**record)
+        except (ValidationError, TypeError) as e:
+            email = record.get("email") if isinstance(record, dict) else None
+            results.append({"row": row, "status": "invalid", "email": email, "error": str(e)})
+            continue
+
+        batch.append((row, user))
+        if len(batch) >= settings.USER_IMPORT_BATCH_SIZE:
+            results.extend(await _write_batch(batch))
+            batch = []
+
+    if batch:
+        results.extend(await _write_batch(batch))
+
+    results.sort(key=lambda r: r["row"])
+    return {
+        "created": sum(r["status"] == "created" for r in results),
+        "duplicates": sum(r["status"] == "duplicate" for r in results),
+        "invalid": sum(r["status"] == "invalid" for r in results),
+        "truncated": truncated,
+        "rows": results,
+    }
@@ -1,12 +1,33 @@
+from datetime import datetime
+from typing import Optional
 from bson import ObjectId
 
 from app.db.mongodb import get_database
+from app.db.query import date_range, text_search, sort_spec, find_page
 from app.models.user_model import user_entity, users_entity
 
+USER_SORT_FIELDS = {"name", "email", "role", "created_at"}
 
-async def get_all_users() -> list:
+
+async def get_all_users(
+    role: Optional[str] = None,
+    search: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    sort: str = "-created_at",
+    skip: int = 0,
+    limit: int = 1000,
+) -> list:
     db = get_database()
-    users = await db.users.find().to_list(1000)
+    query = {
+        **date_range("created_at", created_from, created_to),
+        **text_search(search),
+    }
+    if role:
+        query["role"] = role
+    users = await find_page(
+        db.users, query, sort_spec(sort, USER_SORT_FIELDS), skip, limit
+    )
     return users_entity(users)
 
 
@@ -22,3 +43,55 @@ async def get_user_by_id(user_id: str) -> dict:
     if user:
         return user_entity(user)
     return None
+
+
+async def adjust_employee_load(employee_ids: list, delta: int) -> None:
+    """Move the active-project counter of the given employees by `delta`."""
+    if not employee_ids:
+        return
+    db = get_database()
+    await db.users.update_many(
+        {"_id": {"$in": [ObjectId(eid) for eid in employee_ids]}},
+        {"$inc": {"active_projects": delta}},
+    )
+
+
+async def get_least_loaded_employees(exclude_ids: list, limit: int) -> list:
+    db = get_database()
+    employees = await db.users.find(
+        {"role": "EMPLOYEE", "_id": {"$nin": [ObjectId(eid) for eid in exclude_ids]}},
+        {"name": 1, "email": 1, "active_projects": 1},
+    ).sort([("active_projects", 1), ("_id", 1)]).limit(limit).to_list(limit)
+    return [
+        {
+            "id": str(e["_id"]),
+            "name": e["name"],
+            "email": e["email"],
+            "active_projects": e.get("active_projects", 0),
+        }
+        for e in employees
+    ]
+
+
+async def reconcile_employee_load() -> dict:
+    """Recount active (not COMPLETED) projects per employee from the projects collection."""
+    db = get_database()
+    counts = {
+        row["_id"]: row["count"]
+        async for row in db.projects.aggregate(
+            [
+                {"$match": {"status": {"$ne": "COMPLETED"}}},
+                {"$unwind": "$employee_ids"},
+                {"$group": {"_id": "$employee_ids", "count": {"$sum": 1}}},
+            ]
+        )
+    }
+    await db.users.update_many(
+        {"role": "EMPLOYEE", "_id": {"$nin": list(counts)}},
+        {"$set": {"active_projects": 0}},
+    )
+    for employee_id, count in counts.items():
+        await db.users.update_one(
+            {"_id": employee_id}, {"$set": {"active_projects": count}}
+        )
+    return {"employees_with_load": len(counts)}
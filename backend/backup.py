@@ -0,0 +1,243 @@
+"""
+Dump the portal database to a directory, or restore such a dump, e.g. to clone
+production into staging or to reproduce a benchmark.
+Collections are copied in parallel. Documents stream through cursors as raw
+BSON, without being decoded, into gzip-compressed chunk files. `manifest.json`
+records counts, chunk files and index definitions. Restores insert with
+concurrent unordered bulk writes and build the indexes once the data is in.
+The dump is not a point-in-time snapshot; stop writers for an exact copy.
+Run: python backup.py dump <dir> [--format bson|ndjson] [--collections a,b] [--parallel 4]
+     python backup.py restore <dir> [--db name] [--drop] [--parallel 4] [--insert-workers 4]
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import bson
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/saas_pm")
+RAW = CodecOptions(document_class=RawBSONDocument)
+DUPLICATE_KEY_ERROR = 11000
+# Index fields that describe the index rather than configure it
+INDEX_METADATA = {"v", "key", "ns", "name"}
+
+
+def database_name(uri: str) -> str:
+    return uri.split("/")[-1].split("?")[0] or "saas_pm"
+
+
+# ── Chunk files (run on the thread pool: zlib and file I/O release the GIL) ──
+def write_chunk(path: str, docs: list, fmt: str, level: int) -> int:
+    with gzip.open(path, "wb", compresslevel=level) as f:
+        if fmt == "bson":
+            f.write(b"".join(doc.raw for doc in docs))
+        else:
+            f.writelines(
+                json_util.dumps(bson.decode(doc.raw), json_options=json_util.CANONICAL_JSON_OPTIONS)
+                .encode() + b"\n"
+                for doc in docs
+            )
+    return os.path.getsize(path)
+
+
+def read_chunk(path: str, fmt: str) -> list:
+    with gzip.open(path, "rb") as f:
+        if fmt == "bson":
+            return list(bson.decode_file_iter(f, codec_options=RAW))
+        return [json_util.loads(line) for line in f if line.strip()]
+
+
+# ── Dump ─────────────────────────────────────────────
+async def dump_collection(db, name: str, out_dir: str, args, pool) -> dict:
+    loop = asyncio.get_running_loop()
+    collection = db.get_collection(name, codec_options=RAW)
+    safe_name = name.replace("/", "_")
+    chunks, writes = [], []
+    buffer, buffered_bytes, count, compressed = [], 0, 0, 0
+
+    async def flush():
+        nonlocal buffer, buffered_bytes
+        filename = f"{safe_name}.{len(chunks):05d}.{args.format}.gz"
+        chunks.append(filename)
+        writes.append(
+            loop.run_in_executor(
+                pool, write_chunk, os.path.join(out_dir, filename), buffer, args.format, args.level
+            )
+        )
+        buffer, buffered_bytes = [], 0
+        # Bound memory: at most two chunks of this collection wait for the disk
+        while len(writes) - len([w for w in writes if w.done()]) > 2:
+            await asyncio.wait([w for w in writes if not w.done()], return_when=asyncio.FIRST_COMPLETED)
+
+    async for doc in collection.find({}, batch_size=args.batch_size):
+        buffer.append(doc)
+        buffered_bytes += len(doc.raw)
+        count += 1
+        if buffered_bytes >= args.chunk_mb * 1024 * 1024:
+            await flush()
+    if buffer:
+        await flush()
+    for size in await asyncio.gather(*writes):
+        compressed += size
+
+    indexes = [index async for index in db[name].list_indexes()]
+    print(f"  {name}: {count} documents, {len(chunks)} chunks, {compressed / 1e6:.1f} MB")
+    return {"count": count, "chunks": chunks, "bytes": compressed, "indexes": indexes}
+
+
+async def dump(args) -> None:
+    client = AsyncIOMotorClient(args.uri)
+    db = client[args.db or database_name(args.uri)]
+    os.makedirs(args.dir, exist_ok=True)
+    names = args.collections or sorted(
+        [
+            c["name"]
+            async for c in await db.list_collections(filter={"type": "collection"})
+            if not c["name"].startswith("system.")
+        ]
+    )
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(args.parallel)
+
+    async def one(name):
+        async with semaphore:
+            return name, await dump_collection(db, name, args.dir, args, pool)
+
+    with ThreadPoolExecutor(max_workers=args.parallel * 2) as pool:
+        collections = dict(await asyncio.gather(*(one(n) for n in names)))
+
+    manifest = {
+        "database": db.name,
+        "format": args.format,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "collections": collections,
+    }
+    with open(os.path.join(args.dir, "manifest.json"), "w") as f:
+        f.write(json_util.dumps(manifest, indent=2, json_options=json_util.RELAXED_JSON_OPTIONS))
+    elapsed = time.perf_counter() - started
+    total = sum(c["bytes"] for c in collections.values())
+    print(f"Dumped {len(collections)} collections ({total / 1e6:.1f} MB compressed) in {elapsed:.1f}s")
+    client.close()
+
+
+# ── Restore ──────────────────────────────────────────
+def index_model(spec: dict) -> IndexModel:
+    keys = []
+    for field, direction in spec["key"].items():
+        if field == "_fts":
+            # A text index is stored as _fts/_ftsx; it is recreated from its weights
+            keys.extend((text_field, "text") for text_field in spec["weights"])
+        elif field != "_ftsx":
+            keys.append((field, direction))
+    options = {k: v for k, v in spec.items() if k not in INDEX_METADATA}
+    return IndexModel(keys, name=spec["name"], **options)
+
+
+async def restore_collection(db, name: str, meta: dict, args, fmt: str, pool) -> dict:
+    loop = asyncio.get_running_loop()
+    collection = db.get_collection(name, codec_options=RAW)
+    if args.drop:
+        await collection.drop()
+    stats = {"inserted": 0, "duplicates": 0, "errors": 0}
+    slots = asyncio.Semaphore(args.insert_workers)
+    inserts = set()
+
+    async def insert(batch):
+        try:
+            result = await collection.insert_many(
+                batch, ordered=False, bypass_document_validation=True
+            )
+            stats["inserted"] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Re-running a partial restore only re-inserts documents already there
+            stats["inserted"] += e.details.get("nInserted", 0)
+            for error in e.details.get("writeErrors", []):
+                stats["duplicates" if error.get("code") == DUPLICATE_KEY_ERROR else "errors"] += 1
+        finally:
+            slots.release()
+
+    for filename in meta["chunks"]:
+        docs = await loop.run_in_executor(pool, read_chunk, os.path.join(args.dir, filename), fmt)
+        for start in range(0, len(docs), args.batch_size):
+            await slots.acquire()
+            task = asyncio.create_task(insert(docs[start:start + args.batch_size]))
+            inserts.add(task)
+            task.add_done_callback(inserts.discard)
+    await asyncio.gather(*inserts)
+    print(f"  {name}: {stats['inserted']} inserted, {stats['duplicates']} already present, "
+          f"{stats['errors']} failed")
+    return stats
+
+
+async def build_indexes(db, name: str, specs: list) -> None:
+    models = [index_model(spec) for spec in specs if spec["name"] != "_id_"]
+    if models:
+        await db[name].create_indexes(models)
+        print(f"  {name}: {len(models)} indexes")
+
+
+async def restore(args) -> None:
+    with open(os.path.join(args.dir, "manifest.json")) as f:
+        manifest = json_util.loads(f.read())
+    client = AsyncIOMotorClient(args.uri)
+    db = client[args.db or manifest["database"]]
+    collections = {
+        name: meta
+        for name, meta in manifest["collections"].items()
+        if not args.collections or name in args.collections
+    }
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(args.parallel)
+
+    async def one(name):
+        async with semaphore:
+            return await restore_collection(
+                db, name, collections[name], args, manifest["format"], pool
+            )
+
+    print(f"Restoring into {db.name}...")
+    with ThreadPoolExecutor(max_workers=args.parallel * 2) as pool:
+        results = await asyncio.gather(*(one(n) for n in collections))
+    loaded = time.perf_counter() - started
+
+    # Building each index once over the loaded data beats maintaining it per insert
+    print("Building indexes...")
+    await asyncio.gather(
+        *(build_indexes(db, name, meta["indexes"]) for name, meta in collections.items())
+    )
+    inserted = sum(r["inserted"] for r in results)
+    print(f"Restored {inserted} documents in {loaded:.1f}s, "
+          f"indexes built in {time.perf_counter() - started - loaded:.1f}s")
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel dump and restore of the portal database.")
+    parser.add_argument("command", choices=["dump", "restore"])
+    parser.add_argument("dir", help="backup directory")
+    parser.add_argument("--uri", default=MONGO_URI, help="defaults to MONGO_URI")
+    parser.add_argument("--db", help="database name; defaults to the URI's (dump) or the dumped one (restore)")
+    parser.add_argument("--collections", type=lambda s: s.split(","), help="only these collections")
+    parser.add_argument("--parallel", type=int, default=4, help="collections copied at once")
+    parser.add_argument("--format", choices=["bson", "ndjson"], default="bson",
+                        help="ndjson (canonical extended JSON) is readable but slower")
+    parser.add_argument("--chunk-mb", type=int, default=64, help="uncompressed size of each chunk file")
+    parser.add_argument("--level", type=int, default=3, help="gzip level")
+    parser.add_argument("--batch-size", type=int, default=1000, help="cursor batch / insert batch size")
+    parser.add_argument("--insert-workers", type=int, default=4, help="concurrent inserts per collection")
+    parser.add_argument("--drop", action="store_true", help="drop each collection before restoring it")
+    args = parser.parse_args()
+    asyncio.run(dump(args) if args.command == "dump" else restore(args))
@@ -0,0 +1,297 @@
+"""
+Measure how the API degrades when MongoDB is slow or flaky.
+Starts fault_proxy.py in front of a local mongod, seeds a throwaway database,
+starts the API against the proxy and, for every fault profile and concurrency
+level, drives a mix of load scenarios. Reports throughput, goodput (non-error
+responses per second) and tail latency, relative to the baseline profile.
+Needs a local mongod and httpx (pip install httpx).
+Run: python bench_faults.py [--mongo localhost:27017] [--profiles baseline,latency,drops]
+                            [--concurrency 8,32] [--duration 20] [--json results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+from bson import ObjectId
+from pymongo import MongoClient
+
+from app.core.security import hash_password
+from fault_proxy import PROFILES, FaultProfile, FaultProxy
+
+BENCH_DB = "saas_pm_faultbench"
+PASSWORD = "bench-password"
+EMPLOYEES, CLIENTS, PROJECTS, MESSAGES = 20, 50, 300, 3000
+
+# name -> (acting role, weight)
+SCENARIOS = {
+    "list_projects": ("admin", 3),
+    "contacts": ("employee", 2),
+    "sync": ("client", 2),
+    "send_message": ("client", 2),
+    "typeahead": ("admin", 1),
+}
+
+
+def seed(mongo: str) -> None:
+    db = MongoClient(f"mongodb://{mongo}/?directConnection=true")[BENCH_DB]
+    db.client.drop_database(BENCH_DB)
+    now = datetime.now(timezone.utc)
+    password = hash_password(PASSWORD)
+
+    def user(name, email, role):
+        return {"_id": ObjectId(), "name": name, "email": email, "password": password,
+                "role": role, "tenant_id": "default", "created_at": now, "seq": 0}
+
+    employees = [user(f"Employee {i}", f"employee{i}@bench.local", "EMPLOYEE") for i in range(EMPLOYEES)]
+    clients = [user(f"Client {i}", f"client{i}@bench.local", "CLIENT") for i in range(CLIENTS)]
+    admin = user("Admin", "admin@bench.local", "ADMIN")
+    db.users.insert_many([admin] + employees + clients)
+    db.projects.insert_many(
+        {
+            "name": f"Project {i}",
+            "description": "Fault benchmark project",
+            "client_id": clients[i % CLIENTS]["_id"],
+            "service_request_id": ObjectId(),
+            "employee_ids": [e["_id"] for e in random.sample(employees, 3)],
+            "status": random.choice(["NOT_STARTED", "IN_PROGRESS", "COMPLETED"]),
+            "tenant_id": "default",
+            "created_at": now,
+            "seq": i + 1,
+        }
+        for i in range(PROJECTS)
+    )
+    db.messages.insert_many(
+        {
+            "sender_id": clients[i % CLIENTS]["_id"],
+            "receiver_id": admin["_id"],
+            "content": f"Message {i}",
+            "tenant_id": "default",
+            "created_at": now,
+            "seq": PROJECTS + i + 1,
+        }
+        for i in range(MESSAGES)
+    )
+    db.counters.insert_one({"_id": "sync_seq:default", "seq": PROJECTS + MESSAGES})
+    db.client.close()
+
+
+class ProxyThread:
+    """The proxy on its own event loop, so the load generator doesn't slow it down."""
+
+    def __init__(self, listen_port: int, mongo: str):
+        host, _, port = mongo.partition(":")
+        self.proxy = FaultProxy(listen_port, host, int(port or 27017))
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.proxy.start(), self.loop).result()
+
+    def set_profile(self, name: str) -> None:
+        self.proxy.profile = FaultProfile.named(name)
+        self.proxy.stats = dict.fromkeys(self.proxy.stats, 0)
+        self.loop.call_soon_threadsafe(self.proxy.reset_connections)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.proxy.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def start_api(port: int, proxy_port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "MONGO_URI": f"mongodb://127.0.0.1:{proxy_port}/{BENCH_DB}?directConnection=true",
+        "RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "ACCESS_LOG_SAMPLE_RATE": "0",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return True
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    return False
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict:
+    r = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    body = r.json()
+    return {"id": body["user_id"], "headers": {"Authorization": f"Bearer {body['access_token']}"}}
+
+
+def request_for(scenario: str, users: dict) -> tuple:
+    if scenario == "list_projects":
+        return "GET", "/api/admin/projects?limit=50", None
+    if scenario == "contacts":
+        return "GET", "/api/messages/contacts", None
+    if scenario == "sync":
+        return "GET", "/api/sync?since=0", None
+    if scenario == "send_message":
+        return "POST", "/api/messages/", {"receiver_id": users["admin"]["id"], "content": "Load test"}
+    return "GET", f"/api/search/typeahead?q={random.choice(['emp', 'client', 'proj'])}", None
+
+
+async def run_load(client, users: dict, concurrency: int, duration: float) -> list:
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[n][1] for n in names]
+    samples = []
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            scenario = random.choices(names, weights)[0]
+            method, path, body = request_for(scenario, users)
+            started = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body, headers=users[SCENARIOS[scenario][0]]["headers"])
+                outcome = r.status_code
+            except httpx.TimeoutException:
+                outcome = "timeout"
+            except httpx.HTTPError:
+                outcome = "error"
+            samples.append((scenario, (time.perf_counter() - started) * 1000, outcome))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def summarize(samples: list, duration: float) -> dict:
+    by_scenario = defaultdict(list)
+    for scenario, latency, outcome in samples:
+        by_scenario[scenario].append((latency, outcome))
+        by_scenario["all"].append((latency, outcome))
+    summary = {}
+    for scenario, rows in by_scenario.items():
+        latencies = sorted(latency for latency, _ in rows)
+        ok = sum(1 for _, outcome in rows if isinstance(outcome, int) and outcome < 500)
+        summary[scenario] = {
+            "requests": len(rows),
+            "rps": round(len(rows) / duration, 1),
+            "goodput": round(ok / duration, 1),
+            "errors_pct": round(100 * (len(rows) - ok) / len(rows), 1),
+            "unavailable_503": sum(1 for _, outcome in rows if outcome == 503),
+            "p50_ms": round(statistics.median(latencies), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(latencies[-1], 1),
+        }
+    return summary
+
+
+def print_report(results: list) -> None:
+    baseline = {r["concurrency"]: r["summary"]["all"] for r in results if r["profile"] == "baseline"}
+    print(f"\n{'profile':<16}{'conc':>5}{'rps':>8}{'goodput':>9}{'err%':>7}{'p50':>8}{'p95':>8}"
+          f"{'p99':>9}{'max':>9}{'p99 x':>8}{'good %':>8}  breaker")
+    for r in results:
+        s = r["summary"]["all"]
+        base = baseline.get(r["concurrency"])
+        p99_ratio = f"{s['p99_ms'] / base['p99_ms']:.1f}" if base and base["p99_ms"] else "-"
+        good_pct = f"{100 * s['goodput'] / base['goodput']:.0f}" if base and base["goodput"] else "-"
+        print(f"{r['profile']:<16}{r['concurrency']:>5}{s['rps']:>8}{s['goodput']:>9}{s['errors_pct']:>7}"
+              f"{s['p50_ms']:>8}{s['p95_ms']:>8}{s['p99_ms']:>9}{s['max_ms']:>9}{p99_ratio:>8}{good_pct:>8}"
+              f"  {r['breaker']}")
+    print("\nPer scenario p99 (ms):")
+    scenarios = list(SCENARIOS)
+    print(f"{'profile':<16}{'conc':>5}" + "".join(f"{s:>15}" for s in scenarios))
+    for r in results:
+        row = "".join(f"{r['summary'].get(s, {}).get('p99_ms', '-'):>15}" for s in scenarios)
+        print(f"{r['profile']:<16}{r['concurrency']:>5}{row}")
+
+
+async def bench(args) -> list:
+    proxy = ProxyThread(args.proxy_port, args.mongo)
+    print(f"Seeding {BENCH_DB}...")
+    seed(args.mongo)
+    api = start_api(args.api_port, args.proxy_port)
+    results = []
+    try:
+        timeout = httpx.Timeout(args.request_timeout)
+        limits = httpx.Limits(max_connections=max(args.concurrency))
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{args.api_port}", timeout=timeout, limits=limits
+        ) as client:
+            if not await wait_ready(client, 60):
+                raise SystemExit("API did not become ready")
+            users = {
+                "admin": await login(client, "admin@bench.local"),
+                "employee": await login(client, "employee0@bench.local"),
+                "client": await login(client, "client0@bench.local"),
+            }
+            for profile in args.profiles:
+                for concurrency in args.concurrency:
+                    # Let a circuit opened by the previous profile close again first
+                    proxy.set_profile("baseline")
+                    await wait_ready(client, 60)
+                    proxy.set_profile(profile)
+                    await run_load(client, users, concurrency, args.warmup)
+                    samples = await run_load(client, users, concurrency, args.duration)
+                    ready = await client.get("/health/ready")
+                    breaker = ready.json().get("database", {})
+                    summary = summarize(samples, args.duration)
+                    results.append(
+                        {
+                            "profile": profile,
+                            "concurrency": concurrency,
+                            "summary": summary,
+                            "breaker": f"{breaker.get('state')} (opened {breaker.get('opened', 0)}x)",
+                            "proxy": dict(proxy.proxy.stats),
+                        }
+                    )
+                    s = summary["all"]
+                    print(f"  {profile} @ {concurrency}: {s['rps']} rps, p99 {s['p99_ms']} ms, "
+                          f"{s['errors_pct']}% errors")
+    finally:
+        api.terminate()
+        api.wait()
+        proxy.stop()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API under injected MongoDB faults.")
+    parser.add_argument("--mongo", default="localhost:27017", help="the real mongod")
+    parser.add_argument("--profiles", default=",".join(PROFILES),
+                        type=lambda s: s.split(","), help=f"from: {', '.join(PROFILES)}")
+    parser.add_argument("--concurrency", default="8,32", type=lambda s: [int(c) for c in s.split(",")])
+    parser.add_argument("--duration", type=float, default=20, help="seconds measured per run")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--request-timeout", type=float, default=30)
+    parser.add_argument("--proxy-port", type=int, default=27018)
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--json", help="also write the raw results here")
+    args = parser.parse_args()
+    unknown = set(args.profiles) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(sorted(unknown))}")
+    if "baseline" in args.profiles:
+        args.profiles.remove("baseline")
+    args.profiles.insert(0, "baseline")
+
+    results = asyncio.run(bench(args))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,91 @@
+"""
+Pick the bcrypt cost (BCRYPT_ROUNDS) for this hardware.
+Each cost is benchmarked on one thread (login latency) and on PASSWORD_HASH_WORKERS
+threads (login throughput). The highest cost that keeps a login under the target
+latency, and the peak login rate within the CPU budget of the hash pool, is chosen.
+Accounts hashed at another cost are rehashed the next time they log in.
+Run: python calibrate_hash.py [--target-ms 250] [--peak-logins 20] [--cpu-budget 0.5] [--write]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.hash import bcrypt
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Below this the hash stops being a meaningful brute-force cost
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+PASSWORD = "calibration-password"
+
+
+def hash_latency_ms(rounds: int, samples: int = 3) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def hashes_per_second(rounds: int, workers: int) -> float:
+    hasher = bcrypt.using(rounds=rounds)
+    count = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        list(pool.map(lambda _: hasher.hash(PASSWORD), range(count)))
+        return count / (time.perf_counter() - started)
+
+
+def calibrate(target_ms: float, peak_logins: float, cpu_budget: float) -> int:
+    workers = settings.PASSWORD_HASH_WORKERS
+    print(f"Target: {target_ms:.0f} ms per login, {peak_logins:g} logins/s using "
+          f"{cpu_budget:.0%} of {workers} hash workers\n")
+    print(f"{'rounds':>6} {'latency':>10} {'logins/s':>10}")
+    chosen = None
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        latency = hash_latency_ms(rounds)
+        throughput = hashes_per_second(rounds, workers)
+        fits = latency <= target_ms and peak_logins <= throughput * cpu_budget
+        print(f"{rounds:>6} {latency:>8.0f} ms {throughput:>10.1f}{'  ok' if fits else ''}")
+        if not fits:
+            # Each extra round doubles the cost, so no higher cost can fit either
+            break
+        chosen = rounds
+    if chosen is None:
+        print(f"\nEven {MIN_ROUNDS} rounds misses the target; using {MIN_ROUNDS}. "
+              "Add hash workers or CPU rather than lowering the cost further.")
+        chosen = MIN_ROUNDS
+    return chosen
+
+
+def write_env(rounds: int, path: str = ".env") -> None:
+    try:
+        with open(path) as f:
+            lines = [line for line in f.read().splitlines() if not line.startswith("BCRYPT_ROUNDS=")]
+    except FileNotFoundError:
+        lines = []
+    lines.append(f"BCRYPT_ROUNDS={rounds}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick BCRYPT_ROUNDS for this hardware.")
+    parser.add_argument("--target-ms", type=float, default=250, help="login hash latency to stay under")
+    parser.add_argument("--peak-logins", type=float, default=20, help="logins per second at peak")
+    parser.add_argument("--cpu-budget", type=float, default=0.5,
+                        help="share of the hash pool peak logins may use")
+    parser.add_argument("--write", action="store_true", help="store the result in .env")
+    args = parser.parse_args()
+
+    rounds = calibrate(args.target_ms, args.peak_logins, args.cpu_budget)
+    print(f"\nBCRYPT_ROUNDS={rounds} (currently {settings.BCRYPT_ROUNDS})")
+    if args.write:
+        write_env(rounds)
+        print("Saved to .env; restart the API to apply it.")
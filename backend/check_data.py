@@ -12,7 +12,7 @@ for k, v in stats.items():
 projs = requests.get(f"{BASE}/admin/projects", headers=h).json()
 print(f"\n=== PROJECTS ({len(projs)}) ===")
 for p in projs:
-    print(f"  {p['name']} | Status: {p['status']} | Employees: {len(p['assigned_employees'])}")
+    print(f"  {p['name']} | Status: {p['status']} | Employees: {len(p['employees'])}")
 
 svcs = requests.get(f"{BASE}/admin/services", headers=h).json()
 print(f"\n=== SERVICES ({len(svcs)}) ===")
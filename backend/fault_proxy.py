@@ -0,0 +1,219 @@
+"""
+TCP proxy that sits between the API and mongod and injects faults.
+Point MONGO_URI at the proxy (add `directConnection=true` so the driver doesn't
+bypass it for a replica set member's advertised address).
+
+Faults are applied per MongoDB wire-protocol message sent to the server:
+  latency / jitter   every command is held for latency ± jitter ms
+  slow commands      named commands (find, aggregate, ...) are held longer
+  drops              a share of commands get their connection reset instead
+  stall              named commands never get a reply (hits socketTimeoutMS)
+Heartbeats (hello / isMaster) only get the base latency, so monitoring sees
+the network, not the command rules.
+
+Run: python fault_proxy.py [--profile NAME] [--listen 27018] [--upstream localhost:27017]
+     python fault_proxy.py --latency-ms 20 --jitter-ms 10 --slow aggregate=2000 --drop-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import struct
+from typing import Optional
+
+OP_MSG = 2013
+OP_QUERY = 2004
+HEARTBEATS = {"hello", "ismaster", "isMaster"}
+
+# Named fault profiles used by bench_faults.py; each is a set of FaultProfile arguments
+PROFILES = {
+    "baseline": {},
+    "latency": {"latency_ms": 50, "jitter_ms": 10},
+    "jitter": {"latency_ms": 5, "jitter_ms": 150},
+    "slow_aggregate": {"slow": {"aggregate": 2000}},
+    "slow_reads": {"slow": {"find": 500, "aggregate": 500, "count": 500, "distinct": 500}},
+    "socket_timeout": {"stall": {"find"}, "stall_rate": 0.05},
+    "drops": {"drop_rate": 0.02},
+    "pool_pressure": {"latency_ms": 250},
+}
+
+
+class FaultProfile:
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        slow: Optional[dict] = None,
+        drop_rate: float = 0,
+        stall: Optional[set] = None,
+        stall_rate: float = 1.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow = slow or {}
+        self.drop_rate = drop_rate
+        self.stall = stall or set()
+        self.stall_rate = stall_rate
+
+    @classmethod
+    def named(cls, name: str) -> "FaultProfile":
+        return cls(**PROFILES[name])
+
+    def delay_ms(self, command: Optional[str]) -> float:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, delay + self.slow.get(command, 0))
+
+
+def command_name(message: bytes) -> Optional[str]:
+    """First key of the command document, read without decoding the BSON."""
+    op_code = struct.unpack_from("<i", message, 12)[0]
+    if op_code == OP_MSG:
+        offset = 20  # header + flagBits
+        if message[offset] != 0:  # the body section comes first; anything else is unexpected
+            return None
+        offset += 1
+    elif op_code == OP_QUERY:
+        offset = 20
+        offset = message.index(b"\x00", offset) + 1 + 8  # collection name, skip, limit
+    else:
+        return None
+    name_start = offset + 4 + 1  # document length, element type
+    return message[name_start:message.index(b"\x00", name_start)].decode("utf-8", "replace")
+
+
+class FaultProxy:
+    """Forward connections to `upstream`, applying the current `profile`.
+
+    The profile can be swapped while the proxy runs; new commands pick it up.
+    """
+
+    def __init__(self, listen_port: int, upstream_host: str, upstream_port: int):
+        self.listen_port = listen_port
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.profile = FaultProfile()
+        self.stats = {"connections": 0, "commands": 0, "delayed": 0, "dropped": 0, "stalled": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.listen_port)
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+
+    def reset_connections(self) -> None:
+        """Drop every open connection, e.g. between benchmark runs."""
+        for writer in list(self._connections):
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        self.stats["connections"] += 1
+        try:
+            server_reader, server_writer = await asyncio.open_connection(
+                self.upstream_host, self.upstream_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        self._connections.update((client_writer, server_writer))
+        try:
+            await asyncio.gather(
+                self._forward_commands(client_reader, server_writer, client_writer),
+                self._pipe(server_reader, client_writer),
+            )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for writer in (client_writer, server_writer):
+                self._connections.discard(writer)
+                writer.close()
+
+    async def _forward_commands(self, reader, server_writer, client_writer) -> None:
+        while True:
+            header = await reader.readexactly(16)
+            length = struct.unpack_from("<i", header)[0]
+            message = header + await reader.readexactly(length - 16)
+            command = command_name(message)
+            profile = self.profile
+            self.stats["commands"] += 1
+
+            if command in HEARTBEATS:
+                delay = max(0.0, profile.latency_ms + random.uniform(-profile.jitter_ms, profile.jitter_ms))
+            else:
+                if profile.drop_rate and random.random() < profile.drop_rate:
+                    self.stats["dropped"] += 1
+                    client_writer.transport.abort()
+                    server_writer.transport.abort()
+                    return
+                if command in profile.stall and random.random() < profile.stall_rate:
+                    # Never answer; the driver gives up after socketTimeoutMS and closes the socket
+                    self.stats["stalled"] += 1
+                    while await reader.read(65536):
+                        pass
+                    server_writer.close()
+                    return
+                delay = profile.delay_ms(command)
+            if delay:
+                self.stats["delayed"] += 1
+                await asyncio.sleep(delay / 1000)
+            server_writer.write(message)
+            await server_writer.drain()
+
+    async def _pipe(self, reader, writer) -> None:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                writer.close()
+                return
+            writer.write(data)
+            await writer.drain()
+
+
+def profile_from_args(args) -> FaultProfile:
+    if args.profile:
+        return FaultProfile.named(args.profile)
+    slow = {}
+    for rule in args.slow:
+        name, ms = rule.split("=")
+        slow[name] = float(ms)
+    return FaultProfile(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        slow=slow,
+        drop_rate=args.drop_rate,
+        stall=set(args.stall),
+    )
+
+
+async def main(args) -> None:
+    host, _, port = args.upstream.partition(":")
+    proxy = FaultProxy(args.listen, host, int(port or 27017))
+    proxy.profile = profile_from_args(args)
+    await proxy.start()
+    print(f"Proxying 127.0.0.1:{args.listen} -> {args.upstream} ({args.profile or 'custom'} profile)")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"  {proxy.stats}")
+    finally:
+        await proxy.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injecting proxy for MongoDB.")
+    parser.add_argument("--listen", type=int, default=27018)
+    parser.add_argument("--upstream", default="localhost:27017")
+    parser.add_argument("--profile", choices=sorted(PROFILES))
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--slow", action="append", default=[], metavar="COMMAND=MS")
+    parser.add_argument("--drop-rate", type=float, default=0)
+    parser.add_argument("--stall", action="append", default=[], metavar="COMMAND")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,37 @@
+"""
+Apply pending data migrations, or show their progress.
+Migrations also run in the background when the API starts (MIGRATIONS_AUTO_RUN),
+and an interrupted run resumes from its last checkpoint.
+Run: python migrate.py [status|run]
+"""
+import asyncio
+import sys
+
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.services import migrations  # noqa: F401  (registers data migrations)
+from app.services.migration_service import get_migrations, run_migrations
+
+COMMAND = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        if COMMAND == "run":
+            for version, outcome in (await run_migrations()).items():
+                print(f"  {version}: {outcome}")
+        for m in await get_migrations():
+            progress = f"step {min(m['step'] + 1, m['steps'])}/{m['steps']}"
+            if m["step_total"]:
+                progress += f", {m['step_scanned']}/{m['step_total']} documents"
+            print(f"{m['version']:<32} {m['status']:<10} {progress}, {m['modified']} modified")
+            if m["error"]:
+                print(f"  error: {m['error']}")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    if COMMAND not in ("status", "run"):
+        sys.exit(__doc__)
+    asyncio.run(main())
@@ -1,12 +1,11 @@
 import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
-from passlib.context import CryptContext
 from dotenv import load_dotenv
+from app.core.security import hash_password
 import os
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/saas_pm")
 
 async def reset():
@@ -15,7 +14,7 @@ async def reset():
     db = client[db_name]
     result = await db.users.update_one(
         {"email": "abhi@gmail.com"},
-        {"$set": {"password": pwd_context.hash("abhi123")}}
+        {"$set": {"password": hash_password("abhi123")}}
     )
     print(f"Matched: {result.matched_count}, Modified: {result.modified_count}")
     if result.matched_count:
@@ -1,19 +1,20 @@
 """
-Seed script to create the initial admin user.
-Run: python seed_admin.py
+Seed script to create the initial admin user of an organization (tenant).
+Run: python seed_admin.py [tenant_id] [admin_email]
 """
 import asyncio
+import sys
 from motor.motor_asyncio import AsyncIOMotorClient
-from passlib.context import CryptContext
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+from app.core.security import hash_password
 import os
 
 load_dotenv()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/saas_pm")
+TENANT_ID = sys.argv[1] if len(sys.argv) > 1 else os.getenv("DEFAULT_TENANT_ID", "default")
+ADMIN_EMAIL = sys.argv[2] if len(sys.argv) > 2 else "admin@example.com"
 
 
 async def seed():
@@ -21,7 +22,7 @@ async def seed():
     db_name = MONGO_URI.split("/")[-1].split("?")[0] or "saas_pm"
     db = client[db_name]
 
-    existing = await db.users.find_one({"email": "admin@example.com"})
+    existing = await db.users.find_one({"email": ADMIN_EMAIL})
     if existing:
         print("Admin user already exists.")
         client.close()
@@ -29,15 +30,17 @@ async def seed():
 
     admin_doc = {
         "name": "Admin",
-        "email": "admin@example.com",
-        "password": pwd_context.hash("admin123"),
+        "email": ADMIN_EMAIL,
+        "password": hash_password("admin123"),
         "role": "ADMIN",
+        "tenant_id": TENANT_ID,
         "created_at": datetime.now(timezone.utc),
     }
 
     await db.users.insert_one(admin_doc)
     print("Admin user created successfully!")
-    print("  Email: admin@example.com")
+    print(f"  Tenant: {TENANT_ID}")
+    print(f"  Email: {ADMIN_EMAIL}")
     print("  Password: admin123")
     client.close()
 
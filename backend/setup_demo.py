@@ -128,9 +128,9 @@ projects = r.json()
 
 if employee_id:
     for proj in projects:
-        if employee_id not in proj.get("assigned_employees", []):
+        if employee_id not in proj.get("employee_ids", []):
             try:
-                current = proj.get("assigned_employees", [])
+                current = proj.get("employee_ids", [])
                 r = requests.put(f"{BASE}/admin/projects/{proj['id']}/assign",
                     json={"employee_ids": current + [employee_id]},
                     headers=auth_header(admin_token))
@@ -0,0 +1,75 @@
+import os
+
+# Settings are read once at import, so the test configuration goes first:
+# no background job workers or migrations, no rate limits between calls and
+# the cheapest bcrypt cost.
+os.environ["MONGO_URI"] = "mongodb://localhost:27017/saas_pm_test"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["JOB_WORKERS"] = "0"
+os.environ["MIGRATIONS_AUTO_RUN"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+import app.db.mongodb as mongodb
+from app.core.security import hash_password
+from app.db.tenancy import DEFAULT_TENANT
+from app.main import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """The app against a fresh in-memory database."""
+    monkeypatch.setattr(
+        mongodb, "AsyncIOMotorClient", lambda uri, **kwargs: AsyncMongoMockClient()
+    )
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine function on the app's event loop, e.g. to call a service directly."""
+    return client.portal.call
+
+
+@pytest.fixture
+def db(client):
+    return mongodb.get_global_database()
+
+
+def create_user(run, email: str, password: str = "secret123", role: str = "ADMIN") -> str:
+    async def insert():
+        result = await mongodb.get_global_database().users.insert_one(
+            {
+                "name": email.split("@")[0],
+                "email": email,
+                "password": hash_password(password),
+                "role": role,
+                "tenant_id": DEFAULT_TENANT,
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        return str(result.inserted_id)
+
+    return run(insert)
+
+
+def login(client, email: str, password: str = "secret123") -> dict:
+    response = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(session: dict) -> dict:
+    return {"Authorization": f"Bearer {session['access_token']}"}
+
+
+@pytest.fixture
+def admin(client, run) -> dict:
+    create_user(run, "admin@example.com")
+    return login(client, "admin@example.com")
@@ -0,0 +1,67 @@
+import time
+
+from conftest import bearer, create_user, login
+
+
+def test_refresh_rotates_the_refresh_token(client, admin):
+    response = client.post("/api/auth/refresh", json={"refresh_token": admin["refresh_token"]})
+    assert response.status_code == 200
+    renewed = response.json()
+    assert renewed["refresh_token"] != admin["refresh_token"]
+    assert client.get("/api/auth/profile", headers=bearer(renewed)).status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_whole_family(client, admin):
+    renewed = client.post(
+        "/api/auth/refresh", json={"refresh_token": admin["refresh_token"]}
+    ).json()
+
+    replay = client.post("/api/auth/refresh", json={"refresh_token": admin["refresh_token"]})
+    assert replay.status_code == 401
+    # The legitimate successor went down with it
+    successor = client.post("/api/auth/refresh", json={"refresh_token": renewed["refresh_token"]})
+    assert successor.status_code == 401
+
+
+def test_logout_ends_the_session(client, admin):
+    assert client.post(
+        "/api/auth/logout", json={"refresh_token": admin["refresh_token"]}, headers=bearer(admin)
+    ).status_code == 200
+    response = client.post("/api/auth/refresh", json={"refresh_token": admin["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_password_change_signs_out_only_the_other_sessions(client, run):
+    create_user(run, "ann@example.com", role="CLIENT")
+    here = login(client, "ann@example.com")
+    elsewhere = login(client, "ann@example.com")
+    time.sleep(0.01)  # revocation cutoffs compare against the tokens' issue times
+
+    response = client.put(
+        "/api/auth/profile",
+        json={"current_password": "secret123", "new_password": "changed456"},
+        headers=bearer(here),
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/auth/profile", headers=bearer(here)).status_code == 200
+    assert client.post(
+        "/api/auth/refresh", json={"refresh_token": here["refresh_token"]}
+    ).status_code == 200
+    assert client.get("/api/auth/profile", headers=bearer(elsewhere)).status_code == 401
+    assert client.post(
+        "/api/auth/refresh", json={"refresh_token": elsewhere["refresh_token"]}
+    ).status_code == 401
+    login(client, "ann@example.com", "changed456")
+
+
+def test_deleting_a_user_rejects_their_access_tokens(client, run, admin):
+    user_id = create_user(run, "bob@example.com", role="EMPLOYEE")
+    bob = login(client, "bob@example.com")
+    time.sleep(0.01)
+
+    assert client.delete(f"/api/admin/users/{user_id}", headers=bearer(admin)).status_code == 200
+    assert client.get("/api/auth/profile", headers=bearer(bob)).status_code == 401
+    assert client.post(
+        "/api/auth/refresh", json={"refresh_token": bob["refresh_token"]}
+    ).status_code == 401
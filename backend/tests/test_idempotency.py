@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from app.core.idempotency import IdempotencyMiddleware
+from conftest import bearer
+
+NEW_USER = {"name": "Eve", "email": "eve@example.com", "password": "secret123", "role": "EMPLOYEE"}
+
+
+def test_retry_replays_the_stored_response(client, db, run, admin):
+    headers = {**bearer(admin), "Idempotency-Key": "create-eve"}
+    first = client.post("/api/admin/users", json=NEW_USER, headers=headers)
+    retry = client.post("/api/admin/users", json=NEW_USER, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert run(db.users.count_documents, {"email": NEW_USER["email"]}) == 1
+
+
+def test_key_reused_with_another_body_is_rejected(client, admin):
+    headers = {**bearer(admin), "Idempotency-Key": "create-eve"}
+    client.post("/api/admin/users", json=NEW_USER, headers=headers)
+    response = client.post(
+        "/api/admin/users", json={**NEW_USER, "name": "Mallory"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_requests_without_a_key_are_not_deduplicated(client, admin):
+    client.post("/api/admin/users", json=NEW_USER, headers=bearer(admin))
+    response = client.post("/api/admin/users", json=NEW_USER, headers=bearer(admin))
+    assert response.status_code == 400  # the second create hits the unique email
+
+
+def call(middleware, body: bytes = b"{}", key: bytes = b"k1"):
+    """Send one POST through the middleware; return the response status."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def request():
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/messages/",
+            "headers": [(b"idempotency-key", key)],
+        }
+        await middleware(scope, receive, send)
+        return sent[0]["status"]
+
+    return request()
+
+
+def test_only_one_retry_takes_over_a_stale_claim(run, db):
+    handled = []
+
+    async def handler(scope, receive, send):
+        handled.append(await receive())
+        await asyncio.sleep(0.01)
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = IdempotencyMiddleware(handler)
+    key = hashlib.sha256(b"None|POST|/api/messages/|k1").hexdigest()
+    # Left behind by a request that died long ago
+    run(
+        db.idempotency_keys.insert_one,
+        {
+            "_id": key,
+            "status": "in_progress",
+            "fingerprint": hashlib.sha256(b"{}").hexdigest(),
+            "created_at": datetime.now(timezone.utc) - timedelta(hours=1),
+        },
+    )
+
+    async def two_retries():
+        return await asyncio.gather(call(middleware), call(middleware))
+
+    assert sorted(run(two_retries)) == [201, 409]
+    assert len(handled) == 1
+    assert run(db.idempotency_keys.find_one, {"_id": key})["status"] == "completed"
+
+
+def test_completed_response_is_stored_even_if_the_claim_vanished(run, db):
+    async def handler(scope, receive, send):
+        await db.idempotency_keys.delete_many({})  # e.g. expired while the handler ran
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = IdempotencyMiddleware(handler)
+    assert run(call, middleware) == 201
+    assert run(db.idempotency_keys.find_one, {})["status"] == "completed"
+
+
+def test_server_error_releases_the_claim(run, db):
+    async def handler(scope, receive, send):
+        await send({"type": "http.response.start", "status": 503, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = IdempotencyMiddleware(handler)
+    assert run(call, middleware) == 503
+    assert run(db.idempotency_keys.count_documents, {}) == 0
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.job_service import claim_next_job, enqueue_job, job_handler, run_job
+
+calls = []
+
+
+@job_handler("test.succeed")
+async def succeed(payload: dict) -> dict:
+    calls.append(payload)
+    return {"done": True}
+
+
+@job_handler("test.fail")
+async def fail(payload: dict) -> None:
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def expire(run, db, job_id, field: str) -> None:
+    """Move a job's lease or backoff into the past."""
+
+    async def update():
+        past = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await db.jobs.update_one({"_id": job_id}, {"$set": {field: past}})
+
+    run(update)
+
+
+def test_job_runs_once_and_succeeds(run, db):
+    run(enqueue_job, "test.succeed", {"n": 1})
+    job = run(claim_next_job)
+    assert job["status"] == "RUNNING" and job["attempts"] == 1
+    assert run(claim_next_job) is None  # leased
+
+    run(run_job, job)
+    stored = run(db.jobs.find_one, {"_id": job["_id"]})
+    assert stored["status"] == "SUCCEEDED"
+    assert stored["result"] == {"done": True}
+    assert calls == [{"n": 1}]
+
+
+def test_enqueue_with_idempotency_key_returns_the_existing_job(run):
+    first = run(enqueue_job, "test.succeed", {}, "same-key")
+    second = run(enqueue_job, "test.succeed", {}, "same-key")
+    assert first["id"] == second["id"]
+
+
+def test_failed_job_backs_off_then_fails_after_max_attempts(run, db):
+    run(enqueue_job, "test.fail", {}, None, 2)
+
+    job = run(claim_next_job)
+    run(run_job, job)
+    stored = run(db.jobs.find_one, {"_id": job["_id"]})
+    assert stored["status"] == "PENDING"
+    assert "boom" in stored["error"]
+    assert run(claim_next_job) is None  # still backing off
+
+    expire(run, db, job["_id"], "run_after")
+    job = run(claim_next_job)
+    assert job["attempts"] == 2
+    run(run_job, job)
+    assert run(db.jobs.find_one, {"_id": job["_id"]})["status"] == "FAILED"
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out(run, db):
+    run(enqueue_job, "test.succeed", {}, None, 2)
+    job = run(claim_next_job)
+
+    expire(run, db, job["_id"], "lease_expires_at")
+    reclaimed = run(claim_next_job)
+    assert reclaimed["_id"] == job["_id"] and reclaimed["attempts"] == 2
+
+    expire(run, db, job["_id"], "lease_expires_at")
+    assert run(claim_next_job) is None
+    stored = run(db.jobs.find_one, {"_id": job["_id"]})
+    assert stored["status"] == "FAILED"
+    assert stored["attempts"] == 2
+
+
+@pytest.mark.parametrize("job_type", ["test.succeed", "test.fail"])
+def test_stale_worker_cannot_overwrite_the_new_lease(run, db, job_type):
+    run(enqueue_job, job_type, {}, None, 3)
+    stale = run(claim_next_job)
+    expire(run, db, stale["_id"], "lease_expires_at")
+    current = run(claim_next_job)
+
+    # The first run finishes late; its outcome must not touch the second lease
+    run(run_job, stale)
+    stored = run(db.jobs.find_one, {"_id": stale["_id"]})
+    assert stored["status"] == "RUNNING" and stored["attempts"] == 2
+
+    run(run_job, current)
+    stored = run(db.jobs.find_one, {"_id": current["_id"]})
+    assert stored["status"] == ("SUCCEEDED" if job_type == "test.succeed" else "PENDING")
@@ -0,0 +1,106 @@
+from bson import ObjectId
+
+from app.core.config import get_settings
+from app.services.project_service import create_project
+from app.services.sync_service import next_sequence
+from conftest import bearer, create_user, login
+
+settings = get_settings()
+
+
+def sync(client, session: dict, since: int = 0) -> dict:
+    response = client.get(f"/api/sync?since={since}", headers=bearer(session))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def add_service(client, admin: dict, name: str) -> None:
+    response = client.post(
+        "/api/admin/services",
+        json={"name": name, "description": "d", "price": 10},
+        headers=bearer(admin),
+    )
+    assert response.status_code == 200, response.text
+
+
+def test_changes_after_the_watermark_are_delivered_once_settled(client, admin, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0.0)
+    add_service(client, admin, "Design")
+    first = sync(client, admin)
+    assert [s["name"] for s in first["changes"]["services"]] == ["Design"]
+    assert first["watermark"] == first["changes"]["services"][0]["seq"]
+
+    add_service(client, admin, "Build")
+    second = sync(client, admin, first["watermark"])
+    assert [s["name"] for s in second["changes"]["services"]] == ["Build"]
+    assert sync(client, admin, second["watermark"])["changes"]["services"] == []
+
+
+def test_watermark_stays_behind_a_write_that_has_not_committed(client, run, db, admin):
+    # A write reserves its sequence, then commits after a later write did
+    in_flight = run(next_sequence)
+    add_service(client, admin, "Committed")
+
+    page = sync(client, admin)
+    assert [s["name"] for s in page["changes"]["services"]] == ["Committed"]
+    assert page["watermark"] < in_flight
+
+    run(
+        db.services.insert_one,
+        {"name": "Late", "description": "d", "price": 1, "tenant_id": "default", "seq": in_flight},
+    )
+    names = [s["name"] for s in sync(client, admin, page["watermark"])["changes"]["services"]]
+    assert "Late" in names
+
+
+def test_full_pages_set_has_more(client, admin, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 2)
+    for name in ("A", "B", "C"):
+        add_service(client, admin, name)
+
+    page = sync(client, admin)
+    assert page["has_more"] is True
+    assert [s["name"] for s in page["changes"]["services"]] == ["A", "B"]
+    rest = sync(client, admin, page["watermark"])
+    assert rest["has_more"] is False
+    assert [s["name"] for s in rest["changes"]["services"]] == ["C"]
+
+
+def test_unassign_then_reassign_orders_the_tombstone_before_the_change(
+    client, run, admin, monkeypatch
+):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0.0)
+    employee_id = create_user(run, "emp@example.com", role="EMPLOYEE")
+    employee = login(client, "emp@example.com")
+    project = run(create_project, "Site", "d", str(ObjectId()), str(ObjectId()))
+    assign = f"/api/admin/projects/{project['id']}/assign"
+    unassign = f"/api/admin/projects/{project['id']}/unassign"
+
+    client.put(assign, json={"employee_ids": [employee_id]}, headers=bearer(admin))
+    start = sync(client, employee)
+    assert [p["id"] for p in start["changes"]["projects"]] == [project["id"]]
+
+    client.put(unassign, json={"employee_id": employee_id}, headers=bearer(admin))
+    client.put(assign, json={"employee_ids": [employee_id]}, headers=bearer(admin))
+    page = sync(client, employee, start["watermark"])
+
+    [deleted] = page["deleted"]["projects"]
+    [changed] = page["changes"]["projects"]
+    assert deleted["id"] == changed["id"] == project["id"]
+    # Applied in seq order, the project ends up visible again
+    assert deleted["seq"] < changed["seq"]
+
+
+def test_deletes_reach_only_their_audience(client, run, admin, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0.0)
+    first_id = create_user(run, "one@example.com", role="EMPLOYEE")
+    create_user(run, "two@example.com", role="EMPLOYEE")
+    other = login(client, "two@example.com")
+    project = run(create_project, "Site", "d", str(ObjectId()), str(ObjectId()))
+    path = f"/api/admin/projects/{project['id']}"
+
+    client.put(f"{path}/assign", json={"employee_ids": [first_id]}, headers=bearer(admin))
+    client.put(f"{path}/unassign", json={"employee_id": first_id}, headers=bearer(admin))
+
+    assert sync(client, other)["deleted"]["projects"] == []
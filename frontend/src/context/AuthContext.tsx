@@ -24,9 +24,10 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
 
     const login = async (email: string, password: string) => {
         const response = await api.post('/auth/login', { email, password });
-        const { access_token, role: userRole, user_id, name } = response.data;
+        const { access_token, refresh_token, role: userRole, user_id, name } = response.data;
 
         localStorage.setItem('token', access_token);
+        localStorage.setItem('refresh_token', refresh_token);
         localStorage.setItem('role', userRole);
         localStorage.setItem('user_id', user_id);
         localStorage.setItem('user_name', name);
@@ -38,7 +39,12 @@ export const AuthProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     };
 
     const logout = () => {
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (refreshToken) {
+            api.post('/auth/logout', { refresh_token: refreshToken }).catch(() => undefined);
+        }
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('role');
         localStorage.removeItem('user_id');
         localStorage.removeItem('user_name');
@@ -18,16 +18,60 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
-// Handle 401 responses globally
+const clearSession = () => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
+  localStorage.removeItem('role');
+  localStorage.removeItem('user_id');
+  localStorage.removeItem('user_name');
+};
+
+// Refresh tokens are single-use and shared by every tab through localStorage. Within a tab,
+// concurrent 401s share one refresh call; across tabs, a Web Lock lets one tab refresh at a time.
+let refreshing: Promise<string> | null = null;
+
+const withRefreshLock = async (task: () => Promise<string>): Promise<string> =>
+  'locks' in navigator ? await navigator.locks.request('auth-refresh', task) : task();
+
+const refreshAccessToken = (expiredToken: string | null): Promise<string> => {
+  if (!refreshing) {
+    refreshing = withRefreshLock(async () => {
+      // Another tab may have renewed the session while this one waited for the lock
+      const current = localStorage.getItem('token');
+      if (current && current !== expiredToken) {
+        return current;
+      }
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) {
+        throw new Error('No refresh token');
+      }
+      const response = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken });
+      localStorage.setItem('token', response.data.access_token);
+      localStorage.setItem('refresh_token', response.data.refresh_token);
+      return response.data.access_token as string;
+    }).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
+// Access tokens are short-lived: on 401, renew once and retry before sending the user to login
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      localStorage.removeItem('token');
-      localStorage.removeItem('role');
-      localStorage.removeItem('user_id');
-      localStorage.removeItem('user_name');
-      window.location.href = '/login';
+  async (error) => {
+    const original = error.config;
+    if (error.response?.status === 401 && original && !original._retried) {
+      original._retried = true;
+      try {
+        const sent = String(original.headers.Authorization || '').replace('Bearer ', '');
+        const token = await refreshAccessToken(sent || null);
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch {
+        clearSession();
+        window.location.href = '/login';
+      }
     }
     return Promise.reject(error);
   }